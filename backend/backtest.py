@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+backtest.py — Replays logged history through the progression engine.
+
+For every non-bench exercise, sessions are walked in date order. At each
+session the engine only sees the sessions before it (and the bodyweight
+trend as of the day before), and its recommended top set is scored against
+what was actually lifted that day.
+
+Exercises are replayed in parallel across a process pool; the bodyweight
+trend series is shipped once per worker rather than once per task.
+
+Usage:
+    python3 backtest.py                 # all CPUs
+    python3 backtest.py --workers 1     # serial replay (baseline timing)
+    python3 backtest.py --per-exercise  # add a per-exercise breakdown
+"""
+
+import argparse
+import os
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from services.progression import compute_exercise_plan
+from services.history import HISTORY_LIMIT
+
+# Exercise attributes the replay needs; plain values so they pickle cheaply
+EXERCISE_FIELDS = ("id", "name", "is_bench_cycle", "rep_floor", "rep_ceiling", "weights_available", "machine_max")
+
+_trend_dates = []
+_trend_deltas = []
+
+
+def load_backtest_inputs(db_session):
+    """
+    Loads exercises, dated per-exercise history and the bodyweight trend
+    with one query per table. ORM rows are flattened into plain,
+    picklable values so they can be shipped to worker processes.
+    """
+    from db.schema import Exercise, Session, SessionExercise, Set, BodyweightTrend
+
+    exercises = [
+        SimpleNamespace(**{f: getattr(ex, f) for f in EXERCISE_FIELDS})
+        for ex in db_session.query(Exercise).filter(Exercise.is_bench_cycle == False).order_by(Exercise.id).all()
+    ]
+
+    history_rows = db_session.query(
+        SessionExercise.id, SessionExercise.exercise_id, SessionExercise.exercise_order, Session.date
+    ).join(Session, Session.id == SessionExercise.session_id).order_by(
+        Session.date, Session.id, SessionExercise.exercise_order
+    ).all()
+
+    set_rows = db_session.query(
+        Set.session_exercise_id, Set.weight_kg, Set.reps
+    ).order_by(Set.session_exercise_id, Set.set_number, Set.id).all()
+
+    trend = db_session.query(BodyweightTrend.date, BodyweightTrend.delta_7d_kg).order_by(BodyweightTrend.date.asc()).all()
+
+    sets_by_se = {}
+    for se_id, weight_kg, reps in set_rows:
+        sets_by_se.setdefault(se_id, []).append({"weight_kg": weight_kg, "reps": reps})
+
+    history_by_ex = {}
+    for se_id, ex_id, order, session_date in history_rows:
+        history_by_ex.setdefault(ex_id, []).append({
+            "date": session_date,
+            "exercise_order": order,
+            "sets": sets_by_se.get(se_id, []),
+        })
+
+    return exercises, history_by_ex, [tuple(t) for t in trend]
+
+
+def _init_worker(trend):
+    global _trend_dates, _trend_deltas
+    _trend_dates = [d for d, _ in trend]
+    _trend_deltas = [delta for _, delta in trend]
+
+
+def _direction(new, old):
+    return (new > old) - (new < old)
+
+
+def replay_exercise(exercise, history: list[dict]) -> dict:
+    """
+    Walk-forward replay of one exercise. Returns summed scores so the
+    parent can aggregate without shipping every prediction back.
+    """
+    started = time.perf_counter()
+    score = {
+        "exercise": exercise.name,
+        "predictions": 0,
+        "weight_exact": 0,
+        "direction_match": 0,
+        "weight_abs_err": 0.0,
+        "reps_abs_err": 0.0,
+    }
+
+    for k in range(1, len(history)):
+        actual = history[k]["sets"]
+        previous = history[k - 1]["sets"]
+        if not actual or not previous:
+            continue
+
+        # Trend point from strictly before the session day, as the live engine saw it
+        cutoff = bisect_left(_trend_dates, history[k]["date"])
+        bw_delta = _trend_deltas[cutoff - 1] if cutoff > 0 else 0.0
+        # The live engine only sees the last HISTORY_LIMIT sessions
+        plan = compute_exercise_plan(exercise, history[max(0, k - HISTORY_LIMIT):k], [], bw_delta)
+        if not plan:
+            continue
+
+        predicted_w, predicted_r = plan[0]["weight_kg"], plan[0]["reps"]
+        actual_w, actual_r = actual[0]["weight_kg"], actual[0]["reps"]
+        previous_w = previous[0]["weight_kg"]
+
+        score["predictions"] += 1
+        score["weight_exact"] += predicted_w == actual_w
+        score["direction_match"] += _direction(predicted_w, previous_w) == _direction(actual_w, previous_w)
+        score["weight_abs_err"] += abs(predicted_w - actual_w)
+        score["reps_abs_err"] += abs(predicted_r - actual_r)
+
+    score["seconds"] = time.perf_counter() - started
+    return score
+
+
+def run_backtest(exercises, history_by_ex: dict, trend: list, workers: int) -> list[dict]:
+    tasks = [(ex, history_by_ex[ex.id]) for ex in exercises if len(history_by_ex.get(ex.id, [])) >= 2]
+    if workers <= 1:
+        _init_worker(trend)
+        return [replay_exercise(ex, hist) for ex, hist in tasks]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(trend,)) as pool:
+        futures = [pool.submit(replay_exercise, ex, hist) for ex, hist in tasks]
+        return [f.result() for f in futures]
+
+
+def summarise(scores: list[dict]) -> dict:
+    n = sum(s["predictions"] for s in scores)
+    if n == 0:
+        return {"predictions": 0}
+    return {
+        "predictions": n,
+        "weight_exact_pct": 100.0 * sum(s["weight_exact"] for s in scores) / n,
+        "direction_match_pct": 100.0 * sum(s["direction_match"] for s in scores) / n,
+        "weight_mae_kg": sum(s["weight_abs_err"] for s in scores) / n,
+        "reps_mae": sum(s["reps_abs_err"] for s in scores) / n,
+        "engine_seconds": sum(s["seconds"] for s in scores),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay session history through the progression engine.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--per-exercise", action="store_true")
+    args = parser.parse_args()
+
+    from db.init import SessionLocal, init_db
+
+    init_db()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        exercises, history_by_ex, trend = load_backtest_inputs(db)
+    finally:
+        db.close()
+    loaded = time.perf_counter()
+
+    scores = run_backtest(exercises, history_by_ex, trend, args.workers)
+    finished = time.perf_counter()
+
+    if args.per_exercise:
+        for s in sorted(scores, key=lambda s: s["exercise"]):
+            if s["predictions"]:
+                print(f"  {s['exercise']:<40} n={s['predictions']:<4} "
+                      f"exact={100.0 * s['weight_exact'] / s['predictions']:5.1f}% "
+                      f"dir={100.0 * s['direction_match'] / s['predictions']:5.1f}% "
+                      f"mae={s['weight_abs_err'] / s['predictions']:.2f}kg")
+
+    summary = summarise(scores)
+    if not summary["predictions"]:
+        print("No exercise has two or more logged sessions to replay.")
+        return
+
+    print(f"✓ Replayed {len(scores)} exercises, {summary['predictions']} predictions.")
+    print(f"  Top-set weight exact:     {summary['weight_exact_pct']:.1f}%")
+    print(f"  Weight direction match:   {summary['direction_match_pct']:.1f}%")
+    print(f"  Top-set weight MAE:       {summary['weight_mae_kg']:.2f} kg")
+    print(f"  Top-set reps MAE:         {summary['reps_mae']:.2f}")
+    print(f"  Load: {loaded - started:.3f}s  Replay: {finished - loaded:.3f}s "
+          f"({args.workers} workers, {summary['engine_seconds']:.3f}s engine time)")
+
+
+if __name__ == "__main__":
+    main()
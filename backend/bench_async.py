@@ -0,0 +1,106 @@
+"""
+Throughput of the sync vs async DB paths under concurrent load.
+
+Serves the same read (recent daily metrics + one exercise's progression
+plan) from a `def` route on SessionLocal and from an `async def` route on
+AsyncSessionLocal, then fires N concurrent requests at each through an
+in-process ASGI transport. Read-only, so it is safe to run on gym.db.
+
+    python bench_async.py --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.init import init_db, SessionLocal, AsyncSessionLocal, async_engine
+from db.schema import Exercise
+from services.progression import compute_exercise_plan, load_exercise_inputs_async
+from services.history import get_exercise_history
+from services.bodyweight import get_bodyweight_delta
+from services.metrics import get_recent_metrics, get_recent_metrics_async
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+app = FastAPI()
+
+@app.get("/sync/{exercise_id}")
+def sync_read(exercise_id: int, db: Session = Depends(get_db)):
+    metrics = get_recent_metrics(db)
+    ex = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+    plan = compute_exercise_plan(ex, get_exercise_history(db, exercise_id), [], get_bodyweight_delta(db))
+    return {"metrics": len(metrics), "plan": plan}
+
+@app.get("/async/{exercise_id}")
+async def async_read(exercise_id: int, db: AsyncSession = Depends(get_async_db)):
+    metrics = await get_recent_metrics_async(db)
+    ex, hist, bw_delta = await load_exercise_inputs_async(db, exercise_id)
+    plan = compute_exercise_plan(ex, hist, [], bw_delta)
+    return {"metrics": len(metrics), "plan": plan}
+
+async def run(path_prefix: str, exercise_ids: list[int], n_requests: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.get(f"/{path_prefix}/{exercise_ids[i % len(exercise_ids)]}")
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+
+        # Warm both pools before timing
+        await asyncio.gather(*(one(i) for i in range(min(concurrency, n_requests))))
+        latencies.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": n_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+async def main(n_requests: int, concurrency: int):
+    db = SessionLocal()
+    try:
+        exercise_ids = [ex_id for (ex_id,) in db.query(Exercise.id).filter(Exercise.is_bench_cycle == False).all()]
+    finally:
+        db.close()
+    if not exercise_ids:
+        print("❌ No exercises in the database.")
+        return
+
+    print(f"📊 {n_requests} requests, concurrency {concurrency}")
+    for prefix in ("sync", "async"):
+        res = await run(prefix, exercise_ids, n_requests, concurrency)
+        print(f"   {prefix:>5}: {res['rps']:8.1f} req/s   p50 {res['p50_ms']:7.2f} ms   p95 {res['p95_ms']:7.2f} ms")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async DB routes")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    init_db()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -2,12 +2,20 @@ import json
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from db.schema import Base, Exercise, BenchCycle
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from db.schema import Exercise, BenchCycle, Set, ExerciseWeekStat, DailyMetric, BodyweightTrend, Session, TrainingWeek, MetricRollup, BodyComposition, MuscleWeekVolume, MuscleLoad
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gym.db')
 engine = create_engine(f"sqlite:///{DB_PATH}")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async twin of the engine above for the FastAPI routes (aiosqlite driver).
+# Scripts and migrations keep using the sync engine. expire_on_commit is off
+# so ORM rows returned by a service can be serialised after the commit
+# without an implicit (and, under asyncio, illegal) lazy refresh.
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}")
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_bench_pr():
     targets_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'targets.json')
     try:
@@ -17,11 +25,21 @@ def get_bench_pr():
     except Exception:
         return 0.0
 
-def init_db():
-    # 1. Create all tables
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=engine):
+    """
+    Creates, upgrades and seeds one database. `bind` defaults to gym.db;
+    db/shards.py passes a per-athlete engine on first access.
+    """
+    # 1. Bring the schema up to date (tables, columns, indexes, constraints).
+    # Costs a single version lookup when the file is already current.
+    from db.migrate import current_version, latest_version, migrate, check_query_plans
+    if current_version(bind) < latest_version():
+        for version, name in migrate(bind):
+            print(f"✓ Applied migration {version:03d} {name}")
+        for query, detail in check_query_plans(bind):
+            print(f"Warning: {query} does a full table scan ({detail})")
     
-    db = SessionLocal()
+    db = SessionLocal(bind=bind)
     try:
         # 2. Seed exercises if empty
         if db.query(Exercise).count() == 0:
@@ -69,5 +87,35 @@ def init_db():
                 target_weight_kg=target
             ))
             db.commit()
+
+        # 4. Backfill exercise/week aggregates (and the volume cube and muscle
+        # loads built from them) for databases that predate them
+        if db.query(ExerciseWeekStat).count() == 0 and db.query(Set).count() > 0:
+            from services.aggregates import rebuild_exercise_week_stats
+            rebuild_exercise_week_stats(db)
+        elif db.query(MuscleWeekVolume).count() == 0 and db.query(ExerciseWeekStat).count() > 0:
+            from services.aggregates import rebuild_muscle_week_volume
+            rebuild_muscle_week_volume(db)
+        if db.query(MuscleLoad).count() == 0 and db.query(ExerciseWeekStat).filter(ExerciseWeekStat.load_e1rm > 0).count() > 0:
+            from services.muscle_levels import rebuild_muscle_loads
+            rebuild_muscle_loads(db)
+
+        # 5. Backfill the bodyweight trend from daily_metrics
+        if db.query(BodyweightTrend).count() == 0 and db.query(DailyMetric).filter(DailyMetric.bodyweight_kg > 0).count() > 0:
+            from services.bodyweight import rebuild_bodyweight_trend
+            rebuild_bodyweight_trend(db)
+
+        # 6. Normalise day_number and the week summary for older databases
+        if db.query(Session).filter(Session.day_number == None).count() > 0:
+            from services.weeks import backfill_day_numbers
+            backfill_day_numbers(db)
+        if db.query(TrainingWeek).count() == 0 and db.query(Session).count() > 0:
+            from services.weeks import rebuild_training_weeks
+            rebuild_training_weeks(db)
+
+        # 7. Backfill the weekly/monthly metric rollups
+        if db.query(MetricRollup).count() == 0 and (db.query(DailyMetric).count() > 0 or db.query(BodyComposition).count() > 0):
+            from services.metric_rollups import rebuild_metric_rollups
+            rebuild_metric_rollups(db)
     finally:
         db.close()
@@ -0,0 +1,167 @@
+"""
+Versioned schema migrations.
+
+Each file in migrations/versions named vNNN_<name>.py defines
+upgrade(conn) and is applied once, in version order, with its version
+recorded in `schema_version`. A file without that table is at version 0
+(every gym.db that predates this runner), so the whole chain replays on
+it. SQLite runs DDL outside the transaction, so upgrade() must be safe to
+re-run: use add_column()/create_index() below, or IF NOT EXISTS.
+
+    python -m db.migrate            # apply pending migrations
+    python -m db.migrate --check    # report hot queries that scan a table
+"""
+import importlib
+import os
+import re
+from sqlalchemy import create_engine, inspect, text, func, select, insert
+from sqlalchemy.pool import NullPool
+from db.schema import SchemaVersion
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations', 'versions')
+_VERSION_FILE = re.compile(r"^v(\d{3})_(\w+)\.py$")
+
+_migrations = None
+
+def discover_migrations() -> list[tuple[int, str, object]]:
+    """(version, name, module) for every migration script, in version order."""
+    global _migrations
+    if _migrations is None:
+        found = []
+        for filename in os.listdir(VERSIONS_DIR):
+            m = _VERSION_FILE.match(filename)
+            if m:
+                module = importlib.import_module(f"migrations.versions.{filename[:-3]}")
+                found.append((int(m.group(1)), m.group(2), module))
+        found.sort(key=lambda f: f[0])
+        versions = [v for v, _, _ in found]
+        if len(set(versions)) != len(versions):
+            raise RuntimeError(f"Duplicate migration versions in {VERSIONS_DIR}")
+        _migrations = found
+    return _migrations
+
+def latest_version() -> int:
+    migrations = discover_migrations()
+    return migrations[-1][0] if migrations else 0
+
+def current_version(bind) -> int:
+    if not inspect(bind).has_table(SchemaVersion.__tablename__):
+        return 0
+    with bind.connect() as conn:
+        return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+def migrate(bind) -> list[tuple[int, str]]:
+    """Applies every migration newer than the file's version. Returns what ran."""
+    SchemaVersion.__table__.create(bind=bind, checkfirst=True)
+    current = current_version(bind)
+    applied = []
+    for version, name, module in discover_migrations():
+        if version <= current:
+            continue
+        with bind.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(insert(SchemaVersion).values(version=version, name=name))
+        applied.append((version, name))
+    return applied
+
+# Helpers for migration scripts
+
+def add_column(conn, table: str, column: str, col_type: str):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}"))
+
+def create_index(conn, name: str, table: str, columns: list[str], unique: bool = False):
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
+
+# Query-plan check
+
+# The lookups the API runs on every request or write, written with literal
+# parameters so EXPLAIN QUERY PLAN sees the same shapes the services emit.
+HOT_QUERIES = {
+    "day session (weeks.find_day_session_id)":
+        "SELECT id FROM sessions WHERE week_number = 1 AND day_number = 1 ORDER BY id LIMIT 1",
+    "session exercises (read_model)":
+        "SELECT id FROM session_exercises WHERE session_id IN (1, 2) "
+        "ORDER BY session_id, exercise_order, id",
+    "session sets (read_model)":
+        "SELECT sets.id FROM sets JOIN session_exercises ON session_exercises.id = sets.session_exercise_id "
+        "WHERE session_exercises.session_id IN (1, 2) ORDER BY sets.session_exercise_id, sets.set_number",
+    "exercise history (history)":
+        "SELECT session_exercises.id FROM session_exercises JOIN sessions ON sessions.id = session_exercises.session_id "
+        "WHERE session_exercises.exercise_id = 1 ORDER BY sessions.date DESC, sessions.id DESC LIMIT 12",
+    "history sets (history)":
+        "SELECT weight_kg, reps FROM sets WHERE session_exercise_id IN (1, 2) ORDER BY session_exercise_id, set_number",
+    "exercise week (aggregates)":
+        "SELECT sets.weight_kg FROM sets "
+        "JOIN session_exercises ON session_exercises.id = sets.session_exercise_id "
+        "JOIN sessions ON sessions.id = session_exercises.session_id "
+        "WHERE session_exercises.exercise_id = 1 AND sessions.week_number = 1",
+    "set -> day (weeks.get_set_day)":
+        "SELECT sessions.week_number, sessions.day_number FROM sessions "
+        "JOIN session_exercises ON session_exercises.session_id = sessions.id "
+        "JOIN sets ON sets.session_exercise_id = session_exercises.id WHERE sets.id = 1",
+    "renpho upsert (metrics.log_renpho_batch)":
+        "SELECT id FROM body_composition WHERE date = '2026-01-01' AND source = 'renpho'",
+    "daily metric upsert (metrics)":
+        "SELECT id FROM daily_metrics WHERE date = '2026-01-01'",
+    "week rollup (aggregates)":
+        "SELECT id FROM exercise_week_stats WHERE exercise_id = 1 AND week_number = 1",
+    "change feed page (changes.get_changes)":
+        "SELECT rev, table_name, row_id, op FROM change_log WHERE rev > 10 ORDER BY rev LIMIT 501",
+    "change feed trigger (v006)":
+        "DELETE FROM change_log WHERE table_name = 'sets' AND row_id = 1",
+    "dashboard chart (metric_rollups.get_metric_chart)":
+        "SELECT period_start, metric, mean FROM metric_rollups "
+        "WHERE granularity = 'week' AND period_start >= '2026-01-05' AND period_start <= '2026-10-17'",
+    "volume cube cell (aggregates.refresh_muscle_week)":
+        "SELECT SUM(exercise_week_stats.set_count) FROM exercise_week_stats "
+        "JOIN exercises ON exercises.id = exercise_week_stats.exercise_id "
+        "WHERE exercises.muscle_group = 'chest' AND exercises.tier = 'heavy' AND exercise_week_stats.week_number = 1",
+    "volume chart (aggregates.get_volume_chart)":
+        "SELECT week_number, muscle_group, SUM(tonnage_kg) FROM muscle_week_volume "
+        "WHERE week_number >= 1 AND week_number <= 12 GROUP BY week_number, muscle_group",
+}
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+def check_query_plans(bind) -> list[tuple[str, str]]:
+    """
+    (query, plan step) for every hot query step that reads a whole table
+    ("SCAN t" with no index), i.e. a missing index. Empty list = all good.
+    """
+    # A fresh, unpooled connection: pysqlite caches prepared statements per
+    # connection and a cached EXPLAIN is not re-planned after DDL, so a
+    # pooled one can report the plan from before the last migration.
+    check_engine = create_engine(bind.url, poolclass=NullPool)
+    missing = []
+    try:
+        with check_engine.connect() as conn:
+            for name, sql in HOT_QUERIES.items():
+                for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+                    detail = row[-1]
+                    if _FULL_SCAN.match(detail):
+                        missing.append((name, detail))
+    finally:
+        check_engine.dispose()
+    return missing
+
+if __name__ == "__main__":
+    import sys
+    from db.init import engine
+
+    if "--check" in sys.argv:
+        missing = check_query_plans(engine)
+        for name, detail in missing:
+            print(f"❌ {name}: {detail}")
+        if not missing:
+            print(f"✓ All {len(HOT_QUERIES)} hot queries use an index.")
+        sys.exit(1 if missing else 0)
+
+    applied = migrate(engine)
+    for version, name in applied:
+        print(f"✓ Applied migration {version:03d} {name}")
+    print(f"📊 Schema version {current_version(engine)} (latest {latest_version()})")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 import json
@@ -7,6 +7,7 @@ Base = declarative_base()
 
 class Exercise(Base):
     __tablename__ = 'exercises'
+    __table_args__ = (Index('ix_exercises_muscle_group_tier', 'muscle_group', 'tier'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False, unique=True)
@@ -26,11 +27,16 @@ class Exercise(Base):
 
 class Session(Base):
     __tablename__ = 'sessions'
+    # One session per (week, day); rows without a parsed day number are exempt
+    # (NULLs never collide in a unique index)
+    __table_args__ = (Index('uq_sessions_week_day', 'week_number', 'day_number', unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, nullable=False)
     day_label = Column(String, nullable=False)
     week_number = Column(Integer, nullable=False)
+    # Parsed from day_label ("Day3_Legs" -> 3) when the session is written
+    day_number = Column(Integer, nullable=True)
     start_time = Column(DateTime, nullable=True)
     end_time = Column(DateTime, nullable=True)
     notes = Column(String, nullable=True)
@@ -41,6 +47,11 @@ class Session(Base):
 
 class SessionExercise(Base):
     __tablename__ = 'session_exercises'
+    __table_args__ = (
+        Index('ix_session_exercises_exercise_session', 'exercise_id', 'session_id'),
+        Index('ix_session_exercises_session_order', 'session_id', 'exercise_order'),
+        Index('uq_session_exercises_session_exercise', 'session_id', 'exercise_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
@@ -57,6 +68,7 @@ class SessionExercise(Base):
 
 class Set(Base):
     __tablename__ = 'sets'
+    __table_args__ = (Index('uq_sets_session_exercise_set_number', 'session_exercise_id', 'set_number', unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_exercise_id = Column(Integer, ForeignKey('session_exercises.id'), nullable=False)
@@ -87,6 +99,8 @@ class DailyMetric(Base):
 
 class BodyComposition(Base):
     __tablename__ = 'body_composition'
+    # One reading per day per source; log_renpho_batch upserts on this key
+    __table_args__ = (Index('uq_body_composition_date_source', 'date', 'source', unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     date = Column(Date, nullable=False)
@@ -109,3 +123,129 @@ class BenchCycle(Base):
     bench_pr_kg = Column(Float, nullable=False)
     target_weight_kg = Column(Float, nullable=False)
     created_at = Column(DateTime, default=func.now())
+
+
+# Per-exercise, per-week rollup of `sets`, kept in sync by services/aggregates.py
+class ExerciseWeekStat(Base):
+    __tablename__ = 'exercise_week_stats'
+    __table_args__ = (UniqueConstraint('exercise_id', 'week_number'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exercise_id = Column(Integer, ForeignKey('exercises.id'), nullable=False)
+    week_number = Column(Integer, nullable=False)
+    set_count = Column(Integer, nullable=False, default=0)
+    tonnage_kg = Column(Float, nullable=False, default=0.0)
+    best_e1rm = Column(Float, nullable=True)
+    last_session_date = Column(Date, nullable=True)
+    last_top_weight_kg = Column(Float, nullable=True)
+    last_top_reps = Column(Integer, nullable=True)
+    # The week's summed e1RM decayed to last_session_date (services/muscle_levels.py)
+    load_e1rm = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+# Weekly volume per (muscle group, tier): the exercise_week_stats rows of
+# that week summed over the group's exercises, refreshed alongside them by
+# services/aggregates.py so volume charts read one index range
+class MuscleWeekVolume(Base):
+    __tablename__ = 'muscle_week_volume'
+    __table_args__ = (Index('uq_muscle_week_volume_week_group_tier', 'week_number', 'muscle_group', 'tier', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    week_number = Column(Integer, nullable=False)
+    muscle_group = Column(String, nullable=False)
+    tier = Column(String, nullable=False)
+    hard_sets = Column(Integer, nullable=False, default=0)
+    tonnage_kg = Column(Float, nullable=False, default=0.0)
+
+
+# Exponentially decayed e1RM load per muscle group as a (value, last_update)
+# pair: the value as of last_update, decayed on read and on each new set
+class MuscleLoad(Base):
+    __tablename__ = 'muscle_load'
+
+    muscle_group = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+    last_update = Column(Date, nullable=False)
+
+
+# One row per weigh-in day with its smoothed weight and date-based 7-day delta,
+# maintained incrementally by services/bodyweight.py
+class BodyweightTrend(Base):
+    __tablename__ = 'bodyweight_trend'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False, unique=True)
+    bodyweight_kg = Column(Float, nullable=False)
+    ewma_kg = Column(Float, nullable=False)
+    delta_7d_kg = Column(Float, nullable=False, default=0.0)
+
+
+# One row per programme week that has at least one session, maintained on
+# session insert so week pickers never scan `sessions`
+class TrainingWeek(Base):
+    __tablename__ = 'training_weeks'
+
+    week_number = Column(Integer, primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+
+
+# One row per applied migration in migrations/versions; the highest
+# version is the schema version of the file
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=func.now())
+
+
+# Client-supplied Idempotency-Key of a write request and the response it
+# produced, so a retried request replays that response instead of writing
+# twice. Expired keys are pruned on insert (services/idempotency.py).
+class IdempotencyKey(Base):
+    __tablename__ = 'idempotency_keys'
+
+    key = Column(String, primary_key=True)
+    # Hash of endpoint + payload; the same key with a different body is a client bug
+    fingerprint = Column(String, nullable=False)
+    response = Column(String, nullable=False)
+    created_at = Column(DateTime, default=func.now(), index=True)
+
+
+# Change feed for delta sync: SQLite triggers (migration v006) append a row
+# on every insert/update/delete of sessions, session_exercises and sets,
+# replacing that row's previous entry, so the table holds the latest
+# revision of each touched row and `rev` only ever grows
+class ChangeLog(Base):
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        Index('uq_change_log_table_row', 'table_name', 'row_id', unique=True),
+        {'sqlite_autoincrement': True},
+    )
+
+    rev = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    # "upsert" or "delete"
+    op = Column(String, nullable=False)
+
+
+# Weekly and monthly summaries of the dashboard metrics (daily_metrics and
+# body_composition), one row per (granularity, period, metric); the
+# affected periods are recomputed on ingest by services/metric_rollups.py
+class MetricRollup(Base):
+    __tablename__ = 'metric_rollups'
+    __table_args__ = (Index('uq_metric_rollups_period_metric', 'granularity', 'period_start', 'metric', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # "week" (starting Monday) or "month"
+    granularity = Column(String, nullable=False)
+    period_start = Column(Date, nullable=False)
+    metric = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+    mean = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+    last = Column(Float, nullable=False)
+    last_date = Column(Date, nullable=False)
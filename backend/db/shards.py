@@ -0,0 +1,161 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from db.init import init_db, DB_PATH, engine, SessionLocal, async_engine, AsyncSessionLocal
+
+# One SQLite file per athlete, so athletes never contend on one write lock.
+# Requests without an athlete id keep using gym.db.
+SHARD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'athletes')
+ATHLETE_HEADER = "X-Athlete-Id"
+# Shards with open engines at once; the least recently used is closed
+# when another athlete needs a slot (its file stays on disk).
+MAX_OPEN_SHARDS = 64
+
+_ATHLETE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+def is_valid_athlete_id(athlete_id: str) -> bool:
+    return bool(_ATHLETE_ID.match(athlete_id or ""))
+
+def shard_path(athlete_id: str = None) -> str:
+    if athlete_id is None:
+        return DB_PATH
+    if not is_valid_athlete_id(athlete_id):
+        raise ValueError(f"Invalid athlete id: {athlete_id!r}")
+    return os.path.join(SHARD_DIR, f"{athlete_id}.db")
+
+class Shard:
+    """Sync and async engines/session factories for one athlete's file."""
+
+    def __init__(self, athlete_id: str = None):
+        self.athlete_id = athlete_id
+        if athlete_id is None:
+            self.engine, self.SessionLocal = engine, SessionLocal
+            self.async_engine, self.AsyncSessionLocal = async_engine, AsyncSessionLocal
+            return
+        path = shard_path(athlete_id)
+        self.engine = create_engine(f"sqlite:///{path}")
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.AsyncSessionLocal = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+
+class _Provisioning:
+    """A shard being opened and init_db'd; other requests for it wait on `done`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.shard = None
+        self.error = None
+
+class ShardRouter:
+    """
+    athlete id -> Shard, opened and provisioned (init_db) on first access,
+    kept in an LRU capped at `max_open`. The default gym.db shard is pinned
+    and never evicted.
+
+    The router lock only guards the dicts. Provisioning (migrations, seeding,
+    backfills: seconds) runs outside it, once per athlete: later requests
+    for that athlete wait on its _Provisioning, while lookups of other
+    shards carry on.
+
+    Evicted sync engines are disposed immediately; aiosqlite engines can
+    only be closed from the event loop, so they are parked in `_retired`
+    until dispose_retired() is awaited.
+    """
+    def __init__(self, max_open: int = MAX_OPEN_SHARDS):
+        self.max_open = max_open
+        self.default = Shard()
+        self._open: OrderedDict[str, Shard] = OrderedDict()
+        self._provisioning: dict[str, _Provisioning] = {}
+        self._lock = threading.Lock()
+        self._retired = []
+
+    def get_open(self, athlete_id: str = None):
+        """
+        The shard if its engines are already open, else None. Safe on the
+        event loop: never waits for the lock, let alone for provisioning.
+        """
+        if athlete_id is None:
+            return self.default
+        shard = self._open.get(athlete_id)
+        # LRU bookkeeping is best effort: skip it if another thread holds the lock
+        if shard is not None and self._lock.acquire(blocking=False):
+            try:
+                if athlete_id in self._open:
+                    self._open.move_to_end(athlete_id)
+            finally:
+                self._lock.release()
+        return shard
+
+    def get(self, athlete_id: str = None) -> Shard:
+        """The athlete's shard, provisioning it first if needed. Blocking: call off the event loop."""
+        shard = self.get_open(athlete_id)
+        if shard is not None:
+            return shard
+
+        with self._lock:
+            shard = self._open.get(athlete_id)
+            if shard is not None:
+                self._open.move_to_end(athlete_id)
+                return shard
+            provisioning = self._provisioning.get(athlete_id)
+            owner = provisioning is None
+            if owner:
+                provisioning = self._provisioning[athlete_id] = _Provisioning()
+
+        if not owner:
+            provisioning.done.wait()
+            if provisioning.error is not None:
+                raise provisioning.error
+            return provisioning.shard
+
+        try:
+            os.makedirs(SHARD_DIR, exist_ok=True)
+            shard = Shard(athlete_id)
+            init_db(shard.engine)
+        except BaseException as e:
+            provisioning.error = e
+            with self._lock:
+                self._provisioning.pop(athlete_id, None)
+            provisioning.done.set()
+            raise
+
+        with self._lock:
+            self._open[athlete_id] = shard
+            self._provisioning.pop(athlete_id, None)
+            while len(self._open) > self.max_open:
+                _, evicted = self._open.popitem(last=False)
+                evicted.engine.dispose()
+                self._retired.append(evicted.async_engine)
+        provisioning.shard = shard
+        provisioning.done.set()
+        return shard
+
+    async def dispose_retired(self):
+        with self._lock:
+            retired, self._retired = self._retired, []
+        for eng in retired:
+            await eng.dispose()
+
+    async def dispose_all(self):
+        with self._lock:
+            shards = list(self._open.values())
+            self._open.clear()
+        for shard in shards:
+            shard.engine.dispose()
+            self._retired.append(shard.async_engine)
+        await self.dispose_retired()
+        await self.default.async_engine.dispose()
+
+shard_router = ShardRouter()
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m db.shards <athlete_id> ... : provision shards ahead of first use
+    for athlete_id in sys.argv[1:]:
+        shard_router.get(athlete_id)
+        print(f"✓ Provisioned {shard_path(athlete_id)}")
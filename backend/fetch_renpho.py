@@ -1,140 +1,312 @@
 #!/usr/bin/env python3
 """
-fetch_renpho.py — A "Full Refresh" pipeline.
-Fetches all historical data from Renpho, filters for the new baseline
-(Feb 16, 2026 onwards), extracts all advanced metrics, writes to both
-the CSV data lake AND the renpho_body_comp SQLite table.
+fetch_renpho.py — Incremental Renpho sync.
+Pulls measurements from Renpho, keeps only those newer than the last
+synced measurement (the high-water mark stored in gym.db's sync_state),
+hands them to services.metrics.log_renpho_batch (body_composition, the
+daily_metrics weight mirror, the bodyweight trend and the metric rollups,
+in one transaction), and keeps the body_composition.csv data lake and the
+renpho_body_comp table as side outputs.
+
+    python fetch_renpho.py                      # incremental sync (make start / make log-weight)
+    python fetch_renpho.py --full               # forget the mark, rebuild the CSV from all history
+    python fetch_renpho.py --from-json dump.json  # sync from a saved measurement dump, no cloud login
+    python fetch_renpho.py --athlete alice      # sync into athletes/alice.db instead of gym.db
+
+The Renpho API has no "since" filter, so the cloud fetch itself is still
+the whole history; everything after it is proportional to the new
+measurements only.
 """
 
+import argparse
+import csv
+import io
+import json
 import os
 import sqlite3
 from datetime import date
 from pathlib import Path
-import pandas as pd
-from dotenv import load_dotenv
-
-from renpho import RenphoClient
 
 # ── Resolve paths ────────────────────────────────────────────────────────────
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 ENV_PATH = PROJECT_ROOT / "backend" / ".env"
 METRICS_DIR = PROJECT_ROOT / "data" / "metrics"
 CSV_PATH = METRICS_DIR / "body_composition.csv"
-DB_PATH = Path(__file__).resolve().parent / "gym.db"
-
-# Load credentials from .env
-load_dotenv(ENV_PATH)
-EMAIL = os.getenv("RENPHO_EMAIL")
-PASSWORD = os.getenv("RENPHO_PASSWORD")
-
 # ── The Baseline ─────────────────────────────────────────────────────────────
 CUTOFF_DATE = "2026-02-16"
 
+SYNC_SOURCE = "renpho"
+CSV_COLUMNS = [
+    "Date", "Weight_kg", "BMI", "BodyFat_pct", "Water_pct", "MuscleMass_kg", "BoneMass_kg",
+    "BMR_kcal", "VisceralFat", "SubcutaneousFat_pct", "Protein_pct", "MetabolicAge",
+]
+# CSV column -> Renpho measurement field
+_FIELDS = {
+    "Weight_kg": "weight", "BMI": "bmi", "BodyFat_pct": "bodyfat", "Water_pct": "water",
+    "MuscleMass_kg": "muscle", "BoneMass_kg": "bone", "BMR_kcal": "bmr", "VisceralFat": "visfat",
+    "SubcutaneousFat_pct": "subfat", "Protein_pct": "protein", "MetabolicAge": "bodyage",
+}
 
-def _write_to_db(df: pd.DataFrame):
-    """Write body composition data to the renpho_body_comp table (upsert)."""
-    conn = sqlite3.connect(str(DB_PATH))
-    for _, row in df.iterrows():
-        conn.execute("""
+
+class LocalRenphoClient:
+    """
+    Stand-in for renpho.RenphoClient that serves measurements from a JSON
+    dump (a list of measurement dicts, as renpho's save_json writes), for
+    testing the sync offline.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def login(self):
+        return {}
+
+    def get_all_measurements(self) -> list[dict]:
+        with open(self.path) as f:
+            return json.load(f)
+
+
+def _load_env():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv(ENV_PATH)
+
+
+def has_credentials() -> bool:
+    _load_env()
+    return bool(os.getenv("RENPHO_EMAIL") and os.getenv("RENPHO_PASSWORD"))
+
+
+def cloud_client():
+    from renpho import RenphoClient
+
+    _load_env()
+    return RenphoClient(os.getenv("RENPHO_EMAIL"), os.getenv("RENPHO_PASSWORD"))
+
+
+def _timestamp(m: dict):
+    # FIX: ONLY use the universal UNIX integer. Ignore Renpho's timezone-shifted text strings.
+    raw_time = m.get("timeStamp")
+    if not raw_time:
+        return None
+    raw_time = int(raw_time)
+    # Some scales report milliseconds
+    return raw_time // 1000 if raw_time > 1e12 else raw_time
+
+
+def _daily_rows(measurements: list[dict], since_ts: int) -> tuple[list[dict], int]:
+    """
+    Measurements newer than `since_ts` and on/after the baseline, one row
+    per local calendar day (the day's last weigh-in wins), oldest first.
+    Returns (rows, newest timestamp seen).
+    """
+    by_day = {}
+    newest = since_ts
+    for m in sorted(measurements, key=lambda m: _timestamp(m) or 0):
+        ts = _timestamp(m)
+        if ts is None or ts <= since_ts:
+            continue
+        newest = max(newest, ts)
+        # Translate universal epoch time directly to your computer's local timezone (Spain)
+        weigh_in_date = date.fromtimestamp(ts).isoformat()
+        if weigh_in_date >= CUTOFF_DATE:
+            by_day[weigh_in_date] = {"Date": weigh_in_date, **{col: m.get(f) or 0 for col, f in _FIELDS.items()}}
+    return [by_day[d] for d in sorted(by_day)], newest
+
+
+# ── Data lake (CSV) ──────────────────────────────────────────────────────────
+
+def _append_csv(rows: list[dict]):
+    """
+    Appends rows to the CSV. Rows are date-ordered, so only the tail can
+    hold dates the new rows replace (a second weigh-in on the last synced
+    day, or a previous run that wrote the CSV but not the DB); that tail
+    is cut before appending, so re-running never duplicates a day.
+    """
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    if not CSV_PATH.exists() or CSV_PATH.stat().st_size == 0:
+        writer.writeheader()
+    writer.writerows(rows)
+
+    with open(CSV_PATH, "a+b") as f:
+        cut, needs_newline = _tail_offset(f, rows[0]["Date"].encode())
+        f.truncate(cut)
+        if needs_newline:
+            f.write(b"\n")
+        f.write(buf.getvalue().encode())
+
+
+def _tail_offset(f, first_date: bytes, block: int = 64 * 1024) -> tuple[int, bool]:
+    """
+    (byte offset of the first data line dated >= first_date, or EOF if
+    none; whether the kept part lacks a final newline). Reads the file
+    backwards in growing blocks rather than whole.
+    """
+    end = f.seek(0, 2)
+    while True:
+        start = max(0, end - block)
+        f.seek(start)
+        lines = f.read().splitlines(keepends=True)
+        pos = start
+        if start > 0:
+            # The block may begin mid-line; skip the fragment
+            pos += len(lines[0])
+            lines = lines[1:]
+        first_pos = pos
+        for line in lines:
+            if line[:10] >= first_date and not line.startswith(b"Date"):
+                break
+            pos += len(line)
+        if start > 0 and pos == first_pos:
+            # Everything in this block is replaced: the cut lies further back
+            block *= 4
+            continue
+        needs_newline = pos == end and end > 0 and bool(lines) and not lines[-1].endswith(b"\n")
+        return pos, needs_newline
+
+
+def _rebuild_csv(rows: list[dict]):
+    """--full: rewrite the whole CSV (pandas is only imported on this path)."""
+    import pandas as pd
+
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame(rows, columns=CSV_COLUMNS).fillna(0)
+    df.to_csv(CSV_PATH, index=False)
+
+
+# ── SQLite ───────────────────────────────────────────────────────────────────
+
+def _ensure_tables(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS renpho_body_comp (
+            date TEXT PRIMARY KEY,
+            weight_kg REAL,
+            bmi REAL,
+            bodyfat_pct REAL,
+            water_pct REAL,
+            muscle_mass_kg REAL,
+            bone_mass_kg REAL,
+            bmr_kcal REAL,
+            visceral_fat REAL,
+            subcutaneous_fat_pct REAL,
+            protein_pct REAL,
+            metabolic_age REAL,
+            updated_at TEXT DEFAULT (datetime('now'))
+        )
+    """)
+    # Newest measurement timestamp already synced, per source
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            source TEXT PRIMARY KEY,
+            high_water_mark INTEGER NOT NULL,
+            synced_at TEXT DEFAULT (datetime('now'))
+        )
+    """)
+
+
+def _high_water_mark(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT high_water_mark FROM sync_state WHERE source = ?", (SYNC_SOURCE,)).fetchone()
+    return row[0] if row else 0
+
+
+def _write_to_db(conn: sqlite3.Connection, rows: list[dict], high_water_mark: int):
+    """Upserts the rows and advances the mark in one transaction (one executemany)."""
+    with conn:
+        conn.executemany("""
             INSERT OR REPLACE INTO renpho_body_comp (
                 date, weight_kg, bmi, bodyfat_pct, water_pct,
                 muscle_mass_kg, bone_mass_kg, bmr_kcal, visceral_fat,
                 subcutaneous_fat_pct, protein_pct, metabolic_age, updated_at
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-        """, (
-            row["Date"],
-            row.get("Weight_kg", 0),
-            row.get("BMI", 0),
-            row.get("BodyFat_pct", 0),
-            row.get("Water_pct", 0),
-            row.get("MuscleMass_kg", 0),
-            row.get("BoneMass_kg", 0),
-            row.get("BMR_kcal", 0),
-            row.get("VisceralFat", 0),
-            row.get("SubcutaneousFat_pct", 0),
-            row.get("Protein_pct", 0),
-            row.get("MetabolicAge", 0),
-        ))
-    conn.commit()
-    conn.close()
-    print(f"✓ Wrote {len(df)} records to DB (renpho_body_comp).")
-
-
-def fetch_from_cloud():
-    if not EMAIL or not PASSWORD:
-        print("❌ Error: RENPHO_EMAIL or RENPHO_PASSWORD not found in .env file.")
-        return
+        """, [tuple(r[c] for c in CSV_COLUMNS) for r in rows])
+        conn.execute("""
+            INSERT INTO sync_state (source, high_water_mark, synced_at) VALUES (?, ?, datetime('now'))
+            ON CONFLICT(source) DO UPDATE SET high_water_mark = excluded.high_water_mark, synced_at = excluded.synced_at
+        """, (SYNC_SOURCE, high_water_mark))
 
-    print(f"Authenticating with Renpho Cloud as {EMAIL}...")
+
+def _log_days(athlete_id, rows: list[dict]):
+    """Writes the daily rows through log_renpho_batch on the athlete's shard (gym.db for None)."""
+    from db.shards import shard_router
+    from services.metrics import log_renpho_batch
+
+    db = shard_router.get(athlete_id).SessionLocal()
     try:
-        client = RenphoClient(EMAIL, PASSWORD)
-        client.login()
-        print("✓ Login successful. Fetching ALL historical measurements...")
+        # 0 is how Renpho reports a field the scale did not measure
+        return log_renpho_batch(db, [{
+            "date": date.fromisoformat(r["Date"]),
+            "weight": r["Weight_kg"] or None,
+            "bf": r["BodyFat_pct"] or None,
+            "muscle": r["MuscleMass_kg"] or None,
+            "water": r["Water_pct"] or None,
+        } for r in rows])
+    finally:
+        db.close()
 
+
+def sync(client, full: bool = False, athlete_id: str = None) -> dict:
+    """
+    Fetches from `client` (RenphoClient or LocalRenphoClient) and writes
+    what is new into the athlete's shard. Returns {"fetched", "new_days",
+    "high_water_mark"}.
+    """
+    from db.shards import shard_router, shard_path
+
+    # Provision (migrate) the shard before the raw connection opens it
+    shard_router.get(athlete_id)
+    conn = sqlite3.connect(shard_path(athlete_id))
+    try:
+        _ensure_tables(conn)
+        since_ts = 0 if full else _high_water_mark(conn)
+
+        client.login()
         measurements = client.get_all_measurements()
-        
-        if not measurements:
-            print("No measurements found in this account.")
-            return
-
-        processed_data = []
-
-        for m in measurements:
-            # FIX: ONLY use the universal UNIX integer. Ignore Renpho's timezone-shifted text strings.
-            raw_time = m.get("timeStamp")
-            
-            if not raw_time:
-                continue
-                
-            # Translate universal epoch time directly to your computer's local timezone (Spain)
-            weigh_in_date = date.fromtimestamp(raw_time).isoformat()
-            
-            # Apply the Baseline filter
-            if weigh_in_date >= CUTOFF_DATE:
-                processed_data.append({
-                    "Date": weigh_in_date,
-                    "Weight_kg": m.get("weight"),
-                    "BMI": m.get("bmi"),
-                    "BodyFat_pct": m.get("bodyfat"),
-                    "Water_pct": m.get("water"),
-                    "MuscleMass_kg": m.get("muscle"),
-                    "BoneMass_kg": m.get("bone"),
-                    "BMR_kcal": m.get("bmr"),
-                    "VisceralFat": m.get("visfat"),
-                    "SubcutaneousFat_pct": m.get("subfat"),
-                    "Protein_pct": m.get("protein"),
-                    "MetabolicAge": m.get("bodyage"),
-                    # Temporarily store exact seconds for mathematically perfect sorting
-                    "_exact_time": raw_time 
-                })
-
-        if not processed_data:
-            print(f"No measurements found on or after {CUTOFF_DATE}.")
-            return
-
-        df = pd.DataFrame(processed_data)
-        df = df.fillna(0)
-        
-        # Sort by the exact second you stepped on the scale, oldest to newest
-        df = df.sort_values(by="_exact_time")
-        
-        # Now if there are duplicates for the same day, keep="last" accurately keeps the latest one
-        df = df.drop_duplicates(subset=["Date"], keep="last")
-        
-        # Remove the hidden sorting column before saving
-        df = df.drop(columns=["_exact_time"])
-
-        METRICS_DIR.mkdir(parents=True, exist_ok=True)
-        df.to_csv(CSV_PATH, index=False)
-
-        # ── Write to SQLite DB ───────────────────────────────────────────
-        _write_to_db(df)
-
-        print(f"✓ Success! Data Lake Refreshed.")
-        print(f"✓ Saved {len(df)} daily records starting from {CUTOFF_DATE}.")
+        rows, newest = _daily_rows(measurements or [], since_ts)
+
+        if rows:
+            # CSV first: it is safe to redo, so a failed DB write just repeats it next run
+            if full:
+                _rebuild_csv(rows)
+            else:
+                _append_csv(rows)
+            # Then the app's tables; the mark only moves once they hold the rows
+            _log_days(athlete_id, rows)
+        if newest > since_ts or full:
+            _write_to_db(conn, rows, newest)
+        return {"fetched": len(measurements or []), "new_days": len(rows), "high_water_mark": newest}
+    finally:
+        conn.close()
+
 
+def fetch_from_cloud(full: bool = False, from_json: str = None, athlete_id: str = None):
+    if from_json:
+        client = LocalRenphoClient(from_json)
+    elif not has_credentials():
+        print("❌ Error: RENPHO_EMAIL or RENPHO_PASSWORD not found in .env file.")
+        return
+    else:
+        print(f"Authenticating with Renpho Cloud as {os.getenv('RENPHO_EMAIL')}...")
+        client = cloud_client()
+    try:
+        res = sync(client, full=full, athlete_id=athlete_id)
     except Exception as e:
         print(f"❌ Failed to fetch from Renpho: {e}")
+        return
+
+    if not res["new_days"]:
+        print(f"✓ Up to date ({res['fetched']} measurements checked).")
+        return
+    print(f"✓ Synced {res['new_days']} new daily records (of {res['fetched']} measurements).")
+    print(f"✓ Written to body_composition and the bodyweight trend; data lake appended: {CSV_PATH}")
+
 
 if __name__ == "__main__":
-    fetch_from_cloud()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Incremental Renpho → CSV + SQLite sync")
+    parser.add_argument("--full", action="store_true", help="Ignore the high-water mark and rebuild from all history")
+    parser.add_argument("--from-json", help="Read measurements from a JSON dump instead of the Renpho cloud")
+    parser.add_argument("--athlete", help="Athlete shard to sync into (default: gym.db)")
+    args = parser.parse_args()
+    fetch_from_cloud(full=args.full, from_json=args.from_json, athlete_id=args.athlete)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+import_apple_health.py — Backfills daily_metrics from an Apple Health
+export (Health app → profile → Export All Health Data → export.xml).
+
+Streams the file, so multi-GB exports run in constant memory. Re-running
+is safe: days are upserted, not duplicated.
+
+    python import_apple_health.py path/to/export.xml
+    python import_apple_health.py export.xml --since 2026-01-01 --athlete alice
+"""
+import argparse
+from datetime import date
+
+from db.init import init_db, SessionLocal
+from services.apple_health import import_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import an Apple Health export.xml into daily_metrics")
+    parser.add_argument("export", help="Path to export.xml")
+    parser.add_argument("--since", type=date.fromisoformat, help="Skip days before YYYY-MM-DD")
+    parser.add_argument("--athlete", help="Athlete shard to import into (default: gym.db)")
+    args = parser.parse_args()
+
+    if args.athlete:
+        from db.shards import shard_router
+        db = shard_router.get(args.athlete).SessionLocal()
+    else:
+        init_db()
+        db = SessionLocal()
+
+    print(f"📥 Streaming {args.export}...")
+    try:
+        res = import_export(db, args.export, args.since, progress=lambda n: print(f"   {n:,} records..."))
+    finally:
+        db.close()
+    print(f"✓ {res['records']:,} records → {res['days']} days in {res['seconds']}s "
+          f"({res['records_per_sec']:,} records/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,51 @@
+import datetime
 from datetime import date
-from typing import List, Optional, Any
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Dict, List, Optional, Any
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import os
 import json
 from contextlib import asynccontextmanager
 
-from db.init import init_db, SessionLocal
-from db.schema import Exercise, BenchCycle, Session as DbSessionModel, DailyMetric
-from services.progression import compute_next_week, get_bench_cycle_targets, advance_bench_cycle, validate_session_data
-from services.session import create_session, get_all_sessions, get_session, log_set, edit_set
-from services.metrics import log_apple_health, log_renpho, get_recent_metrics, get_recent_body_composition
+from db.init import init_db
+from db.shards import shard_router, is_valid_athlete_id
+from db.schema import Exercise, BenchCycle, TrainingWeek, Session as DbSessionModel
+from services.progression import compute_exercise_plan, get_bench_cycle_targets, advance_bench_cycle, validate_session_data, invalidate_weight_ladder, plan_week, load_weekly_inputs_async, load_exercise_inputs_async
+from services.session import create_session, get_all_sessions, get_session, log_set, edit_set_async, delete_set_async, log_exercise_sets, log_exercise_sets_async, add_exercise_to_session
+from services.changes import MAX_CHANGES, get_changes_async
+from services.idempotency import IdempotencyConflict, request_fingerprint, find_response, find_response_async, store_response, store_response_async
+from services.aggregates import get_exercise_summary, get_volume_chart
+from services.bodyweight import get_bodyweight_trend
+from services.read_model import load_session_tree, load_session_trees
+from services.weeks import parse_day_label, resolve_week, get_weeks, find_day_session_id, get_latest_week, get_week_summary, get_set_day_async
+from services.response_cache import response_cache, invalidate_day, invalidate_bench
+from services.events import event_bus, publish_day, stream_events
+from services.scheduler import ingestion_scheduler, default_jobs
+from responses import (
+    StatusOut, MessageOut, SessionSummaryOut, SessionDetailOut, SessionCreatedOut, SetLoggedOut,
+    LegacySetLoggedOut, BulkLogOut, ChangesOut, WeekSummaryOut, PlanOut, WorkoutOut, WeeklyProgressionOut,
+    ExerciseSummaryOut, ExercisePlanOut, BenchTargetsOut, BenchCompleteOut, BodyweightTrendOut,
+    DailyMetricOut, BodyCompositionOut, BatchLoggedOut, IngestionJobOut, StatsOut, HasCompletedOut, MuscleLevelsOut, ChartOut, DashboardMetricsOut, ExerciseConfigOut, TargetsOut,
+)
+from services.metrics import log_apple_health_async, log_renpho_async, log_apple_health_batch_async, log_renpho_batch_async, get_recent_metrics_async, get_recent_body_composition_async
+from services.metric_rollups import get_metric_chart
+from services.muscle_levels import get_muscle_levels
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    # Metric sync jobs run in the background instead of before boot
+    for job in default_jobs():
+        ingestion_scheduler.register(job)
+    ingestion_scheduler.start()
     yield
+    await ingestion_scheduler.stop()
+    await shard_router.dispose_all()
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
@@ -27,13 +55,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def get_db():
-    db = SessionLocal()
+def get_athlete(x_athlete_id: Optional[str] = Header(None)):
+    # No header: the single-athlete gym.db, as before shards existed
+    if x_athlete_id is not None and not is_valid_athlete_id(x_athlete_id):
+        raise HTTPException(400, "Invalid X-Athlete-Id")
+    return x_athlete_id
+
+def get_db(athlete: Optional[str] = Depends(get_athlete)):
+    db = shard_router.get(athlete).SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db(athlete: Optional[str] = Depends(get_athlete)):
+    # Async routes hold no threadpool worker while waiting on SQLite.
+    # A shard's first access provisions its file, so do that off the loop.
+    shard = shard_router.get_open(athlete) or await run_in_threadpool(shard_router.get, athlete)
+    await shard_router.dispose_retired()
+    async with shard.AsyncSessionLocal() as db:
+        yield db
+
+def cached_json(request: Request, key: tuple, model, build):
+    """
+    Serves `key` from the response cache, calling build() and rendering it
+    through `model` only on a miss. Answers 304 when the client's
+    If-None-Match still matches.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        body = model.model_validate(build()).model_dump_json().encode()
+        entry = response_cache.put(key, body, generation)
+    etag, body = entry
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+def idempotent(db: Session, key: Optional[str], endpoint: str, payload, write):
+    """
+    Runs write() once per Idempotency-Key: a retry carrying the same key
+    replays the stored response. Without the header it just runs write().
+    """
+    if key is None:
+        return write()
+    fingerprint = request_fingerprint(endpoint, payload)
+    try:
+        stored = find_response(db, key, fingerprint)
+        if stored is not None:
+            return stored
+        return store_response(db, key, fingerprint, write())
+    except IdempotencyConflict:
+        raise HTTPException(409, "Idempotency-Key was already used with a different request")
+
+async def idempotent_async(db: AsyncSession, key: Optional[str], endpoint: str, payload, write):
+    if key is None:
+        return await write()
+    fingerprint = request_fingerprint(endpoint, payload)
+    try:
+        stored = await find_response_async(db, key, fingerprint)
+        if stored is not None:
+            return stored
+        return await store_response_async(db, key, fingerprint, await write())
+    except IdempotencyConflict:
+        raise HTTPException(409, "Idempotency-Key was already used with a different request")
+
 
 # Pydantic Models
 class SessionCreate(BaseModel):
@@ -50,6 +136,21 @@ class SetEdit(BaseModel):
     weight_kg: Optional[float] = None
     reps: Optional[int] = None
 
+class ExerciseSetsLog(BaseModel):
+    exercise_id: int
+    sets: List[SetCreate]
+
+class BulkLogPayload(BaseModel):
+    week_id: int
+    day: int
+    # datetime.date: a bare `date` annotation would resolve to this field's None default
+    date: Optional[datetime.date] = None
+    exercises: List[ExerciseSetsLog] = []
+    # Single-exercise shape sent by the frontend's logExercise()
+    exercise_id: Optional[int] = None
+    actual_weight: Optional[List[float]] = None
+    actual_reps: Optional[List[int]] = None
+
 class BenchComplete(BaseModel):
     completed_weight_kg: float
 
@@ -73,45 +174,50 @@ class ExerciseConfigUpdate(BaseModel):
     substitution_id: Optional[int] = None
 
 
-@app.get("/health")
+@app.get("/health", response_model=StatusOut)
 def health_check():
     return {"status": "ok"}
 
 
 # SESSIONS
-@app.get("/sessions")
+@app.get("/sessions", response_model=List[SessionSummaryOut])
 def list_sessions(db: Session = Depends(get_db)):
     sessions = get_all_sessions(db)
     return [{"id": s.id, "date": s.date, "day_label": s.day_label, "week_number": s.week_number} for s in sessions]
 
-@app.get("/sessions/{session_id}")
+@app.get("/sessions/{session_id}", response_model=SessionDetailOut)
 def get_session_detail(session_id: int, db: Session = Depends(get_db)):
-    s = get_session(db, session_id)
+    s = load_session_tree(db, session_id)
     if not s:
         raise HTTPException(404, "Session not found")
     res = {
-        "id": s.id,
-        "date": s.date,
-        "day_label": s.day_label,
+        "id": s["id"],
+        "date": s["date"],
+        "day_label": s["day_label"],
          "exercises": []
     }
-    for se in s.session_exercises:
+    for se in s["exercises"]:
         ex_data = {
-            "session_exercise_id": se.id,
-            "exercise_id": se.exercise_id,
-            "exercise_name": se.exercise.name,
-            "order": se.exercise_order,
-            "sets": [{"id": st.id, "set": st.set_number, "weight": st.weight_kg, "reps": st.reps, "e1rm": st.e1rm} for st in se.sets]
+            "session_exercise_id": se["id"],
+            "exercise_id": se["exercise_id"],
+            "exercise_name": se["exercise_name"],
+            "order": se["exercise_order"],
+            "sets": [{"id": st["id"], "set": st["set_number"], "weight": st["weight_kg"], "reps": st["reps"], "e1rm": st["e1rm"]} for st in se["sets"]]
         }
         res["exercises"].append(ex_data)
     return res
 
-@app.post("/sessions")
-def create_new_session(payload: SessionCreate, db: Session = Depends(get_db)):
-    s = create_session(db, payload.date, payload.day_label, payload.week_number)
-    return {"status": "created", "session_id": s.id}
-
-@app.post("/sessions/{session_id}/complete")
+@app.post("/sessions", response_model=SessionCreatedOut)
+def create_new_session(payload: SessionCreate, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete), idempotency_key: Optional[str] = Header(None)):
+    def write():
+        new_week = db.get(TrainingWeek, payload.week_number) is None
+        s = create_session(db, payload.date, payload.day_label, payload.week_number)
+        invalidate_day(athlete, s.week_number, s.day_number, new_week)
+        publish_day(athlete, "session_created", s.week_number, s.day_number, s.id)
+        return {"status": "created", "session_id": s.id}
+    return idempotent(db, idempotency_key, "POST /sessions", payload.model_dump(mode="json"), write)
+
+@app.post("/sessions/{session_id}/complete", response_model=MessageOut)
 def complete_session(session_id: int, db: Session = Depends(get_db)):
     s = get_session(db, session_id)
     if not s:
@@ -121,84 +227,149 @@ def complete_session(session_id: int, db: Session = Depends(get_db)):
 
 
 # SETS
-@app.post("/sessions/{session_id}/exercises/{exercise_id}/sets")
-def add_set(session_id: int, exercise_id: int, payload: SetCreate, db: Session = Depends(get_db)):
+@app.post("/sessions/{session_id}/exercises/{exercise_id}/sets", response_model=SetLoggedOut)
+def add_set(session_id: int, exercise_id: int, payload: SetCreate, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete), idempotency_key: Optional[str] = Header(None)):
     s = get_session(db, session_id)
     if not s:
          raise HTTPException(404, "Session not found")
-         
-    se = next((e for e in s.session_exercises if e.exercise_id == exercise_id), None)
-    if not se:
-        from services.session import add_exercise_to_session
-        order = len(s.session_exercises) + 1
-        se = add_exercise_to_session(db, session_id, exercise_id, order)
-        
-    st = log_set(db, se.id, payload.set_number, payload.weight_kg, payload.reps)
-    return {"status": "logged", "set_id": st.id}
 
-@app.put("/sets/{set_id}")
-def edit_set_endpoint(set_id: int, payload: SetEdit, db: Session = Depends(get_db)):
-    st = edit_set(db, set_id, payload.weight_kg, payload.reps)
+    def write():
+        # Get-or-create: returns the existing session_exercise if there is one
+        se = add_exercise_to_session(db, session_id, exercise_id, len(s.session_exercises) + 1)
+        st = log_set(db, se.id, payload.set_number, payload.weight_kg, payload.reps)
+        invalidate_day(athlete, s.week_number, s.day_number)
+        publish_day(athlete, "set_logged", s.week_number, s.day_number, session_id,
+                    set_ids={exercise_id: [st.id]})
+        return {"status": "logged", "set_id": st.id}
+    return idempotent(db, idempotency_key, f"POST /sessions/{session_id}/exercises/{exercise_id}/sets", payload.model_dump(), write)
+
+@app.put("/sets/{set_id}", response_model=StatusOut)
+async def edit_set_endpoint(set_id: int, payload: SetEdit, db: AsyncSession = Depends(get_async_db), athlete: Optional[str] = Depends(get_athlete)):
+    key = await get_set_day_async(db, set_id)
+    st = await edit_set_async(db, set_id, payload.weight_kg, payload.reps)
     if not st:
         raise HTTPException(404, "Set not found")
+    invalidate_day(athlete, key.week_number, key.day_number)
+    publish_day(athlete, "set_edited", key.week_number, key.day_number, key.session_id,
+                set_id=set_id, weight_kg=st.weight_kg, reps=st.reps)
     return {"status": "edited"}
 
-@app.post("/log/set")
-def log_single_set_legacy(payload: dict, db: Session = Depends(get_db)):
+@app.delete("/sets/{set_id}", response_model=StatusOut)
+async def delete_set_endpoint(set_id: int, db: AsyncSession = Depends(get_async_db), athlete: Optional[str] = Depends(get_athlete)):
+    key = await get_set_day_async(db, set_id)
+    if not await delete_set_async(db, set_id):
+        raise HTTPException(404, "Set not found")
+    invalidate_day(athlete, key.week_number, key.day_number)
+    publish_day(athlete, "set_deleted", key.week_number, key.day_number, key.session_id, set_id=set_id)
+    return {"status": "deleted"}
+
+@app.post("/log/set", response_model=LegacySetLoggedOut)
+def log_single_set_legacy(payload: dict, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete), idempotency_key: Optional[str] = Header(None)):
     # This matches the old frontend's api.post('/log/set', payload)
     # The frontend payload usually has:
     # { week_id, day, exercise_id, set_idx, weight, reps }
-    # Or something similar. Since it wasn't strictly typed matching our new schema:
-    session = db.query(DbSessionModel).filter(DbSessionModel.week_number == payload.get("week_id"), DbSessionModel.day_label.like(f"%Day{payload.get('day')}%")).first()
-    if not session:
-        session = create_session(db, date.today(), f"Day{payload.get('day')}_Workout", payload.get("week_id"))
-        
-    se = next((e for e in session.session_exercises if e.exercise_id == payload.get("exercise_id")), None)
-    if not se:
-        from services.session import add_exercise_to_session
-        order = len(session.session_exercises) + 1
-        se = add_exercise_to_session(db, session.id, payload.get("exercise_id"), order)
-        
-    st = log_set(db, se.id, payload.get("set_idx", 1), payload.get("weight", 0), payload.get("reps", 0))
-    return {"success": True, "set_id": st.id}
+    # or the logSet() shape { ..., set_number, actual_weight, actual_reps }
+    week_id, day, exercise_id = payload.get("week_id"), payload.get("day"), payload.get("exercise_id")
+    set_number = payload.get("set_idx", payload.get("set_number", 1))
+    weight = payload.get("weight", payload.get("actual_weight", 0))
+    reps = payload.get("reps", payload.get("actual_reps", 0))
+
+    def write():
+        new_week = db.get(TrainingWeek, week_id) is None
+        res = log_exercise_sets(db, week_id, day, [{
+            "exercise_id": exercise_id,
+            "sets": [{"set_number": set_number, "weight_kg": weight, "reps": reps}],
+        }])
+        invalidate_day(athlete, week_id, day, new_week)
+        publish_day(athlete, "set_logged", week_id, day, res["session_id"], set_ids=res["set_ids"])
+        return {"success": True, "set_id": res["set_ids"][exercise_id][0]}
+    return idempotent(db, idempotency_key, "POST /log/set", payload, write)
     
-@app.put("/log/edit")
-def edit_set_legacy(payload: dict, db: Session = Depends(get_db)):
+@app.post("/log", response_model=BulkLogOut)
+async def log_exercises_bulk(payload: BulkLogPayload, db: AsyncSession = Depends(get_async_db), athlete: Optional[str] = Depends(get_athlete), idempotency_key: Optional[str] = Header(None)):
+    exercises = [{"exercise_id": e.exercise_id, "sets": [s.model_dump() for s in e.sets]} for e in payload.exercises]
+    if payload.exercise_id is not None and payload.actual_weight is not None and payload.actual_reps is not None:
+        exercises.append({
+            "exercise_id": payload.exercise_id,
+            "sets": [
+                {"set_number": i + 1, "weight_kg": w, "reps": r}
+                for i, (w, r) in enumerate(zip(payload.actual_weight, payload.actual_reps))
+            ]
+        })
+    if not exercises:
+        raise HTTPException(422, "No sets to log")
+
+    async def write():
+        new_week = await db.get(TrainingWeek, payload.week_id) is None
+        res = await log_exercise_sets_async(db, payload.week_id, payload.day, exercises, payload.date)
+        invalidate_day(athlete, payload.week_id, payload.day, new_week)
+        publish_day(athlete, "set_logged", payload.week_id, payload.day, res["session_id"], set_ids=res["set_ids"])
+        return {"success": True, **res}
+    return await idempotent_async(db, idempotency_key, "POST /log", payload.model_dump(mode="json"), write)
+
+@app.put("/log/edit", response_model=StatusOut)
+async def edit_set_legacy(payload: dict, db: AsyncSession = Depends(get_async_db), athlete: Optional[str] = Depends(get_athlete)):
     # Legacy wrapper for editSet(payload)
-    return edit_set_endpoint(payload.get("set_id"), SetEdit(weight_kg=payload.get("weight"), reps=payload.get("reps")), db)
+    return await edit_set_endpoint(payload.get("set_id"), SetEdit(weight_kg=payload.get("weight"), reps=payload.get("reps")), db, athlete)
+
+# CHANGE FEED
+@app.get("/changes", response_model=ChangesOut)
+async def read_changes(since: int = 0, limit: int = MAX_CHANGES, db: AsyncSession = Depends(get_async_db)):
+    # Delta sync: clients keep the returned `revision` and poll with it
+    # instead of refetching /workout after every write
+    return await get_changes_async(db, since, max(1, min(limit, MAX_CHANGES)))
+
+# LIVE UPDATES
+@app.get("/events", response_class=StreamingResponse)
+async def live_events(request: Request, week_id: Optional[int] = None, session_id: Optional[int] = None, athlete: Optional[str] = Depends(get_athlete)):
+    # Server-sent events for a week and/or session (everything when neither
+    # is given): set_logged, set_edited, set_deleted, session_created,
+    # bench_advanced, and `dropped` when this client fell behind
+    topics = set()
+    if week_id is not None:
+        topics.add(("week", week_id))
+    if session_id is not None:
+        topics.add(("session", session_id))
+    return StreamingResponse(
+        stream_events(athlete, topics or None, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # PLAN AND WORKOUT VIEWS
-@app.get("/plan")
-def get_plan(week_id: Optional[int] = None, db: Session = Depends(get_db)):
+@app.get("/weeks", response_model=WeekSummaryOut)
+def read_week_summary(week_id: Optional[int] = None, db: Session = Depends(get_db)):
+    return get_week_summary(db, week_id)
+
+@app.get("/plan", response_model=PlanOut)
+def get_plan(request: Request, week_id: Optional[int] = None, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete)):
+    target_week = resolve_week(db, week_id)
+    return cached_json(request, (athlete, "plan", target_week), PlanOut, lambda: build_plan(db, target_week))
+
+def build_plan(db: Session, target_week: int):
     # Group sessions by week
-    target_week = week_id or db.query(DbSessionModel.week_number).order_by(DbSessionModel.week_number.desc()).first()[0] if db.query(DbSessionModel).count() > 0 else 1
-    
-    sessions = db.query(DbSessionModel).filter(DbSessionModel.week_number == target_week).all()
-    all_weeks = sorted(list(set([s.week_number for s in db.query(DbSessionModel).all()])))
+    sessions = load_session_trees(db, DbSessionModel.week_number == target_week)
+    all_weeks = get_weeks(db)
     if target_week not in all_weeks:
         all_weeks.append(target_week)
         
     days_dict = {}
     for s in sessions:
         # Day label format typically f"Day{day}_{day_name}" or similar backfill
-        try:
-            day_num = int(s.day_label.split('_')[0].replace('Day', ''))
-            day_name = s.day_label.split('_')[1] if '_' in s.day_label else "Workout"
-        except:
-            day_num = len(days_dict) + 1
-            day_name = "Workout"
+        day_num = s["day_number"] if s["day_number"] is not None else len(days_dict) + 1
+        day_name = parse_day_label(s["day_label"])[1]
             
         exercises = []
-        for se in s.session_exercises:
+        for se in s["exercises"]:
             ex_data = {
-                "exercise_id": se.exercise_id,
-                "exercise": se.exercise.name,
-                "sets": len(se.sets) if se.sets else 3,
-                "target_reps": se.exercise.rep_ceiling,
-                "weights": [st.weight_kg for st in se.sets]
+                "exercise_id": se["exercise_id"],
+                "exercise": se["exercise_name"],
+                "sets": len(se["sets"]) if se["sets"] else 3,
+                "target_reps": se["rep_ceiling"],
+                "weights": [st["weight_kg"] for st in se["sets"]]
             }
-            if se.is_superset:
-                 ex_data["superset_group"] = se.superset_group
+            if se["is_superset"]:
+                 ex_data["superset_group"] = se["superset_group"]
             exercises.append(ex_data)
                
         days_dict[str(day_num)] = {
@@ -229,11 +400,14 @@ def get_plan(week_id: Optional[int] = None, db: Session = Depends(get_db)):
         "days": template_days
     }
 
-@app.get("/workout/{day_id}")
-def get_workout(day_id: int, week_id: Optional[int] = None, db: Session = Depends(get_db)):
-    target_week = week_id or db.query(DbSessionModel.week_number).order_by(DbSessionModel.week_number.desc()).first()[0] if db.query(DbSessionModel).count() > 0 else 1
-    day_str_match = f"Day{day_id}%"
-    session = db.query(DbSessionModel).filter(DbSessionModel.week_number == target_week, DbSessionModel.day_label.like(day_str_match)).first()
+@app.get("/workout/{day_id}", response_model=WorkoutOut)
+def get_workout(request: Request, day_id: int, week_id: Optional[int] = None, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete)):
+    target_week = resolve_week(db, week_id)
+    return cached_json(request, (athlete, "workout", target_week, day_id), WorkoutOut, lambda: build_workout(db, target_week, day_id))
+
+def build_workout(db: Session, target_week: int, day_id: int):
+    session_id = find_day_session_id(db, target_week, day_id)
+    session = load_session_tree(db, session_id) if session_id else None
     
     if not session:
          # Return an empty template rather than nothing so ExerciseCards can render
@@ -247,26 +421,27 @@ def get_workout(day_id: int, week_id: Optional[int] = None, db: Session = Depend
          }
          
     exercises = []
-    for se in session.session_exercises:
+    for se in session["exercises"]:
+        se_sets = se["sets"]
         sets_data = []
-        for i in range(max(3, len(se.sets))):
-            st = se.sets[i] if i < len(se.sets) else None
+        for i in range(max(3, len(se_sets))):
+            st = se_sets[i] if i < len(se_sets) else None
             sets_data.append({
                 "set": i + 1,
-                "actual_weight": st.weight_kg if st else "",
-                "actual_reps": st.reps if st else ""
+                "actual_weight": st["weight_kg"] if st else "",
+                "actual_reps": st["reps"] if st else ""
             })
             
         ex_data = {
-            "exercise_id": se.exercise_id,
-            "exercise": se.exercise.name,
+            "exercise_id": se["exercise_id"],
+            "exercise": se["exercise_name"],
             "sets": len(sets_data),
-            "target_reps": se.exercise.rep_ceiling,
-            "target_weights": [st.weight_kg for st in se.sets] if se.sets else [""] * max(3, len(se.sets)),
+            "target_reps": se["rep_ceiling"],
+            "target_weights": [st["weight_kg"] for st in se_sets] if se_sets else [""] * max(3, len(se_sets)),
             "sets_data": sets_data
         }
-        if se.is_superset:
-             ex_data["superset_group"] = se.superset_group
+        if se["is_superset"]:
+             ex_data["superset_group"] = se["superset_group"]
         exercises.append(ex_data)
 
     return {
@@ -278,96 +453,128 @@ def get_workout(day_id: int, week_id: Optional[int] = None, db: Session = Depend
 
 
 # PROGRESSION
-@app.get("/progression/{exercise_id}")
-def get_exercise_progression(exercise_id: int, db: Session = Depends(get_db)):
-    # Gather historical sessions
-    sessions_hist = []
-    # simplistic extraction for demonstration; in prod, query join carefully
+# Declared before /progression/{exercise_id} so "week" is not parsed as an id.
+# Plans exclude unset fields: substitution_flag is only sent on flagged sets.
+@app.get("/progression/week", response_model=WeeklyProgressionOut, response_model_exclude_unset=True)
+async def get_weekly_progression(db: AsyncSession = Depends(get_async_db)):
+    return {"exercises": plan_week(*await load_weekly_inputs_async(db))}
+
+@app.get("/progression/{exercise_id}/summary", response_model=ExerciseSummaryOut)
+def get_exercise_summary_endpoint(exercise_id: int, db: Session = Depends(get_db)):
     ex = db.query(Exercise).filter(Exercise.id == exercise_id).first()
     if not ex:
          raise HTTPException(404, "Exercise not found")
-         
-    from db.schema import SessionExercise
-    history = db.query(SessionExercise).filter(SessionExercise.exercise_id == exercise_id).all()
-    
-    for h in history:
-        sets = [{"weight_kg": st.weight_kg, "reps": st.reps} for st in h.sets]
-        sessions_hist.append({"exercise_order": h.exercise_order, "sets": sets})
-        
-    metrics = db.query(DailyMetric).order_by(DailyMetric.date.asc()).all()
-    metric_list = [{"bodyweight_kg": m.bodyweight_kg} for m in metrics]
-    
-    plan = compute_next_week(exercise_id, sessions_hist, metric_list, db)
+    return {"exercise": ex.name, **get_exercise_summary(db, exercise_id)}
+
+@app.get("/progression/{exercise_id}", response_model=ExercisePlanOut, response_model_exclude_unset=True)
+async def get_exercise_progression(exercise_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Latest sessions only, oldest first, sets eager-loaded in one query
+    ex, sessions_hist, bw_delta = await load_exercise_inputs_async(db, exercise_id)
+    if not ex:
+         raise HTTPException(404, "Exercise not found")
+
+    plan = compute_exercise_plan(ex, sessions_hist, [], bw_delta)
     return {"exercise": ex.name, "plan": plan}
 
-@app.get("/progression/week")
-def get_weekly_progression(db: Session = Depends(get_db)):
-    return {"status": "not_implemented"}
 
 
 # BENCH CYCLE
-@app.get("/bench/current")
+@app.get("/bench/current", response_model=BenchTargetsOut, response_model_exclude_unset=True)
 def get_current_bench(db: Session = Depends(get_db)):
     bc = db.query(BenchCycle).first()
     if not bc:
         return get_bench_cycle_targets(67.5, 1) # fallback
     return get_bench_cycle_targets(bc.bench_pr_kg, bc.cycle_week)
 
-@app.post("/bench/complete")
-def complete_bench(payload: BenchComplete, db: Session = Depends(get_db)):
+@app.post("/bench/complete", response_model=BenchCompleteOut)
+def complete_bench(payload: BenchComplete, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete)):
     bc = db.query(BenchCycle).first()
     if not bc:
          raise HTTPException(404, "Bench cycle absent")
     res = advance_bench_cycle(bc.cycle_week, payload.completed_weight_kg, bc.bench_pr_kg, db)
+    invalidate_bench(athlete)
+    event_bus.publish(athlete, "bench_advanced", **res)
     return {"status": "advanced", "new_cycle": res}
 
 
 # METRICS
-@app.post("/metrics/apple_health")
-def apple_health_hook(payload: AppleHealthPayload, db: Session = Depends(get_db)):
-    log_apple_health(db, payload.date, payload.active_energy, payload.resting_energy, payload.steps, payload.km_distance, payload.sleep_total_hrs)
+@app.post("/metrics/apple_health", response_model=StatusOut)
+async def apple_health_hook(payload: AppleHealthPayload, db: AsyncSession = Depends(get_async_db)):
+    await log_apple_health_async(db, payload.date, payload.active_energy, payload.resting_energy, payload.steps, payload.km_distance, payload.sleep_total_hrs)
     return {"status": "logged"}
 
-@app.post("/metrics/body_composition")
-def body_comp_hook(payload: BodyCompPayload, db: Session = Depends(get_db)):
-    log_renpho(db, payload.date, payload.weight_kg, payload.body_fat_pct, payload.muscle_mass_kg, payload.water_pct)
+@app.post("/metrics/body_composition", response_model=StatusOut)
+async def body_comp_hook(payload: BodyCompPayload, db: AsyncSession = Depends(get_async_db)):
+    await log_renpho_async(db, payload.date, payload.weight_kg, payload.body_fat_pct, payload.muscle_mass_kg, payload.water_pct)
     return {"status": "logged"}
 
-@app.get("/metrics/daily")
-def read_daily_metrics(db: Session = Depends(get_db)):
-    return get_recent_metrics(db)
-
-@app.get("/metrics/body_composition")
-def read_body_comp(db: Session = Depends(get_db)):
-    return get_recent_body_composition(db)
+# Backfills: a JSON array of the single-day payloads above, one transaction
+@app.post("/metrics/apple_health/batch", response_model=BatchLoggedOut)
+async def apple_health_batch(payload: List[AppleHealthPayload], db: AsyncSession = Depends(get_async_db)):
+    days = await log_apple_health_batch_async(db, [{
+        "date": p.date, "active_cal": p.active_energy, "resting_cal": p.resting_energy,
+        "steps": p.steps, "distance_km": p.km_distance, "sleep_hours": p.sleep_total_hrs,
+    } for p in payload])
+    return {"status": "logged", "days": days}
+
+@app.post("/metrics/body_composition/batch", response_model=BatchLoggedOut)
+async def body_comp_batch(payload: List[BodyCompPayload], db: AsyncSession = Depends(get_async_db)):
+    days = await log_renpho_batch_async(db, [{
+        "date": p.date, "weight": p.weight_kg, "bf": p.body_fat_pct,
+        "muscle": p.muscle_mass_kg, "water": p.water_pct,
+    } for p in payload])
+    return {"status": "logged", "days": days}
+
+@app.get("/metrics/bodyweight_trend", response_model=BodyweightTrendOut)
+def read_bodyweight_trend(db: Session = Depends(get_db)):
+    return get_bodyweight_trend(db) or {}
+
+@app.get("/metrics/daily", response_model=List[DailyMetricOut])
+async def read_daily_metrics(db: AsyncSession = Depends(get_async_db)):
+    return await get_recent_metrics_async(db)
+
+@app.get("/metrics/body_composition", response_model=List[BodyCompositionOut])
+async def read_body_comp(db: AsyncSession = Depends(get_async_db)):
+    return await get_recent_body_composition_async(db)
+
+@app.get("/muscle-levels", response_model=MuscleLevelsOut)
+def read_muscle_levels(db: Session = Depends(get_db)):
+    # Stored decayed loads, decayed once more to today: one small read
+    return get_muscle_levels(db)
+
+# BACKGROUND INGESTION
+@app.get("/ingestion/status", response_model=List[IngestionJobOut])
+def ingestion_status():
+    return ingestion_scheduler.status()
+
+@app.post("/ingestion/{job_name}/run", response_model=IngestionJobOut)
+async def run_ingestion_job(job_name: str):
+    if job_name not in ingestion_scheduler.jobs:
+        raise HTTPException(404, "Unknown ingestion job")
+    # Starts the run and answers straight away; poll /ingestion/status for the outcome
+    if not await ingestion_scheduler.trigger(job_name):
+        raise HTTPException(409, "Job is already running")
+    return ingestion_scheduler.jobs[job_name].status()
 
-@app.get("/muscle-levels")
-def get_muscle_levels():
-    # Legacy RPG styling mock
-    return {
-        "chest": 15, "back": 12, "legs": 18, 
-        "shoulders": 10, "arms": 11, "core": 8, "calves": 5
-    }
 
 # LEGACY FRONTEND ALIGNMENT ENDPOINTS
-@app.get("/stats")
-def get_stats(db: Session = Depends(get_db)):
-    target_week = db.query(DbSessionModel.week_number).order_by(DbSessionModel.week_number.desc()).first()[0] if db.query(DbSessionModel).count() > 0 else 1
+@app.get("/stats", response_model=StatsOut)
+def get_stats(request: Request, db: Session = Depends(get_db), athlete: Optional[str] = Depends(get_athlete)):
+    target_week = resolve_week(db)
+    return cached_json(request, (athlete, "stats", target_week), StatsOut, lambda: build_stats(db, target_week))
+
+def build_stats(db: Session, target_week: int):
     bc = db.query(BenchCycle).first()
     
-    sessions = db.query(DbSessionModel).filter(DbSessionModel.week_number == target_week).all()
+    sessions = load_session_trees(db, DbSessionModel.week_number == target_week)
     day_completion = []
     
     for s in sessions:
-        try:
-            day_num = int(s.day_label.split('_')[0].replace('Day', ''))
-            day_name = s.day_label.split('_')[1] if '_' in s.day_label else "Workout"
-        except:
-            day_num = len(day_completion) + 1
-            day_name = "Workout"
+        day_num = s["day_number"] if s["day_number"] is not None else len(day_completion) + 1
+        day_name = parse_day_label(s["day_label"])[1]
             
-        planned = len(s.session_exercises)
-        logged = sum(1 for se in s.session_exercises if len(se.sets) > 0)
+        planned = len(s["exercises"])
+        logged = sum(1 for se in s["exercises"] if len(se["sets"]) > 0)
         
         day_completion.append({
             "day": day_num,
@@ -395,58 +602,48 @@ def get_stats(db: Session = Depends(get_db)):
         "day_completion": day_completion
     }
 
-@app.get("/has-completed-days")
+@app.get("/has-completed-days", response_model=HasCompletedOut)
 def check_has_completed_days(db: Session = Depends(get_db)):
     # Check if any sessions exist
-    count = db.query(DbSessionModel).count()
-    return {"has_completed": count > 0}
+    return {"has_completed": get_latest_week(db) is not None}
 
-@app.post("/complete-day")
+@app.post("/complete-day", response_model=StatusOut)
 def complete_day_legacy(week_id: int, day: int, db: Session = Depends(get_db)):
     # Mark day as completed
     return {"status": "ok"}
     
-@app.post("/complete-exercise")
+@app.post("/complete-exercise", response_model=StatusOut)
 def complete_exercise_legacy(week_id: int, day: int, payload: list, db: Session = Depends(get_db)):
     return {"status": "ok"}
     
-@app.get("/dashboard/volume")
-def get_volume(db: Session = Depends(get_db)):
-    # Legacy chart volume mock
-    return {
-        "labels": ["Week 1", "Week 2", "Week 3", "Week 4"],
-        "datasets": [
-            {
-                "label": "Total Volume (kg)",
-                "data": [10000, 11000, 12500, 13000]
-            }
-        ]
-    }
+@app.get("/dashboard/volume", response_model=ChartOut)
+def get_volume(from_week: Optional[int] = None, to_week: Optional[int] = None, group_by: str = "muscle_group",
+               metric: str = "tonnage", db: Session = Depends(get_db)):
+    # Weekly tonnage or hard sets per muscle group/tier from the volume cube
+    try:
+        return get_volume_chart(db, from_week, to_week, group_by, metric)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-@app.get("/dashboard/metrics")
-def get_dashboard_metrics(range: str = "7d", db: Session = Depends(get_db)):
-    # Legacy chart metrics mock
-    return {
-        "labels": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-        "datasets": [
-            {
-                "label": "Bodyweight",
-                "yAxisID": "y",
-                "data": [65, 65.5, 65.2, 65, 64.8, 65, 65.1]
-            }
-        ]
-    }
+@app.get("/dashboard/metrics", response_model=DashboardMetricsOut)
+def get_dashboard_metrics(range: str = "7d", stat: str = "mean", db: Session = Depends(get_db)):
+    # Daily points up to 30 days, weekly/monthly rollups beyond
+    try:
+        chart = get_metric_chart(db, range, stat)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {**chart, "targets": get_targets() or None}
 
 
 
 
 # CONFIG
-@app.get("/config/exercises")
+@app.get("/config/exercises", response_model=List[ExerciseConfigOut])
 def list_exercises(db: Session = Depends(get_db)):
     exs = db.query(Exercise).all()
     return [{"id": e.id, "name": e.name, "muscle": e.muscle_group, "weights_available": e.weights_available} for e in exs]
 
-@app.put("/config/exercises/{exercise_id}")
+@app.put("/config/exercises/{exercise_id}", response_model=StatusOut)
 def update_exercise_config(exercise_id: int, payload: ExerciseConfigUpdate, db: Session = Depends(get_db)):
     ex = db.query(Exercise).filter(Exercise.id == exercise_id).first()
     if not ex:
@@ -456,9 +653,11 @@ def update_exercise_config(exercise_id: int, payload: ExerciseConfigUpdate, db:
     if payload.substitution_id is not None:
          ex.substitution_id = payload.substitution_id
     db.commit()
+    if payload.weights_available is not None:
+         invalidate_weight_ladder(exercise_id)
     return {"status": "updated"}
 
-@app.get("/config/targets")
+@app.get("/config/targets", response_model=TargetsOut)
 def get_targets():
     targets_path = os.path.join(os.path.dirname(__file__), 'config', 'targets.json')
     try:
@@ -467,7 +666,7 @@ def get_targets():
     except:
         return {}
         
-@app.put("/config/targets")
+@app.put("/config/targets", response_model=StatusOut)
 def update_targets(payload: dict):
     targets_path = os.path.join(os.path.dirname(__file__), 'config', 'targets.json')
     with open(targets_path, 'w') as f:
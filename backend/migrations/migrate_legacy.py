@@ -5,6 +5,9 @@ import glob
 from datetime import datetime
 from sqlalchemy.orm import Session
 from db.init import SessionLocal, init_db
+from services.aggregates import rebuild_exercise_week_stats
+from services.bodyweight import rebuild_bodyweight_trend
+from services.weeks import rebuild_training_weeks, parse_day_label
 from db.schema import (
     Session as DbSession, SessionExercise, Set,
     DailyMetric, BodyComposition, Exercise
@@ -43,7 +46,8 @@ def migrate_workouts(db: Session):
         session = DbSession(
             date=date_obj,
             day_label=day_label,
-            week_number=week_num
+            week_number=week_num,
+            day_number=parse_day_label(day_label)[0]
         )
         db.add(session)
         db.flush() # get session.id
@@ -188,6 +192,9 @@ if __name__ == '__main__':
         migrate_workouts(db)
         migrate_apple_health(db)
         migrate_body_comp(db)
+        rebuild_exercise_week_stats(db)
+        rebuild_bodyweight_trend(db)
+        rebuild_training_weeks(db)
         print("Migration complete!")
     finally:
         db.close()
@@ -0,0 +1,7 @@
+"""Every table declared in db/schema.py that the file does not have yet."""
+from db.schema import Base
+
+def upgrade(conn):
+    # checkfirst: leaves existing tables alone, so this is a no-op on a
+    # current gym.db and builds the full schema on an empty one
+    Base.metadata.create_all(bind=conn)
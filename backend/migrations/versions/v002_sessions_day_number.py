@@ -0,0 +1,5 @@
+"""sessions.day_number, parsed from day_label; init_db backfills NULL rows."""
+from db.migrate import add_column
+
+def upgrade(conn):
+    add_column(conn, "sessions", "day_number", "INTEGER")
@@ -0,0 +1,11 @@
+"""
+Indexes behind the per-request lookups: a day's session by (week, day),
+an exercise's history, a session's exercises and a session_exercise's sets.
+"""
+from db.migrate import create_index
+
+def upgrade(conn):
+    create_index(conn, "ix_sessions_week_day", "sessions", ["week_number", "day_number"])
+    create_index(conn, "ix_session_exercises_exercise_session", "session_exercises", ["exercise_id", "session_id"])
+    create_index(conn, "ix_session_exercises_session_order", "session_exercises", ["session_id", "exercise_order"])
+    create_index(conn, "ix_sets_session_exercise_set_number", "sets", ["session_exercise_id", "set_number"])
@@ -0,0 +1,13 @@
+"""
+One body_composition row per (date, source). Older files could hold
+repeats from re-run imports; the newest row of each pair is kept.
+"""
+from sqlalchemy import text
+from db.migrate import create_index
+
+def upgrade(conn):
+    conn.execute(text(
+        "DELETE FROM body_composition WHERE source IS NOT NULL AND id NOT IN "
+        "(SELECT MAX(id) FROM body_composition WHERE source IS NOT NULL GROUP BY date, source)"
+    ))
+    create_index(conn, "uq_body_composition_date_source", "body_composition", ["date", "source"], unique=True)
@@ -0,0 +1,66 @@
+"""
+Unique keys for the write path: one session per (week, day), one
+session_exercise per (session, exercise), one set per (session_exercise,
+set_number), so the services can upsert instead of check-then-insert.
+Duplicates left by earlier races are merged into the oldest session /
+session_exercise; of repeated set numbers the newest row is kept. Also
+adds the idempotency_keys table.
+"""
+from sqlalchemy import text
+from db.migrate import create_index
+from db.schema import IdempotencyKey
+from services.weeks import parse_day_label
+
+def upgrade(conn):
+    # day_number must be final before sessions are merged on it; init_db's
+    # backfill would otherwise fill it in after the unique index exists
+    for session_id, day_label in conn.execute(text(
+        "SELECT id, day_label FROM sessions WHERE day_number IS NULL"
+    )).all():
+        day_number = parse_day_label(day_label)[0]
+        if day_number is not None:
+            conn.execute(text("UPDATE sessions SET day_number = :d WHERE id = :id"), {"d": day_number, "id": session_id})
+
+    merged = 0
+    merged += conn.execute(text(
+        "UPDATE session_exercises SET session_id = ("
+        "  SELECT MIN(k.id) FROM sessions s JOIN sessions k"
+        "  ON k.week_number = s.week_number AND k.day_number = s.day_number"
+        "  WHERE s.id = session_exercises.session_id) "
+        "WHERE session_id IN (SELECT s.id FROM sessions s JOIN sessions k"
+        "  ON k.week_number = s.week_number AND k.day_number = s.day_number AND k.id < s.id)"
+    )).rowcount
+    merged += conn.execute(text(
+        "DELETE FROM sessions WHERE day_number IS NOT NULL AND id NOT IN "
+        "(SELECT MIN(id) FROM sessions WHERE day_number IS NOT NULL GROUP BY week_number, day_number)"
+    )).rowcount
+
+    merged += conn.execute(text(
+        "UPDATE sets SET session_exercise_id = ("
+        "  SELECT MIN(k.id) FROM session_exercises se JOIN session_exercises k"
+        "  ON k.session_id = se.session_id AND k.exercise_id = se.exercise_id"
+        "  WHERE se.id = sets.session_exercise_id) "
+        "WHERE session_exercise_id IN (SELECT se.id FROM session_exercises se JOIN session_exercises k"
+        "  ON k.session_id = se.session_id AND k.exercise_id = se.exercise_id AND k.id < se.id)"
+    )).rowcount
+    merged += conn.execute(text(
+        "DELETE FROM session_exercises WHERE id NOT IN "
+        "(SELECT MIN(id) FROM session_exercises GROUP BY session_id, exercise_id)"
+    )).rowcount
+
+    merged += conn.execute(text(
+        "DELETE FROM sets WHERE id NOT IN "
+        "(SELECT MAX(id) FROM sets GROUP BY session_exercise_id, set_number)"
+    )).rowcount
+
+    if merged:
+        # Emptied so init_db's backfills rebuild them from the merged rows
+        conn.execute(text("DELETE FROM exercise_week_stats"))
+        conn.execute(text("DELETE FROM training_weeks"))
+
+    conn.execute(text("DROP INDEX IF EXISTS ix_sessions_week_day"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_sets_session_exercise_set_number"))
+    create_index(conn, "uq_sessions_week_day", "sessions", ["week_number", "day_number"], unique=True)
+    create_index(conn, "uq_session_exercises_session_exercise", "session_exercises", ["session_id", "exercise_id"], unique=True)
+    create_index(conn, "uq_sets_session_exercise_set_number", "sets", ["session_exercise_id", "set_number"], unique=True)
+    IdempotencyKey.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,30 @@
+"""
+Change feed behind GET /changes: an AFTER INSERT/UPDATE/DELETE trigger on
+each synced table moves the row's change_log entry to a fresh revision.
+Triggers see every write path (ORM, Core upserts, cascades) alike. Rows
+that already exist are logged once so a client syncing from 0 gets the
+full state.
+"""
+from sqlalchemy import text
+from db.schema import ChangeLog
+
+SYNCED_TABLES = ("sessions", "session_exercises", "sets")
+
+_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_{table}_{event}_change AFTER {event_sql} ON {table}
+BEGIN
+    DELETE FROM change_log WHERE table_name = '{table}' AND row_id = {ref}.id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', {ref}.id, '{op}');
+END
+"""
+
+def upgrade(conn):
+    ChangeLog.__table__.create(bind=conn, checkfirst=True)
+    for table in SYNCED_TABLES:
+        conn.execute(text(
+            f"INSERT INTO change_log (table_name, row_id, op) "
+            f"SELECT '{table}', id, 'upsert' FROM {table} "
+            f"WHERE id NOT IN (SELECT row_id FROM change_log WHERE table_name = '{table}') ORDER BY id"
+        ))
+        for event, ref, op in (("insert", "NEW", "upsert"), ("update", "NEW", "upsert"), ("delete", "OLD", "delete")):
+            conn.execute(text(_TRIGGER.format(table=table, event=event, event_sql=event.upper(), ref=ref, op=op)))
@@ -0,0 +1,8 @@
+"""
+Weekly/monthly metric rollups behind /dashboard/metrics. The table starts
+empty; init_db's backfill fills it from daily_metrics and body_composition.
+"""
+from db.schema import MetricRollup
+
+def upgrade(conn):
+    MetricRollup.__table__.create(bind=conn, checkfirst=True)
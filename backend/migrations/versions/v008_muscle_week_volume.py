@@ -0,0 +1,11 @@
+"""
+Weekly volume cube behind /dashboard/volume, plus the (muscle_group, tier)
+index its refresh looks exercises up by. The cube starts empty; init_db's
+backfill fills it from exercise_week_stats.
+"""
+from db.migrate import create_index
+from db.schema import MuscleWeekVolume
+
+def upgrade(conn):
+    create_index(conn, "ix_exercises_muscle_group_tier", "exercises", ["muscle_group", "tier"])
+    MuscleWeekVolume.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,15 @@
+"""
+Decayed per-muscle training load behind /muscle-levels. Existing
+exercise_week_stats rows have no load_e1rm yet, so the derived tables are
+emptied and init_db's backfill rebuilds them (and muscle_load) from sets.
+"""
+from sqlalchemy import text
+from db.migrate import add_column
+from db.schema import MuscleLoad
+
+def upgrade(conn):
+    add_column(conn, "exercise_week_stats", "load_e1rm", "FLOAT NOT NULL DEFAULT 0")
+    MuscleLoad.__table__.create(bind=conn, checkfirst=True)
+    conn.execute(text("DELETE FROM exercise_week_stats"))
+    conn.execute(text("DELETE FROM muscle_week_volume"))
+    conn.execute(text("DELETE FROM muscle_load"))
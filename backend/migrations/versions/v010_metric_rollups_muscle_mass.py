@@ -0,0 +1,9 @@
+"""
+Muscle mass joins the dashboard metrics. Existing metric_rollups rows have
+no muscle_mass periods, so the table is emptied and init_db's backfill
+rebuilds it.
+"""
+from sqlalchemy import text
+
+def upgrade(conn):
+    conn.execute(text("DELETE FROM metric_rollups"))
@@ -0,0 +1,9 @@
+"""
+delta_7d_kg is now taken against a weigh-in 7-10 days back, not the last
+one however old. The trend is emptied so init_db's backfill recomputes
+every row.
+"""
+from sqlalchemy import text
+
+def upgrade(conn):
+    conn.execute(text("DELETE FROM bodyweight_trend"))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+rebuild_rollups.py — Recomputes the derived rollup tables from scratch.
+Ingest and set logging keep them current; run this after editing
+daily_metrics, body_composition or exercise_week_stats by hand, or to
+check they have not drifted.
+
+    python rebuild_rollups.py
+    python rebuild_rollups.py --athlete alice
+"""
+import argparse
+
+from db.init import init_db, SessionLocal
+from services.metric_rollups import rebuild_metric_rollups
+from services.aggregates import rebuild_muscle_week_volume
+from services.muscle_levels import rebuild_muscle_loads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the metric rollups, the weekly volume cube and the muscle loads")
+    parser.add_argument("--athlete", help="Athlete shard to rebuild (default: gym.db)")
+    args = parser.parse_args()
+
+    if args.athlete:
+        from db.shards import shard_router
+        db = shard_router.get(args.athlete).SessionLocal()
+    else:
+        init_db()
+        db = SessionLocal()
+
+    try:
+        rows = rebuild_metric_rollups(db)
+        cells = rebuild_muscle_week_volume(db)
+        muscles = rebuild_muscle_loads(db)
+    finally:
+        db.close()
+    print(f"✓ Rebuilt {rows} metric rollup rows")
+    print(f"✓ Rebuilt {cells} muscle/week volume cells")
+    print(f"✓ Rebuilt {muscles} muscle loads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Response models for every route in main.py. Besides documenting the API,
+a declared response model lets FastAPI serialise straight to JSON bytes
+through pydantic-core instead of walking dicts/ORM rows with
+jsonable_encoder.
+"""
+import datetime as dt
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel
+
+
+class StatusOut(BaseModel):
+    status: str
+
+class MessageOut(StatusOut):
+    message: str
+
+
+# SESSIONS / SETS
+class SessionSummaryOut(BaseModel):
+    id: int
+    date: dt.date
+    day_label: str
+    week_number: int
+
+class SessionSetOut(BaseModel):
+    id: int
+    set: int
+    weight: float
+    reps: int
+    e1rm: Optional[float] = None
+
+class SessionExerciseOut(BaseModel):
+    session_exercise_id: int
+    exercise_id: int
+    exercise_name: str
+    order: int
+    sets: List[SessionSetOut]
+
+class SessionDetailOut(BaseModel):
+    id: int
+    date: dt.date
+    day_label: str
+    exercises: List[SessionExerciseOut]
+
+class SessionCreatedOut(StatusOut):
+    session_id: int
+
+class SetLoggedOut(StatusOut):
+    set_id: int
+
+class LegacySetLoggedOut(BaseModel):
+    success: bool
+    set_id: int
+
+class BulkLogOut(BaseModel):
+    success: bool
+    session_id: int
+    set_ids: Dict[int, List[int]]
+    warnings: Dict[int, List[str]]
+
+
+# CHANGE FEED
+class ChangeOut(BaseModel):
+    rev: int
+    table: str
+    op: str
+    id: int
+    # Current columns of an upserted row; None for a delete
+    row: Optional[Dict[str, Any]] = None
+
+class ChangesOut(BaseModel):
+    revision: int
+    has_more: bool
+    changes: List[ChangeOut]
+
+
+# PLAN AND WORKOUT VIEWS
+class WeekSummaryOut(BaseModel):
+    weeks: List[int]
+    latest_week: Optional[int] = None
+    current_week: int
+    days: Dict[int, int]
+
+class PlanExerciseOut(BaseModel):
+    exercise_id: int
+    exercise: str
+    sets: int
+    target_reps: Optional[int] = None
+    weights: List[float]
+    superset_group: Optional[int] = None
+
+class PlanDayOut(BaseModel):
+    day: int
+    day_name: str
+    exercises: List[PlanExerciseOut]
+
+class PlanOut(BaseModel):
+    weeks: List[int]
+    current_week: int
+    days: Dict[str, PlanDayOut]
+
+class WorkoutSetOut(BaseModel):
+    set: int
+    # "" marks a set that has not been logged yet
+    actual_weight: Union[float, str]
+    actual_reps: Union[int, str]
+
+class WorkoutExerciseOut(BaseModel):
+    exercise_id: int
+    exercise: str
+    sets: int
+    target_reps: Optional[int] = None
+    target_weights: List[Union[float, str]]
+    sets_data: List[WorkoutSetOut]
+    superset_group: Optional[int] = None
+
+class WorkoutOut(BaseModel):
+    day: int
+    week_id: int
+    exercises: List[WorkoutExerciseOut]
+
+
+# PROGRESSION
+class PlannedSetOut(BaseModel):
+    set_number: int
+    weight_kg: float
+    reps: int
+    # Set by the engine when the next step would pass machine_max
+    substitution_flag: Optional[bool] = None
+
+class ExercisePlanOut(BaseModel):
+    exercise: str
+    plan: List[PlannedSetOut]
+
+class WeeklyPlanEntryOut(ExercisePlanOut):
+    exercise_id: int
+
+class WeeklyProgressionOut(BaseModel):
+    exercises: List[WeeklyPlanEntryOut]
+
+class TopSetOut(BaseModel):
+    date: Optional[dt.date] = None
+    weight_kg: Optional[float] = None
+    reps: Optional[int] = None
+
+class ExerciseWeekOut(BaseModel):
+    week: int
+    sets: int
+    tonnage_kg: float
+    best_e1rm: Optional[float] = None
+
+class ExerciseSummaryOut(BaseModel):
+    exercise: str
+    best_e1rm: Optional[float] = None
+    last_top_set: Optional[TopSetOut] = None
+    weeks: List[ExerciseWeekOut]
+
+
+# BENCH CYCLE
+class BenchTargetsOut(BaseModel):
+    week: int
+    rep_label: str
+    intensity_factor: float
+    target_weight_kg: float
+    sets: List[PlannedSetOut]
+
+class BenchAdvanceOut(BaseModel):
+    next_week: int
+    bench_pr_kg: float
+
+class BenchCompleteOut(StatusOut):
+    new_cycle: BenchAdvanceOut
+
+
+# METRICS
+class BodyweightTrendOut(BaseModel):
+    date: Optional[dt.date] = None
+    bodyweight_kg: Optional[float] = None
+    ewma_kg: Optional[float] = None
+    delta_7d_kg: Optional[float] = None
+
+class DailyMetricOut(BaseModel):
+    id: int
+    date: dt.date
+    bodyweight_kg: Optional[float] = None
+    sleep_hours: Optional[float] = None
+    sleep_score: Optional[int] = None
+    steps: Optional[int] = None
+    active_calories: Optional[int] = None
+    resting_hr: Optional[int] = None
+    hrv: Optional[float] = None
+    notes: Optional[str] = None
+    created_at: Optional[dt.datetime] = None
+
+class BatchLoggedOut(StatusOut):
+    days: int
+
+class IngestionJobOut(BaseModel):
+    name: str
+    interval_seconds: float
+    running: bool
+    runs: int
+    failures: int
+    last_started: Optional[dt.datetime] = None
+    last_success: Optional[dt.datetime] = None
+    last_error: Optional[str] = None
+    last_duration_ms: Optional[float] = None
+    last_result: Optional[Dict[str, Any]] = None
+    next_run: Optional[dt.datetime] = None
+
+class BodyCompositionOut(BaseModel):
+    id: int
+    date: dt.date
+    bodyweight_kg: Optional[float] = None
+    body_fat_pct: Optional[float] = None
+    muscle_mass_kg: Optional[float] = None
+    water_pct: Optional[float] = None
+    source: Optional[str] = None
+    created_at: Optional[dt.datetime] = None
+
+
+# LEGACY FRONTEND ALIGNMENT
+class BenchSessionOut(BaseModel):
+    sets: int
+    reps: int
+    weight: float
+    intensity_pct: float
+    label: str
+
+class DayCompletionOut(BaseModel):
+    day: int
+    name: str
+    planned: int
+    logged: int
+
+class StatsOut(BaseModel):
+    current_week: int
+    bench_cycle_week: int
+    bench_1rm: float
+    bench_session: BenchSessionOut
+    day_completion: List[DayCompletionOut]
+
+class HasCompletedOut(BaseModel):
+    has_completed: bool
+
+class MuscleLevelOut(BaseModel):
+    # SVG muscle key used by MuscleMap.jsx; muscle_group is exercises.muscle_group
+    muscle: str
+    muscle_group: str
+    display_name: str
+    level: int
+    xp: float
+    xp_in_level: float
+    xp_for_next: float
+    xp_pct: float
+    target_level: int
+    last_update: Optional[dt.date] = None
+
+class MuscleLevelsOut(BaseModel):
+    muscle_levels: List[MuscleLevelOut]
+
+class ChartDatasetOut(BaseModel):
+    label: str
+    data: List[Optional[float]]
+    yAxisID: Optional[str] = None
+
+class ChartOut(BaseModel):
+    labels: List[str]
+    datasets: List[ChartDatasetOut]
+    # "day", "week" or "month": what each label stands for
+    granularity: Optional[str] = None
+
+# Rows Dashboard.jsx plots, one per label with data
+class BodyCompPointOut(BaseModel):
+    Date: str
+    Weight_kg: Optional[float] = None
+    BodyFat_pct: Optional[float] = None
+    MuscleMass_kg: Optional[float] = None
+
+class ActivityPointOut(BaseModel):
+    Date: str
+    Steps: Optional[float] = None
+    Active_Kcal: Optional[float] = None
+    Sleep_Total_Hrs: Optional[float] = None
+
+class DashboardMetricsOut(ChartOut):
+    body_comp: List[BodyCompPointOut] = []
+    apple_health: List[ActivityPointOut] = []
+    targets: Optional[Dict[str, Any]] = None
+
+
+# CONFIG
+class ExerciseConfigOut(BaseModel):
+    id: int
+    name: str
+    muscle: str
+    weights_available: str
+
+TargetsOut = Dict[str, Any]
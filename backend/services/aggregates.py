@@ -0,0 +1,215 @@
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session as DbSession
+from db.schema import Session, SessionExercise, Set, ExerciseWeekStat, Exercise, MuscleWeekVolume, MuscleLoad
+from services.muscle_levels import apply_muscle_load, week_load
+
+# Groupings /dashboard/volume can break the cube down by
+VOLUME_GROUPS = {"muscle_group": MuscleWeekVolume.muscle_group, "tier": MuscleWeekVolume.tier}
+VOLUME_METRICS = {"tonnage": MuscleWeekVolume.tonnage_kg, "sets": MuscleWeekVolume.hard_sets}
+
+def _week_key(db: DbSession, session_exercise_id: int):
+    return db.query(SessionExercise.exercise_id, Session.week_number).join(
+        Session, Session.id == SessionExercise.session_id
+    ).filter(SessionExercise.id == session_exercise_id).first()
+
+def refresh_exercise_week(db: DbSession, exercise_id: int, week_number: int):
+    """
+    Recomputes one (exercise, week) row from that week's sets, then the
+    muscle_week_volume cell and the muscle_load it feeds.
+    Does not commit: callers run it inside the transaction that changed the
+    sets, so the rollup can never drift from the rows it summarises.
+    """
+    db.flush()
+    rows = db.query(Set.weight_kg, Set.reps, Set.e1rm, Session.date, Session.id).join(
+        SessionExercise, SessionExercise.id == Set.session_exercise_id
+    ).join(
+        Session, Session.id == SessionExercise.session_id
+    ).filter(
+        SessionExercise.exercise_id == exercise_id, Session.week_number == week_number
+    ).order_by(Session.date, Session.id, Set.set_number, Set.id).all()
+
+    stat = db.query(ExerciseWeekStat).filter(
+        ExerciseWeekStat.exercise_id == exercise_id, ExerciseWeekStat.week_number == week_number
+    ).first()
+    old_load = (stat.load_e1rm, stat.last_session_date) if stat and stat.load_e1rm else None
+
+    if not rows:
+        if stat:
+            db.delete(stat)
+        _swap_muscle_load(db, exercise_id, old_load, None)
+        refresh_muscle_week(db, exercise_id, week_number)
+        return None
+
+    if not stat:
+        stat = ExerciseWeekStat(exercise_id=exercise_id, week_number=week_number)
+        db.add(stat)
+
+    last_date, last_session_id = rows[-1][3], rows[-1][4]
+    top = next(r for r in rows if r[4] == last_session_id)
+
+    stat.set_count = len(rows)
+    stat.tonnage_kg = sum(w * r for w, r, _, _, _ in rows)
+    stat.best_e1rm = max((e for _, _, e, _, _ in rows if e is not None), default=None)
+    stat.last_session_date = last_date
+    stat.last_top_weight_kg = top[0]
+    stat.last_top_reps = top[1]
+    stat.load_e1rm = week_load([(r[2], r[3]) for r in rows], last_date)
+    _swap_muscle_load(db, exercise_id, old_load, (stat.load_e1rm, last_date) if stat.load_e1rm else None)
+    refresh_muscle_week(db, exercise_id, week_number)
+    return stat
+
+def _swap_muscle_load(db: DbSession, exercise_id: int, old, new):
+    """Replaces an (exercise, week)'s previous (load, date) with its new one in its muscle group's load."""
+    if old == new:
+        return
+    exercise = db.get(Exercise, exercise_id)
+    if exercise is None:
+        return
+    if old:
+        apply_muscle_load(db, exercise.muscle_group, -old[0], old[1])
+    if new:
+        apply_muscle_load(db, exercise.muscle_group, new[0], new[1])
+
+def refresh_muscle_week(db: DbSession, exercise_id: int, week_number: int):
+    """
+    Re-sums the (week, muscle group, tier) cell `exercise_id` belongs to
+    from exercise_week_stats: a handful of rows, never the week's sets.
+    Every stored set counts as a hard set; warm-ups are not logged.
+    """
+    db.flush()
+    exercise = db.get(Exercise, exercise_id)
+    if exercise is None:
+        return None
+    hard_sets, tonnage = db.query(
+        func.sum(ExerciseWeekStat.set_count), func.sum(ExerciseWeekStat.tonnage_kg)
+    ).join(
+        Exercise, Exercise.id == ExerciseWeekStat.exercise_id
+    ).filter(
+        Exercise.muscle_group == exercise.muscle_group, Exercise.tier == exercise.tier,
+        ExerciseWeekStat.week_number == week_number,
+    ).one()
+
+    cell = db.query(MuscleWeekVolume).filter(
+        MuscleWeekVolume.week_number == week_number,
+        MuscleWeekVolume.muscle_group == exercise.muscle_group,
+        MuscleWeekVolume.tier == exercise.tier,
+    ).first()
+    if not hard_sets:
+        if cell:
+            db.delete(cell)
+        return None
+    if not cell:
+        cell = MuscleWeekVolume(week_number=week_number, muscle_group=exercise.muscle_group, tier=exercise.tier)
+        db.add(cell)
+    cell.hard_sets = hard_sets
+    cell.tonnage_kg = tonnage or 0.0
+    return cell
+
+def refresh_for_session_exercise(db: DbSession, session_exercise_id: int):
+    key = _week_key(db, session_exercise_id)
+    if key:
+        return refresh_exercise_week(db, key[0], key[1])
+    return None
+
+def rebuild_exercise_week_stats(db: DbSession) -> int:
+    """Drops and recomputes every rollup row, volume cube and muscle loads included. Used for backfills."""
+    db.query(ExerciseWeekStat).delete()
+    db.query(MuscleWeekVolume).delete()
+    db.query(MuscleLoad).delete()
+    keys = db.query(SessionExercise.exercise_id, Session.week_number).join(
+        Session, Session.id == SessionExercise.session_id
+    ).distinct().all()
+    for exercise_id, week_number in keys:
+        refresh_exercise_week(db, exercise_id, week_number)
+    db.commit()
+    return db.query(ExerciseWeekStat).count()
+
+def rebuild_muscle_week_volume(db: DbSession) -> int:
+    """Recomputes the volume cube from exercise_week_stats in one statement."""
+    db.query(MuscleWeekVolume).delete()
+    db.execute(MuscleWeekVolume.__table__.insert().from_select(
+        ["week_number", "muscle_group", "tier", "hard_sets", "tonnage_kg"],
+        select(
+            ExerciseWeekStat.week_number, Exercise.muscle_group, Exercise.tier,
+            func.sum(ExerciseWeekStat.set_count), func.sum(ExerciseWeekStat.tonnage_kg),
+        ).join(
+            Exercise, Exercise.id == ExerciseWeekStat.exercise_id
+        ).group_by(
+            ExerciseWeekStat.week_number, Exercise.muscle_group, Exercise.tier
+        ).having(func.sum(ExerciseWeekStat.set_count) > 0),
+    ))
+    db.commit()
+    return db.query(MuscleWeekVolume).count()
+
+def get_volume_chart(db: DbSession, from_week: int = None, to_week: int = None,
+                     group_by: str = "muscle_group", metric: str = "tonnage") -> dict:
+    """
+    Weekly tonnage or hard sets per muscle group (or tier) for weeks
+    from_week..to_week, both optional, read from the cube with one range
+    scan of its (week_number, ...) index. Weeks between the first and last
+    with no volume are kept as zeros. Raises ValueError for an unknown
+    group_by or metric.
+    """
+    if group_by not in VOLUME_GROUPS:
+        raise ValueError(f"Unknown group_by '{group_by}' (expected one of {', '.join(VOLUME_GROUPS)})")
+    if metric not in VOLUME_METRICS:
+        raise ValueError(f"Unknown metric '{metric}' (expected one of {', '.join(VOLUME_METRICS)})")
+
+    group_col = VOLUME_GROUPS[group_by]
+    q = select(
+        MuscleWeekVolume.week_number, group_col, func.sum(VOLUME_METRICS[metric])
+    ).group_by(MuscleWeekVolume.week_number, group_col)
+    if from_week is not None:
+        q = q.where(MuscleWeekVolume.week_number >= from_week)
+    if to_week is not None:
+        q = q.where(MuscleWeekVolume.week_number <= to_week)
+    rows = db.execute(q).all()
+    if not rows:
+        return {"labels": [], "datasets": [], "granularity": "week"}
+
+    first = from_week if from_week is not None else min(r[0] for r in rows)
+    last = to_week if to_week is not None else max(r[0] for r in rows)
+    weeks = list(range(first, last + 1))
+    series = {}
+    for week, group, value in rows:
+        series.setdefault(group, {})[week] = value
+    return {
+        "labels": [f"Week {w}" for w in weeks],
+        "datasets": [
+            {"label": group, "data": [round(series[group].get(w, 0), 1) for w in weeks]}
+            for group in sorted(series)
+        ],
+        "granularity": "week",
+    }
+
+def get_exercise_summary(db: DbSession, exercise_id: int) -> dict:
+    weeks = db.query(ExerciseWeekStat).filter(
+        ExerciseWeekStat.exercise_id == exercise_id
+    ).order_by(ExerciseWeekStat.week_number).all()
+    if not weeks:
+        return {"best_e1rm": None, "last_top_set": None, "weeks": []}
+
+    last = weeks[-1]
+    return {
+        "best_e1rm": max((w.best_e1rm for w in weeks if w.best_e1rm is not None), default=None),
+        "last_top_set": {
+            "date": last.last_session_date,
+            "weight_kg": last.last_top_weight_kg,
+            "reps": last.last_top_reps,
+        },
+        "weeks": [
+            {"week": w.week_number, "sets": w.set_count, "tonnage_kg": w.tonnage_kg, "best_e1rm": w.best_e1rm}
+            for w in weeks
+        ],
+    }
+
+if __name__ == "__main__":
+    from db.init import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        count = rebuild_exercise_week_stats(db)
+        print(f"✓ Rebuilt {count} exercise/week aggregate rows.")
+    finally:
+        db.close()
@@ -0,0 +1,175 @@
+"""
+Apple Health export.xml -> daily_metrics.
+
+The export is one flat <HealthData> element with a <Record> per sample
+and can run to several GB, so it is read with iterparse and every
+finished top-level element is cleared: memory holds one record plus one
+aggregate per (day, source), never the tree.
+"""
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session as DbSession
+from db.schema import DailyMetric
+from services.metric_rollups import refresh_metric_rollups
+
+# Summed per day: record type -> (field, unit -> factor to the field's unit)
+SUMMED_TYPES = {
+    "HKQuantityTypeIdentifierStepCount": ("steps", {"count": 1.0}),
+    "HKQuantityTypeIdentifierActiveEnergyBurned": ("active_kcal", {"kcal": 1.0, "Cal": 1.0, "kJ": 1 / 4.184}),
+    "HKQuantityTypeIdentifierBasalEnergyBurned": ("resting_kcal", {"kcal": 1.0, "Cal": 1.0, "kJ": 1 / 4.184}),
+    "HKQuantityTypeIdentifierDistanceWalkingRunning": ("distance_km", {"km": 1.0, "m": 0.001, "mi": 1.609344}),
+}
+# Averaged per day
+AVERAGED_TYPES = {
+    "HKQuantityTypeIdentifierRestingHeartRate": "resting_hr",
+    "HKQuantityTypeIdentifierHeartRateVariabilitySDNN": "hrv",
+}
+SLEEP_TYPE = "HKCategoryTypeIdentifierSleepAnalysis"
+# Stages counted as sleep; InBed and Awake are not
+ASLEEP_VALUES = {
+    "HKCategoryValueSleepAnalysisAsleep",
+    "HKCategoryValueSleepAnalysisAsleepUnspecified",
+    "HKCategoryValueSleepAnalysisAsleepCore",
+    "HKCategoryValueSleepAnalysisAsleepDeep",
+    "HKCategoryValueSleepAnalysisAsleepREM",
+}
+_TIMESTAMP = "%Y-%m-%d %H:%M:%S %z"
+UPSERT_CHUNK = 500
+
+def _parse_ts(value: str):
+    return datetime.strptime(value, _TIMESTAMP).timestamp() if value else None
+
+def aggregate_export(source, since: date = None, progress=None) -> tuple[dict, int]:
+    """
+    Streams an export (path or file object) into per-day aggregates.
+    Returns ({date: {field: value}}, records_seen).
+
+    iPhone and Watch both record steps, energy and distance, so summing
+    every record double-counts; totals are kept per (day, source device)
+    and the largest source wins. Sleep is credited to the day it ends.
+    `progress(records)` is called every 100k records.
+    """
+    # (day, field) -> {source: total}; (day, field) -> [sum, count]
+    totals = defaultdict(lambda: defaultdict(float))
+    means = defaultdict(lambda: [0.0, 0])
+    since_key = since.isoformat() if since else None
+    records = 0
+
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+
+        if elem.tag == "Record":
+            records += 1
+            if progress and records % 100_000 == 0:
+                progress(records)
+            _add_record(elem.attrib, totals, means, since_key)
+        # Drop the finished element and everything parsed before it
+        elem.clear()
+        root.clear()
+
+    days = defaultdict(dict)
+    for (day, field), by_source in totals.items():
+        days[day][field] = max(by_source.values())
+    for (day, field), (total, count) in means.items():
+        days[day][field] = total / count
+    return {date.fromisoformat(d): v for d, v in days.items()}, records
+
+def _add_record(attrs: dict, totals, means, since_key):
+    rtype = attrs.get("type")
+    if rtype == SLEEP_TYPE:
+        if attrs.get("value") not in ASLEEP_VALUES:
+            return
+        day = attrs.get("endDate", "")[:10]
+        if not day or (since_key and day < since_key):
+            return
+        start, end = _parse_ts(attrs.get("startDate")), _parse_ts(attrs.get("endDate"))
+        if start is not None and end is not None and end > start:
+            totals[(day, "sleep_hours")][attrs.get("sourceName", "")] += (end - start) / 3600
+        return
+
+    day = attrs.get("startDate", "")[:10]
+    if not day or (since_key and day < since_key):
+        return
+    try:
+        value = float(attrs.get("value", ""))
+    except ValueError:
+        return
+
+    if rtype in SUMMED_TYPES:
+        field, units = SUMMED_TYPES[rtype]
+        factor = units.get(attrs.get("unit"))
+        if factor is not None:
+            totals[(day, field)][attrs.get("sourceName", "")] += value * factor
+    elif rtype in AVERAGED_TYPES:
+        acc = means[(day, AVERAGED_TYPES[rtype])]
+        acc[0] += value
+        acc[1] += 1
+
+def _daily_metric_row(day: date, agg: dict) -> dict:
+    row = {"date": day}
+    if "steps" in agg:
+        row["steps"] = int(round(agg["steps"]))
+    if "active_kcal" in agg:
+        row["active_calories"] = int(round(agg["active_kcal"]))
+    if "sleep_hours" in agg:
+        row["sleep_hours"] = round(agg["sleep_hours"], 2)
+    if "resting_hr" in agg:
+        row["resting_hr"] = int(round(agg["resting_hr"]))
+    if "hrv" in agg:
+        row["hrv"] = round(agg["hrv"], 1)
+    if "distance_km" in agg or "resting_kcal" in agg:
+        # Same notes format as the /metrics/apple_health webhook
+        row["notes"] = f"Dist: {round(agg.get('distance_km', 0.0), 2)}km, RestingKcal: {round(agg.get('resting_kcal', 0.0))}"
+    return row
+
+def upsert_daily_metrics(db: DbSession, days: dict) -> int:
+    """
+    Writes per-day aggregates into daily_metrics with INSERT ... ON
+    CONFLICT(date) DO UPDATE in chunks, in one transaction. Only the
+    columns a day has data for are touched, so bodyweight (from Renpho)
+    survives. Metric rollups are refreshed in the same transaction.
+    Returns rows written.
+    """
+    rows = [_daily_metric_row(d, agg) for d, agg in sorted(days.items())]
+    # Rows with the same columns share one multi-row statement
+    by_columns = defaultdict(list)
+    for row in rows:
+        by_columns[tuple(sorted(row))].append(row)
+
+    for columns, group in by_columns.items():
+        for i in range(0, len(group), UPSERT_CHUNK):
+            stmt = insert(DailyMetric).values(group[i:i + UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailyMetric.date],
+                set_={c: stmt.excluded[c] for c in columns if c != "date"},
+            )
+            db.execute(stmt)
+    refresh_metric_rollups(db, days.keys())
+    db.commit()
+    return len(rows)
+
+def import_export(db: DbSession, source, since: date = None, progress=None) -> dict:
+    """Parses an export and upserts it. Returns counts and throughput."""
+    t0 = time.perf_counter()
+    days, records = aggregate_export(source, since, progress)
+    parsed = time.perf_counter() - t0
+    written = upsert_daily_metrics(db, days)
+    elapsed = time.perf_counter() - t0
+    return {
+        "records": records,
+        "days": written,
+        "seconds": round(elapsed, 2),
+        "records_per_sec": round(records / parsed) if parsed > 0 else records,
+    }
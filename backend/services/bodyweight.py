@@ -0,0 +1,144 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.schema import BodyweightTrend, DailyMetric
+
+# Smoothing applied per day of gap, so a weigh-in after a 3-day gap moves
+# the average as much as three daily weigh-ins would.
+EWMA_ALPHA = 0.1
+DELTA_WINDOW_DAYS = 7
+# The 7-day delta is taken against a weigh-in 7 to DELTA_MAX_DAYS days
+# earlier; an older one would measure a months-long gap as one week
+DELTA_MAX_DAYS = 10
+
+def _delta(rows, dates, i) -> float:
+    """
+    delta_7d_kg for rows[i]: against the closest weigh-in dated 7-10 days
+    earlier; failing that, the EWMA change since the first weigh-in of the
+    past week; 0.0 for a lone reading.
+    """
+    r = rows[i]
+    j = bisect_right(dates, r.date - timedelta(days=DELTA_WINDOW_DAYS))
+    if j > 0 and dates[j - 1] >= r.date - timedelta(days=DELTA_MAX_DAYS):
+        return r.bodyweight_kg - rows[j - 1].bodyweight_kg
+    if j < i:
+        return r.ewma_kg - rows[j].ewma_kg
+    return 0.0
+
+def _recompute_from(db: DbSession, start_date: date):
+    """
+    Refreshes ewma_kg and delta_7d_kg for every row dated >= start_date.
+    A new latest weigh-in only touches its own row; a backfilled older day
+    also rolls forward through the rows after it.
+    """
+    db.flush()
+    # Rows from DELTA_MAX_DAYS back feed the deltas; the last row before
+    # start_date seeds the EWMA however far back it is
+    lower = start_date - timedelta(days=DELTA_MAX_DAYS)
+    prev_date = db.query(BodyweightTrend.date).filter(
+        BodyweightTrend.date < start_date
+    ).order_by(BodyweightTrend.date.desc()).limit(1).scalar()
+    if prev_date is not None:
+        lower = min(lower, prev_date)
+
+    rows = db.query(BodyweightTrend).filter(
+        BodyweightTrend.date >= lower
+    ).order_by(BodyweightTrend.date.asc()).all()
+    dates = [r.date for r in rows]
+
+    prev = None
+    for i, r in enumerate(rows):
+        if r.date >= start_date:
+            if prev is None:
+                r.ewma_kg = r.bodyweight_kg
+            else:
+                gap = max((r.date - prev.date).days, 1)
+                a = 1 - (1 - EWMA_ALPHA) ** gap
+                r.ewma_kg = prev.ewma_kg + a * (r.bodyweight_kg - prev.ewma_kg)
+            r.delta_7d_kg = _delta(rows, dates, i)
+        prev = r
+
+def record_bodyweight(db: DbSession, date_val: date, weight_kg: float):
+    """Upserts one weigh-in into the trend. Does not commit."""
+    if not weight_kg:
+        return None
+    row = db.query(BodyweightTrend).filter(BodyweightTrend.date == date_val).first()
+    if not row:
+        row = BodyweightTrend(date=date_val, bodyweight_kg=weight_kg, ewma_kg=weight_kg)
+        db.add(row)
+    elif row.bodyweight_kg == weight_kg:
+        return row
+    row.bodyweight_kg = weight_kg
+    _recompute_from(db, date_val)
+    return row
+
+def record_bodyweights(db: DbSession, weigh_ins: dict):
+    """
+    Batch record_bodyweight for {date: weight_kg}: one upsert of the trend
+    rows, then a single roll-forward from the earliest date. Does not commit.
+    """
+    weigh_ins = {d: w for d, w in weigh_ins.items() if w}
+    if not weigh_ins:
+        return
+    db.flush()
+    stmt = insert(BodyweightTrend)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[BodyweightTrend.date],
+        set_={"bodyweight_kg": stmt.excluded.bodyweight_kg},
+    ), [{"date": d, "bodyweight_kg": w, "ewma_kg": w, "delta_7d_kg": 0.0} for d, w in weigh_ins.items()])
+    # Rows already loaded in this session predate the upsert
+    db.expire_all()
+    _recompute_from(db, min(weigh_ins))
+
+def get_bodyweight_trend(db: DbSession, before: date = None):
+    """Latest trend point (optionally strictly before a date), or None."""
+    q = db.query(BodyweightTrend)
+    if before is not None:
+        q = q.filter(BodyweightTrend.date < before)
+    row = q.order_by(BodyweightTrend.date.desc()).first()
+    if not row:
+        return None
+    return {
+        "date": row.date,
+        "bodyweight_kg": row.bodyweight_kg,
+        "ewma_kg": row.ewma_kg,
+        "delta_7d_kg": row.delta_7d_kg,
+    }
+
+def get_bodyweight_delta(db: DbSession) -> float:
+    trend = get_bodyweight_trend(db)
+    return trend["delta_7d_kg"] if trend else 0.0
+
+async def get_bodyweight_delta_async(db: AsyncSession) -> float:
+    res = await db.execute(
+        select(BodyweightTrend.delta_7d_kg).order_by(BodyweightTrend.date.desc()).limit(1)
+    )
+    delta = res.scalar()
+    return delta if delta is not None else 0.0
+
+def rebuild_bodyweight_trend(db: DbSession) -> int:
+    """Recomputes the whole trend from daily_metrics. Used for backfills."""
+    db.query(BodyweightTrend).delete()
+    rows = db.query(DailyMetric.date, DailyMetric.bodyweight_kg).filter(
+        DailyMetric.bodyweight_kg > 0
+    ).order_by(DailyMetric.date.asc()).all()
+    for d, bw in rows:
+        db.add(BodyweightTrend(date=d, bodyweight_kg=bw, ewma_kg=bw))
+    if rows:
+        _recompute_from(db, rows[0][0])
+    db.commit()
+    return len(rows)
+
+if __name__ == "__main__":
+    from db.init import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        count = rebuild_bodyweight_trend(db)
+        print(f"✓ Rebuilt bodyweight trend from {count} weigh-ins.")
+    finally:
+        db.close()
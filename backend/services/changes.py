@@ -0,0 +1,59 @@
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.schema import ChangeLog, Session, SessionExercise, Set
+
+# Columns sent for each synced table: enough for a client to patch its
+# local copy of a workout without refetching it
+SYNCED_COLUMNS = {
+    "sessions": (
+        Session.id, Session.date, Session.day_label, Session.week_number, Session.day_number,
+    ),
+    "session_exercises": (
+        SessionExercise.id, SessionExercise.session_id, SessionExercise.exercise_id,
+        SessionExercise.exercise_order, SessionExercise.is_superset, SessionExercise.superset_group,
+    ),
+    "sets": (
+        Set.id, Set.session_exercise_id, Set.set_number, Set.weight_kg, Set.reps, Set.e1rm,
+    ),
+}
+MAX_CHANGES = 500
+
+def get_revision(db: DbSession) -> int:
+    return db.execute(select(func.max(ChangeLog.rev))).scalar() or 0
+
+def get_changes(db: DbSession, since: int = 0, limit: int = MAX_CHANGES) -> dict:
+    """
+    Rows of sessions/session_exercises/sets changed after revision `since`,
+    oldest first, at most `limit` of them. Each row appears once, at its
+    latest revision, with its current columns (op "upsert") or just its id
+    (op "delete"). `revision` is what to pass as `since` next time;
+    `has_more` means another page is waiting.
+    """
+    log = db.execute(
+        select(ChangeLog.rev, ChangeLog.table_name, ChangeLog.row_id, ChangeLog.op)
+        .where(ChangeLog.rev > since).order_by(ChangeLog.rev).limit(limit + 1)
+    ).all()
+    has_more = len(log) > limit
+    log = log[:limit]
+
+    rows = {}
+    for table, cols in SYNCED_COLUMNS.items():
+        ids = [row_id for _, t, row_id, op in log if t == table and op == "upsert"]
+        if ids:
+            rows[table] = {r.id: dict(r._mapping) for r in db.execute(select(*cols).where(cols[0].in_(ids)))}
+
+    changes = []
+    for rev, table, row_id, op in log:
+        row = rows.get(table, {}).get(row_id) if op == "upsert" else None
+        # Deleted between reading the log and the rows: its delete entry
+        # is past this page, so report it as deleted now
+        if op == "upsert" and row is None:
+            op = "delete"
+        changes.append({"rev": rev, "table": table, "op": op, "id": row_id, "row": row})
+
+    revision = log[-1].rev if log else get_revision(db)
+    return {"revision": revision, "has_more": has_more, "changes": changes}
+
+async def get_changes_async(db: AsyncSession, since: int = 0, limit: int = MAX_CHANGES) -> dict:
+    return await db.run_sync(get_changes, since, limit)
@@ -0,0 +1,119 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+
+# Pending events per subscriber; past this the oldest are dropped and the
+# client is told how many it missed (it should then resync via /changes)
+QUEUE_SIZE = 100
+# Seconds between keep-alive comments on an idle stream, so proxies and
+# the browser don't time the connection out
+HEARTBEAT_SECONDS = 15
+
+class Subscriber:
+    """
+    One SSE connection: the topics it follows and a bounded queue of
+    events waiting to be sent. Only touched from its event loop; publishers
+    on other threads hand events over with call_soon_threadsafe.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, topics, maxsize: int = QUEUE_SIZE):
+        self.loop = loop
+        self.topics = topics
+        self.queue = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def _push(self, event: dict):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self._ready.set()
+
+    async def next(self, timeout: float = None):
+        """The next event, or None when `timeout` passes first."""
+        if not self.queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.queue.popleft()
+
+class EventBus:
+    """
+    In-process pub/sub for live session updates, per athlete. An event
+    carries the topics it concerns, e.g. {("week", 3), ("session", 41)};
+    it reaches every subscriber of that athlete following one of them, or
+    following everything (topics None). Events with no topics (bench
+    cycle changes) reach all of the athlete's subscribers. Events are not
+    persisted: a client that was disconnected catches up through /changes.
+    """
+    def __init__(self):
+        self._subscribers: dict[str, list[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def subscribe(self, athlete_id, topics, maxsize: int = QUEUE_SIZE) -> Subscriber:
+        sub = Subscriber(asyncio.get_running_loop(), topics, maxsize)
+        with self._lock:
+            self._subscribers.setdefault(athlete_id, []).append(sub)
+        return sub
+
+    def unsubscribe(self, athlete_id, sub: Subscriber):
+        with self._lock:
+            subs = self._subscribers.get(athlete_id, [])
+            if sub in subs:
+                subs.remove(sub)
+            if not subs:
+                self._subscribers.pop(athlete_id, None)
+
+    def publish(self, athlete_id, event_type: str, topics: set = frozenset(), **data):
+        """Safe to call from any thread; never blocks on a slow subscriber."""
+        with self._lock:
+            subs = [
+                s for s in self._subscribers.get(athlete_id, [])
+                if not topics or s.topics is None or s.topics & topics
+            ]
+            event = {"id": next(self._seq), "type": event_type, "data": data}
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._push, event)
+            except RuntimeError:
+                # Loop already closed: the connection is gone
+                pass
+
+event_bus = EventBus()
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+async def stream_events(athlete_id, topics, is_disconnected):
+    """
+    SSE body for one subscriber: its events as they are published, a
+    `dropped` event when its queue overflowed, and a keep-alive comment
+    when idle. Ends when `is_disconnected()` reports the client left.
+    """
+    sub = event_bus.subscribe(athlete_id, topics)
+    try:
+        yield ": connected\n\n"
+        while True:
+            event = await sub.next(HEARTBEAT_SECONDS)
+            if sub.dropped:
+                yield f"event: dropped\ndata: {json.dumps({'count': sub.dropped})}\n\n"
+                sub.dropped = 0
+            if event is not None:
+                yield format_sse(event)
+            elif await is_disconnected():
+                break
+            else:
+                yield ": keep-alive\n\n"
+    finally:
+        event_bus.unsubscribe(athlete_id, sub)
+
+def publish_day(athlete_id, event_type: str, week_number: int, day_number: int, session_id: int = None, **data):
+    """A set changed on (week, day): tell subscribers of that week and session."""
+    topics = {("week", week_number)}
+    if session_id is not None:
+        topics.add(("session", session_id))
+    event_bus.publish(athlete_id, event_type, topics, week=week_number, day=day_number, session_id=session_id, **data)
@@ -0,0 +1,114 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.schema import Session, SessionExercise, Set
+
+# Sessions of history the progression engine looks at per exercise
+HISTORY_LIMIT = 12
+
+def _history_entry(se_id, session_id, date_val, order):
+    return {
+        "session_exercise_id": se_id,
+        "session_id": session_id,
+        "date": date_val,
+        "exercise_order": order,
+        "sets": [],
+    }
+
+def _history_stmt(exercise_id: int, limit: int):
+    return select(
+        SessionExercise.id, Session.id, Session.date, SessionExercise.exercise_order
+    ).join(
+        Session, Session.id == SessionExercise.session_id
+    ).where(
+        SessionExercise.exercise_id == exercise_id
+    ).order_by(
+        Session.date.desc(), Session.id.desc(), SessionExercise.exercise_order.desc()
+    ).limit(limit)
+
+def _history_sets_stmt(se_ids):
+    return select(Set.session_exercise_id, Set.weight_kg, Set.reps).where(
+        Set.session_exercise_id.in_(se_ids)
+    ).order_by(Set.session_exercise_id, Set.set_number, Set.id)
+
+def _attach_sets(by_id: dict, set_rows):
+    for se_id, weight_kg, reps in set_rows:
+        by_id[se_id]["sets"].append({"weight_kg": weight_kg, "reps": reps})
+
+def get_exercise_history(db: DbSession, exercise_id: int, limit: int = HISTORY_LIMIT) -> list[dict]:
+    """
+    Latest `limit` sessions of one exercise, oldest first (so [-1] is the
+    most recent), ordered by session date then exercise order. Sets are
+    loaded in a single follow-up query rather than lazily per row.
+    Served by ix_session_exercises_exercise_session and
+    ix_sets_session_exercise_set_number.
+    """
+    rows = db.execute(_history_stmt(exercise_id, limit)).all()
+    history = [_history_entry(*r) for r in reversed(rows)]
+    if not history:
+        return history
+
+    by_id = {h["session_exercise_id"]: h for h in history}
+    _attach_sets(by_id, db.execute(_history_sets_stmt(list(by_id.keys()))).all())
+    return history
+
+async def get_exercise_history_async(db: AsyncSession, exercise_id: int, limit: int = HISTORY_LIMIT) -> list[dict]:
+    """get_exercise_history on the async engine; same two statements."""
+    rows = (await db.execute(_history_stmt(exercise_id, limit))).all()
+    history = [_history_entry(*r) for r in reversed(rows)]
+    if not history:
+        return history
+
+    by_id = {h["session_exercise_id"]: h for h in history}
+    _attach_sets(by_id, (await db.execute(_history_sets_stmt(list(by_id.keys())))).all())
+    return history
+
+def _recent_stmts(limit: int):
+    """(session_exercise rows, their sets) for the latest `limit` sessions per exercise."""
+    rn = func.row_number().over(
+        partition_by=SessionExercise.exercise_id,
+        order_by=(Session.date.desc(), Session.id.desc(), SessionExercise.exercise_order.desc()),
+    ).label("rn")
+    recent = select(
+        SessionExercise.id.label("se_id"),
+        SessionExercise.exercise_id.label("exercise_id"),
+        SessionExercise.exercise_order.label("exercise_order"),
+        Session.id.label("session_id"),
+        Session.date.label("date"),
+        rn,
+    ).join(Session, Session.id == SessionExercise.session_id).subquery()
+
+    rows_stmt = select(
+        recent.c.se_id, recent.c.exercise_id, recent.c.session_id, recent.c.date, recent.c.exercise_order
+    ).where(recent.c.rn <= limit).order_by(
+        recent.c.exercise_id, recent.c.date, recent.c.session_id, recent.c.exercise_order
+    )
+    sets_stmt = select(Set.session_exercise_id, Set.weight_kg, Set.reps).join(
+        recent, recent.c.se_id == Set.session_exercise_id
+    ).where(recent.c.rn <= limit).order_by(Set.session_exercise_id, Set.set_number, Set.id)
+    return rows_stmt, sets_stmt
+
+def _group_histories(rows):
+    histories = {}
+    by_id = {}
+    for se_id, exercise_id, session_id, date_val, order in rows:
+        entry = _history_entry(se_id, session_id, date_val, order)
+        histories.setdefault(exercise_id, []).append(entry)
+        by_id[se_id] = entry
+    return histories, by_id
+
+def get_recent_histories(db: DbSession, limit: int = HISTORY_LIMIT) -> dict[int, list[dict]]:
+    """
+    get_exercise_history for every exercise at once: two queries in total,
+    using ROW_NUMBER() to keep the latest `limit` sessions per exercise.
+    """
+    rows_stmt, sets_stmt = _recent_stmts(limit)
+    histories, by_id = _group_histories(db.execute(rows_stmt).all())
+    _attach_sets(by_id, db.execute(sets_stmt).all())
+    return histories
+
+async def get_recent_histories_async(db: AsyncSession, limit: int = HISTORY_LIMIT) -> dict[int, list[dict]]:
+    rows_stmt, sets_stmt = _recent_stmts(limit)
+    histories, by_id = _group_histories((await db.execute(rows_stmt)).all())
+    _attach_sets(by_id, (await db.execute(sets_stmt)).all())
+    return histories
@@ -0,0 +1,55 @@
+import hashlib
+import json
+from sqlalchemy import func, delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.schema import IdempotencyKey
+
+# Header a client sets on a write it may retry; a retry with the same key
+# gets the first response back instead of writing again
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Keys only need to outlive a client's retry window
+KEY_TTL_DAYS = 1
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request."""
+
+def request_fingerprint(endpoint: str, payload) -> str:
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(f"{endpoint}\n{body}".encode()).hexdigest()
+
+def _stored_response(row, fingerprint: str):
+    if row is None:
+        return None
+    if row.fingerprint != fingerprint:
+        raise IdempotencyConflict(row.key)
+    return json.loads(row.response)
+
+def find_response(db: DbSession, key: str, fingerprint: str):
+    """The response stored for `key` (one primary-key lookup), or None if the key is new."""
+    return _stored_response(db.get(IdempotencyKey, key), fingerprint)
+
+async def find_response_async(db: AsyncSession, key: str, fingerprint: str):
+    return _stored_response(await db.get(IdempotencyKey, key), fingerprint)
+
+def store_response(db: DbSession, key: str, fingerprint: str, response: dict) -> dict:
+    """
+    Records the response of a completed write under `key` and commits. If a
+    concurrent request with the same key stored first, its response wins
+    and is returned, so every retry sees the same answer.
+    """
+    db.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.created_at < func.datetime('now', f'-{KEY_TTL_DAYS} days')
+    ))
+    res = db.execute(insert(IdempotencyKey).values(
+        key=key, fingerprint=fingerprint, response=json.dumps(response, default=str)
+    ).on_conflict_do_nothing())
+    db.commit()
+    if res.rowcount:
+        return response
+    db.expire_all()
+    return find_response(db, key, fingerprint)
+
+async def store_response_async(db: AsyncSession, key: str, fingerprint: str, response: dict) -> dict:
+    return await db.run_sync(store_response, key, fingerprint, response)
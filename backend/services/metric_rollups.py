@@ -0,0 +1,226 @@
+"""
+Weekly and monthly rollups of the dashboard metrics.
+
+daily_metrics and body_composition hold one row per day; a lifetime chart
+read from them grows with every day logged. metric_rollups keeps
+count/mean/min/max/last per (granularity, period, metric), refreshed for
+just the periods an ingest touched, so /dashboard/metrics reads at most a
+few dozen rows whatever the range.
+
+The response also carries the per-date rows Dashboard.jsx plots
+(body_comp, apple_health), pivoted from the same series.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from sqlalchemy import select, delete, func, case
+from sqlalchemy.orm import Session as DbSession
+from db.schema import DailyMetric, BodyComposition, MetricRollup
+
+# metric -> chart label
+METRICS = {
+    "bodyweight": "Bodyweight (kg)",
+    "body_fat": "Body Fat (%)",
+    "muscle_mass": "Muscle (kg)",
+    "sleep": "Sleep (hrs)",
+    "steps": "Steps",
+    "active_calories": "Active (kcal)",
+}
+_DAILY_COLUMNS = {
+    "bodyweight": DailyMetric.bodyweight_kg,
+    "sleep": DailyMetric.sleep_hours,
+    "steps": DailyMetric.steps,
+    "active_calories": DailyMetric.active_calories,
+}
+_BODY_COMP_COLUMNS = {
+    "body_fat": BodyComposition.body_fat_pct,
+    "muscle_mass": BodyComposition.muscle_mass_kg,
+}
+# metric -> key of the Dashboard.jsx row it lands in
+BODY_COMP_KEYS = {"bodyweight": "Weight_kg", "body_fat": "BodyFat_pct", "muscle_mass": "MuscleMass_kg"}
+ACTIVITY_KEYS = {"steps": "Steps", "active_calories": "Active_Kcal", "sleep": "Sleep_Total_Hrs"}
+GRANULARITIES = ("week", "month")
+STATS = ("mean", "min", "max", "last")
+
+# Requested range -> days; None is everything logged. day/week/month are
+# the keys Dashboard.jsx sends.
+RANGE_DAYS = {"7d": 7, "30d": 30, "1y": 365, "lifetime": None, "day": 1, "week": 7, "month": 30}
+# A chart uses the coarsest granularity that still gives this many points
+MIN_POINTS = 12
+_GRANULARITY_DAYS = {"month": 30, "week": 7}
+
+def period_start(granularity: str, d: date) -> date:
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    return d.replace(day=1)
+
+def period_end(granularity: str, start: date) -> date:
+    """First day of the next period."""
+    if granularity == "week":
+        return start + timedelta(days=7)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _daily_values(db: DbSession, start: date = None, end: date = None) -> dict:
+    """
+    {metric: [(date, value), ...]} oldest first, for start <= date < end.
+    Zero is how the sources record "not measured" (a Renpho field the
+    scale missed, a webhook with no sleep), so it is skipped like NULL.
+    """
+    def in_range(col):
+        conds = []
+        if start is not None:
+            conds.append(col >= start)
+        if end is not None:
+            conds.append(col < end)
+        return conds
+
+    values = defaultdict(list)
+    daily = db.execute(
+        select(DailyMetric.date, *_DAILY_COLUMNS.values())
+        .where(*in_range(DailyMetric.date)).order_by(DailyMetric.date)
+    ).all()
+    for row in daily:
+        for metric, value in zip(_DAILY_COLUMNS, row[1:]):
+            if value:
+                values[metric].append((row[0], value))
+
+    # Several sources may weigh in on one day; their mean is the day's value
+    body_comp = db.execute(
+        select(BodyComposition.date, *(func.avg(case((col > 0, col))) for col in _BODY_COMP_COLUMNS.values()))
+        .where(*in_range(BodyComposition.date))
+        .group_by(BodyComposition.date).order_by(BodyComposition.date)
+    ).all()
+    for row in body_comp:
+        for metric, value in zip(_BODY_COMP_COLUMNS, row[1:]):
+            if value is not None:
+                values[metric].append((row[0], value))
+    return values
+
+def _summarise(granularity: str, values: dict, starts: set = None) -> list[dict]:
+    """metric_rollups rows for `values`, limited to the periods in `starts` if given."""
+    points = defaultdict(list)
+    for metric, series in values.items():
+        for d, v in series:
+            points[(period_start(granularity, d), metric)].append((d, v))
+
+    rows = []
+    for (start, metric), pts in points.items():
+        if starts is not None and start not in starts:
+            continue
+        vals = [v for _, v in pts]
+        rows.append({
+            "granularity": granularity,
+            "period_start": start,
+            "metric": metric,
+            "count": len(vals),
+            "mean": sum(vals) / len(vals),
+            "min": min(vals),
+            "max": max(vals),
+            "last": pts[-1][1],
+            "last_date": pts[-1][0],
+        })
+    return rows
+
+def refresh_metric_rollups(db: DbSession, dates) -> int:
+    """
+    Recomputes the week and month rows covering `dates` from the daily
+    rows. Does not commit: the ingest that wrote those days calls it in
+    the same transaction. Returns rollup rows written.
+    """
+    dates = set(dates)
+    if not dates:
+        return 0
+    db.flush()
+    written = 0
+    for granularity in GRANULARITIES:
+        starts = {period_start(granularity, d) for d in dates}
+        db.execute(delete(MetricRollup).where(
+            MetricRollup.granularity == granularity, MetricRollup.period_start.in_(starts)
+        ))
+        values = _daily_values(db, min(starts), period_end(granularity, max(starts)))
+        rows = _summarise(granularity, values, starts)
+        if rows:
+            db.execute(MetricRollup.__table__.insert(), rows)
+        written += len(rows)
+    return written
+
+def rebuild_metric_rollups(db: DbSession) -> int:
+    """Drops and recomputes every rollup row. Used for backfills."""
+    db.execute(delete(MetricRollup))
+    values = _daily_values(db)
+    for granularity in GRANULARITIES:
+        rows = _summarise(granularity, values)
+        if rows:
+            db.execute(MetricRollup.__table__.insert(), rows)
+    db.commit()
+    return db.query(MetricRollup).count()
+
+def choose_granularity(span_days: int) -> str:
+    for granularity, days in _GRANULARITY_DAYS.items():
+        if span_days / days >= MIN_POINTS:
+            return granularity
+    return "day"
+
+def get_metric_chart(db: DbSession, range_key: str = "7d", stat: str = "mean", today: date = None) -> dict:
+    """
+    One dataset per metric over the range ending today: daily values for
+    short ranges, otherwise the `stat` of each week or month from
+    metric_rollups. Raises ValueError for an unknown range or stat.
+    """
+    if range_key not in RANGE_DAYS:
+        raise ValueError(f"Unknown range '{range_key}' (expected one of {', '.join(RANGE_DAYS)})")
+    if stat not in STATS:
+        raise ValueError(f"Unknown stat '{stat}' (expected one of {', '.join(STATS)})")
+    today = today or date.today()
+
+    days = RANGE_DAYS[range_key]
+    if days is None:
+        start = db.execute(
+            select(func.min(MetricRollup.period_start)).where(MetricRollup.granularity == "month")
+        ).scalar()
+        if start is None:
+            return {"labels": [], "datasets": [], "granularity": "day", "body_comp": [], "apple_health": []}
+    else:
+        start = today - timedelta(days=days - 1)
+    granularity = choose_granularity((today - start).days + 1)
+
+    series = defaultdict(dict)
+    if granularity == "day":
+        labels = [start + timedelta(days=i) for i in range((today - start).days + 1)]
+        for metric, pts in _daily_values(db, start, today + timedelta(days=1)).items():
+            series[metric] = dict(pts)
+    else:
+        labels = []
+        p = period_start(granularity, start)
+        while p <= today:
+            labels.append(p)
+            p = period_end(granularity, p)
+        rows = db.execute(
+            select(MetricRollup.period_start, MetricRollup.metric, getattr(MetricRollup, stat))
+            .where(MetricRollup.granularity == granularity,
+                   MetricRollup.period_start >= labels[0], MetricRollup.period_start <= today)
+        ).all()
+        for p, metric, value in rows:
+            series[metric][p] = value
+
+    def point(value):
+        return round(value, 2) if value is not None else None
+
+    def rows_for(keys):
+        """One row per label with any of `keys`' metrics, keyed the way Dashboard.jsx reads them."""
+        rows = []
+        for l in labels:
+            row = {key: point(series[metric].get(l)) for metric, key in keys.items()}
+            if any(v is not None for v in row.values()):
+                rows.append({"Date": l.isoformat(), **row})
+        return rows
+
+    return {
+        "labels": [l.isoformat() for l in labels],
+        "datasets": [
+            {"label": label, "yAxisID": metric, "data": [point(series[metric].get(l)) for l in labels]}
+            for metric, label in METRICS.items()
+        ],
+        "granularity": granularity,
+        "body_comp": rows_for(BODY_COMP_KEYS),
+        "apple_health": rows_for(ACTIVITY_KEYS),
+    }
@@ -1,49 +1,154 @@
 from datetime import date
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.schema import DailyMetric, BodyComposition
+from services.bodyweight import record_bodyweights
+from services.metric_rollups import refresh_metric_rollups
 
-def log_apple_health(db: DbSession, date_val: date, active_cal: int, resting_cal: int, steps: int, distance_km: float, sleep_hours: float):
-    m = db.query(DailyMetric).filter(DailyMetric.date == date_val).first()
-    if not m:
-        m = DailyMetric(date=date_val)
-        db.add(m)
-        
-    m.active_calories = active_cal
-    m.steps = steps
-    m.sleep_hours = sleep_hours
-    # Note: distance_km and resting_cal are omitted in daily_metrics per schema but can be added into notes
-    m.notes = f"Dist: {distance_km}km, RestingKcal: {resting_cal}"
-    
-    db.commit()
-    db.refresh(m)
-    return m
+# Batch upserts are built once and executed with a list of parameter
+# rows: the compiled statement is cached, where a multi-row VALUES literal
+# would be recompiled for every batch size.
+_DAILY_METRIC_FIELDS = ("active_calories", "steps", "sleep_hours", "notes")
+_BODY_COMPOSITION_FIELDS = ("bodyweight_kg", "body_fat_pct", "muscle_mass_kg", "water_pct")
 
-def log_renpho(db: DbSession, date_val: date, weight: float, bf: float, muscle: float, water: float):
-    bc = db.query(BodyComposition).filter(BodyComposition.date == date_val, BodyComposition.source == "renpho").first()
-    if not bc:
-        bc = BodyComposition(date=date_val, source="renpho")
-        db.add(bc)
-        
-    bc.bodyweight_kg = weight
-    bc.body_fat_pct = bf
-    bc.muscle_mass_kg = muscle
-    bc.water_pct = water
+def _apple_health_upsert():
+    stmt = insert(DailyMetric)
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyMetric.date],
+        set_={c: stmt.excluded[c] for c in _DAILY_METRIC_FIELDS},
+    )
+
+def _body_composition_upsert():
+    stmt = insert(BodyComposition)
+    return stmt.on_conflict_do_update(
+        index_elements=[BodyComposition.date, BodyComposition.source],
+        set_={c: stmt.excluded[c] for c in _BODY_COMPOSITION_FIELDS},
+    )
+
+def _bodyweight_mirror_upsert():
+    # Mirror weight to DailyMetric, keeping a bodyweight the day already has
+    stmt = insert(DailyMetric)
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyMetric.date],
+        set_={"bodyweight_kg": func.coalesce(func.nullif(DailyMetric.bodyweight_kg, 0), stmt.excluded.bodyweight_kg)},
+    ).returning(DailyMetric.date, DailyMetric.bodyweight_kg)
+
+def log_apple_health_batch(db: DbSession, days: list[dict]) -> int:
+    """
+    Upserts Apple Health days in one transaction with INSERT ... ON
+    CONFLICT(date) DO UPDATE; bodyweight on an existing row is untouched.
+    The weeks and months those days fall in are re-rolled up.
+    days: [{"date", "active_cal", "resting_cal", "steps", "distance_km", "sleep_hours"}]
+    A date repeated in the batch keeps its last entry. Returns days written.
+    """
+    rows = list({
+        d["date"]: {
+            "date": d["date"],
+            "active_calories": d["active_cal"],
+            "steps": d["steps"],
+            "sleep_hours": d["sleep_hours"],
+            # distance_km and resting_cal have no daily_metrics column; kept in notes
+            "notes": f"Dist: {d['distance_km']}km, RestingKcal: {d['resting_cal']}",
+        }
+        for d in days
+    }.values())
+    if rows:
+        db.execute(_apple_health_upsert(), rows)
+        refresh_metric_rollups(db, [r["date"] for r in rows])
     db.commit()
-    db.refresh(bc)
-    
-    # Mirror weight to DailyMetric
-    m = db.query(DailyMetric).filter(DailyMetric.date == date_val).first()
-    if not m:
-        m = DailyMetric(date=date_val, bodyweight_kg=weight)
-        db.add(m)
-    elif not m.bodyweight_kg:
-        m.bodyweight_kg = weight
-        
+    return len(rows)
+
+def log_renpho_batch(db: DbSession, days: list[dict]) -> int:
+    """
+    Upserts Renpho readings in one transaction: body_composition on
+    (date, source), the weight mirrored into daily_metrics where that day
+    has no bodyweight yet, one bodyweight-trend roll-forward and the
+    affected metric rollups.
+    days: [{"date", "weight", "bf", "muscle", "water"}]
+    A date repeated in the batch keeps its last entry. Returns days written.
+    """
+    rows = list({
+        d["date"]: {
+            "date": d["date"],
+            "source": "renpho",
+            "bodyweight_kg": d["weight"],
+            "body_fat_pct": d["bf"],
+            "muscle_mass_kg": d["muscle"],
+            "water_pct": d["water"],
+        }
+        for d in days
+    }.values())
+
+    weigh_ins = {}
+    if rows:
+        db.execute(_body_composition_upsert(), rows)
+        weigh_ins = dict(db.execute(
+            _bodyweight_mirror_upsert(), [{"date": r["date"], "bodyweight_kg": r["bodyweight_kg"]} for r in rows]
+        ).all())
+
+    record_bodyweights(db, weigh_ins)
+    refresh_metric_rollups(db, [r["date"] for r in rows])
     db.commit()
-    return bc
+    return len(rows)
+
+def log_apple_health(db: DbSession, date_val: date, active_cal: int, resting_cal: int, steps: int, distance_km: float, sleep_hours: float):
+    log_apple_health_batch(db, [{
+        "date": date_val, "active_cal": active_cal, "resting_cal": resting_cal,
+        "steps": steps, "distance_km": distance_km, "sleep_hours": sleep_hours,
+    }])
+    return db.query(DailyMetric).filter(DailyMetric.date == date_val).first()
+
+def log_renpho(db: DbSession, date_val: date, weight: float, bf: float, muscle: float, water: float):
+    log_renpho_batch(db, [{"date": date_val, "weight": weight, "bf": bf, "muscle": muscle, "water": water}])
+    return db.query(BodyComposition).filter(BodyComposition.date == date_val, BodyComposition.source == "renpho").first()
+
+# Columns served by /metrics/daily and /metrics/body_composition. Selecting
+# them as plain rows skips building (and identity-mapping) ORM instances
+# that would only be flattened back into dicts for the response.
+DAILY_METRIC_COLUMNS = (
+    DailyMetric.id, DailyMetric.date, DailyMetric.bodyweight_kg, DailyMetric.sleep_hours,
+    DailyMetric.sleep_score, DailyMetric.steps, DailyMetric.active_calories,
+    DailyMetric.resting_hr, DailyMetric.hrv, DailyMetric.notes, DailyMetric.created_at,
+)
+BODY_COMPOSITION_COLUMNS = (
+    BodyComposition.id, BodyComposition.date, BodyComposition.bodyweight_kg,
+    BodyComposition.body_fat_pct, BodyComposition.muscle_mass_kg, BodyComposition.water_pct,
+    BodyComposition.source, BodyComposition.created_at,
+)
+
+def _recent_metrics_stmt(limit: int):
+    return select(*DAILY_METRIC_COLUMNS).order_by(DailyMetric.date.desc()).limit(limit)
+
+def _recent_body_composition_stmt(limit: int):
+    return select(*BODY_COMPOSITION_COLUMNS).order_by(BodyComposition.date.desc()).limit(limit)
+
+def get_recent_metrics(db: DbSession, limit: int = 14) -> list[dict]:
+    return [dict(r) for r in db.execute(_recent_metrics_stmt(limit)).mappings()]
+
+def get_recent_body_composition(db: DbSession, limit: int = 14) -> list[dict]:
+    return [dict(r) for r in db.execute(_recent_body_composition_stmt(limit)).mappings()]
+
+# Async variants for the FastAPI routes. Writes run the sync upserts above
+# through run_sync so the bodyweight-trend maintenance has one implementation;
+# reads are plain awaited SELECTs.
+async def log_apple_health_async(db: AsyncSession, date_val: date, active_cal: int, resting_cal: int, steps: int, distance_km: float, sleep_hours: float):
+    return await db.run_sync(log_apple_health, date_val, active_cal, resting_cal, steps, distance_km, sleep_hours)
+
+async def log_renpho_async(db: AsyncSession, date_val: date, weight: float, bf: float, muscle: float, water: float):
+    return await db.run_sync(log_renpho, date_val, weight, bf, muscle, water)
+
+async def log_apple_health_batch_async(db: AsyncSession, days: list[dict]) -> int:
+    return await db.run_sync(log_apple_health_batch, days)
+
+async def log_renpho_batch_async(db: AsyncSession, days: list[dict]) -> int:
+    return await db.run_sync(log_renpho_batch, days)
 
-def get_recent_metrics(db: DbSession, limit: int = 14):
-    return db.query(DailyMetric).order_by(DailyMetric.date.desc()).limit(limit).all()
+async def get_recent_metrics_async(db: AsyncSession, limit: int = 14) -> list[dict]:
+    res = await db.execute(_recent_metrics_stmt(limit))
+    return [dict(r) for r in res.mappings()]
 
-def get_recent_body_composition(db: DbSession, limit: int = 14):
-    return db.query(BodyComposition).order_by(BodyComposition.date.desc()).limit(limit).all()
+async def get_recent_body_composition_async(db: AsyncSession, limit: int = 14) -> list[dict]:
+    res = await db.execute(_recent_body_composition_stmt(limit))
+    return [dict(r) for r in res.mappings()]
@@ -0,0 +1,117 @@
+"""
+Per-muscle-group levels from exponentially decayed training load.
+
+Each set adds its e1RM to its muscle group's load, and load halves every
+HALF_LIFE_DAYS. Decay is linear, so a group's whole history folds into
+one (value, last_update) pair in muscle_load: moving it to another date is
+one multiplication, and a set dated before last_update is decayed forward
+before it is added. Neither a write nor a read rescans history.
+
+aggregates.refresh_exercise_week keeps the pair current: each
+exercise_week_stats row stores its week's load decayed to its
+last_session_date, and a refresh applies new minus old to the group, so
+edits, deletes and re-sent sets are exact too.
+"""
+import math
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DbSession
+from db.schema import MuscleLoad, ExerciseWeekStat, Exercise
+
+HALF_LIFE_DAYS = 14
+_DECAY_PER_DAY = math.log(2) / HALF_LIFE_DAYS
+# Level L starts at XP_PER_LEVEL_SQUARED * L^2 XP (load), so each level
+# takes a little more than the last
+XP_PER_LEVEL_SQUARED = 10
+TARGET_LEVEL = 20
+
+# exercises.muscle_group -> the muscle keys MuscleMap.jsx maps onto its SVG
+MUSCLE_KEYS = {
+    "chest": "chest",
+    "back": "upper-back",
+    "lower_back": "lower-back",
+    "traps": "trapezius",
+    "shoulders": "front-deltoids",
+    "rear_delts": "back-deltoids",
+    "biceps": "biceps",
+    "triceps": "triceps",
+    "forearms": "forearm",
+    "abs": "abs",
+    "quads": "quadriceps",
+    "hamstrings": "hamstring",
+    "glutes": "gluteal",
+    "calves": "calves",
+}
+
+def decay(days: float) -> float:
+    """Fraction of a load left after `days` (1.0 for days <= 0)."""
+    return math.exp(-_DECAY_PER_DAY * max(days, 0))
+
+def week_load(sets, as_of: date) -> float:
+    """Sum of e1RM over (e1rm, date) pairs, each decayed to `as_of`."""
+    return sum((e1rm or 0.0) * decay((as_of - d).days) for e1rm, d in sets)
+
+def apply_muscle_load(db: DbSession, muscle_group: str, load: float, at: date):
+    """
+    Adds `load`, measured at date `at`, to the group's decayed load; a
+    negative load takes one back out. O(1). Does not commit.
+    """
+    if not load:
+        return
+    # Sessions don't autoflush; a row added earlier in this transaction
+    # must be visible to the get below
+    db.flush()
+    row = db.get(MuscleLoad, muscle_group)
+    if row is None:
+        db.add(MuscleLoad(muscle_group=muscle_group, value=load, last_update=at))
+    elif at >= row.last_update:
+        row.value = row.value * decay((at - row.last_update).days) + load
+        row.last_update = at
+    else:
+        row.value += load * decay((row.last_update - at).days)
+
+def rebuild_muscle_loads(db: DbSession) -> int:
+    """Recomputes every group's load from exercise_week_stats. Used for backfills."""
+    db.query(MuscleLoad).delete()
+    rows = db.execute(
+        select(Exercise.muscle_group, ExerciseWeekStat.load_e1rm, ExerciseWeekStat.last_session_date)
+        .join(Exercise, Exercise.id == ExerciseWeekStat.exercise_id)
+        .where(ExerciseWeekStat.load_e1rm > 0)
+        .order_by(ExerciseWeekStat.last_session_date)
+    ).all()
+    for muscle_group, load, at in rows:
+        apply_muscle_load(db, muscle_group, load, at)
+    db.commit()
+    return db.query(MuscleLoad).count()
+
+def level_for(xp: float) -> int:
+    return int(math.sqrt(max(xp, 0.0) / XP_PER_LEVEL_SQUARED))
+
+def get_muscle_levels(db: DbSession, today: date = None) -> dict:
+    """
+    Every muscle group's level today: its stored load decayed from
+    last_update, with the XP progress within the level. Groups never
+    trained are level 0. One read of muscle_load, a row per group.
+    """
+    today = today or date.today()
+    loads = {r.muscle_group: r for r in db.execute(select(MuscleLoad)).scalars()}
+
+    levels = []
+    for muscle_group in {**MUSCLE_KEYS, **loads}:
+        row = loads.get(muscle_group)
+        xp = max(row.value * decay((today - row.last_update).days), 0.0) if row else 0.0
+        level = level_for(xp)
+        floor, ceiling = XP_PER_LEVEL_SQUARED * level ** 2, XP_PER_LEVEL_SQUARED * (level + 1) ** 2
+        levels.append({
+            "muscle": MUSCLE_KEYS.get(muscle_group, muscle_group),
+            "muscle_group": muscle_group,
+            "display_name": muscle_group.replace("_", " ").title(),
+            "level": level,
+            "xp": round(xp, 1),
+            "xp_in_level": round(xp - floor, 1),
+            "xp_for_next": ceiling - floor,
+            "xp_pct": round(100 * (xp - floor) / (ceiling - floor), 1),
+            "target_level": TARGET_LEVEL,
+            "last_update": row.last_update if row else None,
+        })
+    return {"muscle_levels": levels}
@@ -1,4 +1,5 @@
 import json
+from bisect import bisect_left
 
 def validate_session_data(sets: list[dict]) -> list[str]:
     """
@@ -72,18 +73,82 @@ def advance_bench_cycle(current_week: int, completed_weight_kg: float, bench_pr_
 
     return {"next_week": next_week, "bench_pr_kg": new_pr}
 
-def get_next_weight(current_weight, weights_available, direction):
-    if not weights_available:
-        return current_weight
-        
-    if current_weight not in weights_available:
-        current_weight = min(weights_available, key=lambda x: abs(x - current_weight))
-        
-    idx = weights_available.index(current_weight)
-    if direction == "up":
-        return weights_available[min(idx + 1, len(weights_available) - 1)]
+BARBELL_WEIGHTS = [20.0 + i*2.5 for i in range(100)]
+DUMBBELL_WEIGHTS = [1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 12.0, 14.0, 16.0, 18.0, 20.0, 22.0, 24.0, 26.0, 28.0, 30.0, 32.0, 34.0, 36.0, 38.0, 40.0]
+
+class WeightLadder:
+    """
+    Sorted list of loadable weights with O(log n) lookups.
+    snap() picks the nearest rung (the lighter one on ties), up()/down()
+    move one rung from the snapped position and clamp at the ends.
+    """
+
+    def __init__(self, weights: list):
+        self.weights = sorted(weights)
+
+    @classmethod
+    def from_spec(cls, avail_str: str) -> "WeightLadder":
+        if avail_str == "free_barbell":
+            return cls(BARBELL_WEIGHTS)
+        if avail_str == "free_dumbbell":
+            return cls(DUMBBELL_WEIGHTS)
+        try:
+            weights = json.loads(avail_str)
+            if not isinstance(weights, list):
+                weights = [0.0]
+        except (ValueError, TypeError):
+            weights = [0.0]
+        return cls(weights)
+
+    def _index(self, weight) -> int:
+        w = self.weights
+        i = bisect_left(w, weight)
+        if i < len(w) and w[i] == weight:
+            return i
+        if i == 0:
+            return 0
+        if i == len(w):
+            return bisect_left(w, w[-1])
+        # Lighter rung wins ties, like min(key=abs) over an ascending list
+        if abs(weight - w[i - 1]) <= abs(weight - w[i]):
+            return bisect_left(w, w[i - 1])
+        return i
+
+    def snap(self, weight):
+        if not self.weights:
+            return weight
+        return self.weights[self._index(weight)]
+
+    def up(self, weight):
+        if not self.weights:
+            return weight
+        return self.weights[min(self._index(weight) + 1, len(self.weights) - 1)]
+
+    def down(self, weight):
+        if not self.weights:
+            return weight
+        return self.weights[max(self._index(weight) - 1, 0)]
+
+    def step(self, weight, direction: str):
+        return self.up(weight) if direction == "up" else self.down(weight)
+
+
+# exercise_id -> (weights_available spec, compiled ladder)
+_ladder_cache: dict[int, tuple[str, WeightLadder]] = {}
+
+def get_weight_ladder(exercise) -> WeightLadder:
+    cached = _ladder_cache.get(exercise.id)
+    if cached and cached[0] == exercise.weights_available:
+        return cached[1]
+    ladder = WeightLadder.from_spec(exercise.weights_available)
+    _ladder_cache[exercise.id] = (exercise.weights_available, ladder)
+    return ladder
+
+def invalidate_weight_ladder(exercise_id: int = None):
+    if exercise_id is None:
+        _ladder_cache.clear()
     else:
-        return weights_available[max(idx - 1, 0)]
+        _ladder_cache.pop(exercise_id, None)
 
 def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metrics: list[dict], db_session) -> list[dict]:
     from db.schema import Exercise
@@ -91,26 +156,35 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
     if not exercise:
         return []
 
+    return compute_exercise_plan(exercise, sessions_history, daily_metrics)
+
+def compute_bw_delta(daily_metrics: list[dict]) -> float:
+    bw_delta = 0.0
+    if len(daily_metrics) >= 8:
+        bw_last = daily_metrics[-1].get("bodyweight_kg", 0)
+        bw_prev = daily_metrics[-8].get("bodyweight_kg", 0)
+        if bw_last and bw_prev:
+            bw_delta = bw_last - bw_prev
+    return bw_delta
+
+def compute_mean_order(sessions_history: list[dict]) -> float:
+    all_orders = [s.get("exercise_order", 1) for s in sessions_history if s.get("exercise_order") is not None]
+    return sum(all_orders) / len(all_orders) if all_orders else 1
+
+def compute_exercise_plan(exercise, sessions_history: list[dict], daily_metrics: list[dict], bw_delta: float = None) -> list[dict]:
+    """
+    Same heuristics as compute_next_week, but works on an already-loaded
+    Exercise row so callers can plan many exercises without re-querying.
+    Pass bw_delta (e.g. from services.bodyweight) to skip deriving it from
+    the daily_metrics list.
+    """
     if exercise.is_bench_cycle:
         return []
         
     if not sessions_history:
         return [{"set_number": 1, "weight_kg": 0.0, "reps": exercise.rep_ceiling}]
 
-    avail_str = exercise.weights_available
-    if avail_str == "free_barbell":
-        weights_available = [20.0 + i*2.5 for i in range(100)]
-    elif avail_str == "free_dumbbell":
-        weights_available = [1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 12.0, 14.0, 16.0, 18.0, 20.0, 22.0, 24.0, 26.0, 28.0, 30.0, 32.0, 34.0, 36.0, 38.0, 40.0]
-    else:
-        try:
-            weights_available = json.loads(avail_str)
-            if not isinstance(weights_available, list):
-                weights_available = [0.0]
-        except:
-            weights_available = [0.0]
-            
-    weights_available.sort()
+    ladder = get_weight_ladder(exercise)
 
     last_session = sessions_history[-1]
     sets = last_session.get("sets", [])
@@ -137,18 +211,13 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
     else:
         status = "WITHIN_RANGE"
         
-    bw_delta = 0.0
-    if len(daily_metrics) >= 8:
-        bw_last = daily_metrics[-1].get("bodyweight_kg", 0)
-        bw_prev = daily_metrics[-8].get("bodyweight_kg", 0)
-        if bw_last and bw_prev:
-            bw_delta = bw_last - bw_prev
+    if bw_delta is None:
+        bw_delta = compute_bw_delta(daily_metrics)
 
     decision = "DROP"
     if status == "CHECK_FATIGUE":
         exercise_order_last = last_session.get("exercise_order", 1)
-        all_orders = [s.get("exercise_order", 1) for s in sessions_history if s.get("exercise_order") is not None]
-        mean_order = sum(all_orders) / len(all_orders) if all_orders else 1
+        mean_order = compute_mean_order(sessions_history)
         
         if (exercise_order_last - mean_order) >= 2:
             decision = "HOLD"
@@ -159,7 +228,7 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
     substitution_flag = False
     
     if status == "ADD_WEIGHT":
-        next_top_weight = get_next_weight(weight_s1, weights_available, "up")
+        next_top_weight = ladder.up(weight_s1)
         if exercise.machine_max is not None and next_top_weight >= exercise.machine_max and reps_s1 > exercise.rep_ceiling:
             substitution_flag = True
         next_top_reps = exercise.rep_floor
@@ -168,7 +237,7 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
         next_top_reps = min(reps_s1 + 1, exercise.rep_ceiling)
         next_top_weight = weight_s1
         if bw_delta <= 0 and reps_s1 >= exercise.rep_ceiling - 1:
-            next_top_weight = get_next_weight(weight_s1, weights_available, "up")
+            next_top_weight = ladder.up(weight_s1)
             next_top_reps = exercise.rep_floor
             
     elif status == "CHECK_FATIGUE":
@@ -176,7 +245,7 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
             next_top_weight = weight_s1
             next_top_reps = reps_s1
         else:
-            next_top_weight = get_next_weight(weight_s1, weights_available, "down")
+            next_top_weight = ladder.down(weight_s1)
             next_top_reps = exercise.rep_ceiling
             
     results = []
@@ -189,11 +258,11 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
     for p in range(2, num_sets + 1):
         target_w = next_top_weight * ((1 - drop_rate_mean) ** (p - 1))
         
-        target_w = min(weights_available, key=lambda x: abs(x - target_w))
+        target_w = ladder.snap(target_w)
         
         prev_w = results[-1]["weight_kg"]
         if target_w >= prev_w:
-            target_w = get_next_weight(prev_w, weights_available, "down")
+            target_w = ladder.down(prev_w)
             
         results.append({"set_number": p, "weight_kg": target_w, "reps": next_top_reps})
         
@@ -202,3 +271,64 @@ def compute_next_week(exercise_id: int, sessions_history: list[dict], daily_metr
             r["substitution_flag"] = True
             
     return results
+
+def load_weekly_inputs(db_session):
+    """
+    Loads every non-bench exercise with its recent session history (the
+    same bounded, date-ordered window /progression/{id} uses) and the
+    current 7-day bodyweight delta, in a handful of set-based queries.
+    Returns (exercises, history_by_exercise_id, bw_delta).
+
+    History is not read from exercise_week_stats: compute_exercise_plan
+    needs every set of the last session (drop rates, set count) and each
+    session's exercise_order, and a weekly row keeps only the top set.
+    The HISTORY_LIMIT window keeps the read bounded instead.
+    """
+    from db.schema import Exercise
+    from services.bodyweight import get_bodyweight_delta
+    from services.history import get_recent_histories
+
+    exercises = db_session.query(Exercise).filter(Exercise.is_bench_cycle == False).order_by(Exercise.id).all()
+    return exercises, get_recent_histories(db_session), get_bodyweight_delta(db_session)
+
+async def load_weekly_inputs_async(db_session):
+    """load_weekly_inputs on an AsyncSession."""
+    from sqlalchemy import select
+    from db.schema import Exercise
+    from services.bodyweight import get_bodyweight_delta_async
+    from services.history import get_recent_histories_async
+
+    res = await db_session.execute(
+        select(Exercise).where(Exercise.is_bench_cycle == False).order_by(Exercise.id)
+    )
+    exercises = res.scalars().all()
+    return exercises, await get_recent_histories_async(db_session), await get_bodyweight_delta_async(db_session)
+
+async def load_exercise_inputs_async(db_session, exercise_id: int):
+    """
+    (exercise, history, bw_delta) for one exercise on an AsyncSession, the
+    inputs /progression/{id} feeds to compute_exercise_plan. exercise is
+    None when the id is unknown.
+    """
+    from db.schema import Exercise
+    from services.bodyweight import get_bodyweight_delta_async
+    from services.history import get_exercise_history_async
+
+    ex = await db_session.get(Exercise, exercise_id)
+    if not ex:
+        return None, [], 0.0
+    return ex, await get_exercise_history_async(db_session, exercise_id), await get_bodyweight_delta_async(db_session)
+
+def compute_weekly_progression(db_session) -> list[dict]:
+    """
+    Runs compute_exercise_plan for every non-bench exercise over inputs
+    loaded in a handful of queries, instead of ~4 queries per exercise.
+    """
+    return plan_week(*load_weekly_inputs(db_session))
+
+def plan_week(exercises, history_by_ex: dict, bw_delta: float) -> list[dict]:
+    week = []
+    for ex in exercises:
+        plan = compute_exercise_plan(ex, history_by_ex.get(ex.id, []), [], bw_delta)
+        week.append({"exercise_id": ex.id, "exercise": ex.name, "plan": plan})
+    return week
@@ -0,0 +1,204 @@
+"""
+progression_batch.py — Vectorised twin of compute_exercise_plan().
+
+Plans thousands of (athlete, exercise) rows at once for nightly planning.
+compute_exercise_plan() in progression.py stays the reference
+implementation; every rule here mirrors it line for line, and
+tests/test_progression_batch.py checks both agree, on gym.db and on
+fuzzed rows.
+
+Rows are padded to the widest session (S sets). Weight ladders are shared
+by every row of the same exercise, so they are stored once and rows are
+snapped per distinct ladder with np.searchsorted, mirroring WeightLadder.
+"""
+
+import numpy as np
+
+from services.progression import get_weight_ladder, compute_mean_order
+
+ADD_WEIGHT, WITHIN_RANGE, CHECK_FATIGUE = 0, 1, 2
+STATUS_NAMES = {ADD_WEIGHT: "ADD_WEIGHT", WITHIN_RANGE: "WITHIN_RANGE", CHECK_FATIGUE: "CHECK_FATIGUE"}
+
+
+def build_batch(rows: list[tuple]) -> dict:
+    """
+    rows: (exercise, sessions_history, bw_delta) triples, the same inputs
+    compute_exercise_plan takes. Bench-cycle exercises are skipped by the
+    caller (they have no heuristic plan).
+    Returns a dict of aligned NumPy arrays.
+    """
+    n = len(rows)
+    last_sets = [(hist[-1].get("sets", []) if hist else []) for _, hist, _ in rows]
+    max_sets = max([len(s) for s in last_sets] + [1])
+
+    batch = {
+        "weights": np.zeros((n, max_sets)),
+        "reps": np.zeros((n, max_sets), dtype=np.int64),
+        "n_sets": np.zeros(n, dtype=np.int64),
+        "order_last": np.ones(n),
+        "mean_order": np.ones(n),
+        "bw_delta": np.zeros(n),
+        "rep_floor": np.zeros(n, dtype=np.int64),
+        "rep_ceiling": np.zeros(n, dtype=np.int64),
+        "machine_max": np.full(n, np.nan),
+        "ladder_id": np.zeros(n, dtype=np.int64),
+        "ladders": [],
+    }
+
+    ladder_ids = {}
+    for i, (ex, hist, bw_delta) in enumerate(rows):
+        sets = last_sets[i]
+        batch["n_sets"][i] = len(sets)
+        for j, st in enumerate(sets):
+            batch["weights"][i, j] = st["weight_kg"]
+            batch["reps"][i, j] = st["reps"]
+        if hist:
+            batch["order_last"][i] = hist[-1].get("exercise_order", 1)
+            batch["mean_order"][i] = compute_mean_order(hist)
+        batch["bw_delta"][i] = bw_delta
+        batch["rep_floor"][i] = ex.rep_floor
+        batch["rep_ceiling"][i] = ex.rep_ceiling
+        if ex.machine_max is not None:
+            batch["machine_max"][i] = ex.machine_max
+
+        rungs = tuple(get_weight_ladder(ex).weights)
+        if rungs not in ladder_ids:
+            ladder_ids[rungs] = len(batch["ladders"])
+            batch["ladders"].append(np.asarray(rungs, dtype=float))
+        batch["ladder_id"][i] = ladder_ids[rungs]
+
+    return batch
+
+
+def _ladder_index(w: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Vectorised WeightLadder._index over one non-empty ladder."""
+    m = len(w)
+    i = np.searchsorted(w, x, side="left")
+    lo = np.clip(i - 1, 0, m - 1)
+    hi = np.clip(i, 0, m - 1)
+    exact = (i < m) & (w[hi] == x)
+    # Lighter rung wins ties, like min(key=abs) over an ascending list
+    take_lo = (i == m) | ((i > 0) & (np.abs(x - w[lo]) <= np.abs(x - w[hi])))
+    idx = np.where(take_lo, lo, hi)
+    # First occurrence of the chosen rung, as list.index() would return
+    idx = np.searchsorted(w, w[idx], side="left")
+    return np.where(exact, hi, idx)
+
+def _ladder_op(batch: dict, x: np.ndarray, op: str) -> np.ndarray:
+    out = x.astype(float)
+    for lid, w in enumerate(batch["ladders"]):
+        if len(w) == 0:
+            continue
+        rows = batch["ladder_id"] == lid
+        if not rows.any():
+            continue
+        idx = _ladder_index(w, x[rows])
+        if op == "up":
+            idx = np.minimum(idx + 1, len(w) - 1)
+        elif op == "down":
+            idx = np.maximum(idx - 1, 0)
+        out[rows] = w[idx]
+    return out
+
+
+def plan_batch(batch: dict) -> dict:
+    """
+    Vectorised compute_exercise_plan over every row of a batch.
+    Returns status codes, HOLD flags, top-set reps, per-set target weights
+    (padded past n_out), the number of planned sets and substitution flags.
+    """
+    w = batch["weights"]
+    r = batch["reps"]
+    n_sets = batch["n_sets"]
+    floor, ceiling = batch["rep_floor"], batch["rep_ceiling"]
+    n, max_sets = w.shape
+
+    has_sets = n_sets > 0
+    w1 = w[:, 0]
+    r1 = r[:, 0]
+
+    # Mean drop rate between consecutive sets; summed column by column so the
+    # float result matches the scalar left-to-right sum() exactly.
+    drop_sum = np.zeros(n)
+    drop_cnt = np.zeros(n, dtype=np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(max_sets - 1):
+            valid = (i + 1 < n_sets) & (w[:, i] > 0)
+            rate = (w[:, i] - w[:, i + 1]) / w[:, i]
+            drop_sum = np.where(valid, drop_sum + rate, drop_sum)
+            drop_cnt += valid
+        drop_mean = np.where(drop_cnt > 0, drop_sum / np.maximum(drop_cnt, 1), 0.05)
+
+    status = np.where(r1 > ceiling, ADD_WEIGHT, np.where(r1 < floor, CHECK_FATIGUE, WITHIN_RANGE))
+    hold = (status == CHECK_FATIGUE) & ((batch["order_last"] - batch["mean_order"]) >= 2)
+
+    up = _ladder_op(batch, w1, "up")
+    down = _ladder_op(batch, w1, "down")
+
+    within_bump = (batch["bw_delta"] <= 0) & (r1 >= ceiling - 1)
+    top_w = np.select(
+        [status == ADD_WEIGHT, (status == WITHIN_RANGE) & within_bump, status == WITHIN_RANGE, hold],
+        [up, up, w1, w1],
+        down,
+    )
+    top_r = np.select(
+        [status == ADD_WEIGHT, (status == WITHIN_RANGE) & within_bump, status == WITHIN_RANGE, hold],
+        [floor, floor, np.minimum(r1 + 1, ceiling), r1],
+        ceiling,
+    )
+    substitution = (
+        (status == ADD_WEIGHT)
+        & ~np.isnan(batch["machine_max"])
+        & (top_w >= batch["machine_max"])
+        & (r1 > ceiling)
+    )
+
+    # Rows without a logged set fall back to a single empty top set
+    top_w = np.where(has_sets, top_w, 0.0)
+    top_r = np.where(has_sets, top_r, ceiling)
+    substitution &= has_sets
+    n_out = np.maximum(n_sets, 1)
+
+    # (1 - drop_mean) ** k via Python's pow on the distinct drop rates only:
+    # NumPy's SIMD pow can differ from libm in the last ulp, which would make
+    # the scalar and vectorised plans disagree on unsnapped weights.
+    uniq, inverse = np.unique(1 - drop_mean, return_inverse=True)
+    decay = np.array([[base ** k for k in range(max_sets)] for base in uniq.tolist()]).reshape(len(uniq), max_sets)[inverse]
+
+    targets = np.zeros((n, max_sets))
+    targets[:, 0] = top_w
+    for p in range(2, max_sets + 1):
+        prev_w = targets[:, p - 2]
+        target_w = _ladder_op(batch, top_w * decay[:, p - 1], "snap")
+        target_w = np.where(target_w >= prev_w, _ladder_op(batch, prev_w, "down"), target_w)
+        targets[:, p - 1] = np.where(p <= n_out, target_w, 0.0)
+
+    return {
+        "status": status,
+        "hold": hold,
+        "top_reps": top_r,
+        "targets": targets,
+        "n_out": n_out,
+        "substitution_flag": substitution,
+    }
+
+
+def plans_to_dicts(result: dict) -> list[list[dict]]:
+    """Converts plan_batch output back to compute_exercise_plan's list-of-dicts shape."""
+    plans = []
+    for i in range(len(result["n_out"])):
+        reps = int(result["top_reps"][i])
+        plan = [
+            {"set_number": p + 1, "weight_kg": float(result["targets"][i, p]), "reps": reps}
+            for p in range(int(result["n_out"][i]))
+        ]
+        if result["substitution_flag"][i]:
+            for st in plan:
+                st["substitution_flag"] = True
+        plans.append(plan)
+    return plans
+
+
+def compute_batch_plans(rows: list[tuple]) -> list[list[dict]]:
+    return plans_to_dicts(plan_batch(build_batch(rows)))
+
@@ -0,0 +1,79 @@
+from sqlalchemy.orm import Session as DbSession
+from db.schema import Session, SessionExercise, Set, Exercise
+
+def load_session_trees(db: DbSession, *criteria) -> list[dict]:
+    """
+    Loads sessions matching `criteria` as plain dicts:
+    session -> exercises (with catalog name / rep_ceiling) -> sets.
+    Always three queries, however many exercises and sets a day holds,
+    instead of a lazy SELECT per session_exercise, per exercise and per
+    set list. Exercises come back in exercise_order, sets in set_number.
+    """
+    sessions = db.query(
+        Session.id, Session.date, Session.day_label, Session.week_number, Session.day_number
+    ).filter(*criteria).order_by(Session.id).all()
+
+    trees = []
+    by_session = {}
+    for session_id, date_val, day_label, week_number, day_number in sessions:
+        tree = {
+            "id": session_id,
+            "date": date_val,
+            "day_label": day_label,
+            "week_number": week_number,
+            "day_number": day_number,
+            "exercises": [],
+        }
+        trees.append(tree)
+        by_session[session_id] = tree
+    if not trees:
+        return trees
+
+    session_ids = list(by_session.keys())
+    se_rows = db.query(
+        SessionExercise.id, SessionExercise.session_id, SessionExercise.exercise_id,
+        SessionExercise.exercise_order, SessionExercise.is_superset, SessionExercise.superset_group,
+        Exercise.name, Exercise.rep_ceiling,
+    ).join(
+        Exercise, Exercise.id == SessionExercise.exercise_id
+    ).filter(
+        SessionExercise.session_id.in_(session_ids)
+    ).order_by(SessionExercise.session_id, SessionExercise.exercise_order, SessionExercise.id).all()
+
+    by_se = {}
+    for se_id, session_id, exercise_id, order, is_superset, superset_group, name, rep_ceiling in se_rows:
+        se = {
+            "id": se_id,
+            "exercise_id": exercise_id,
+            "exercise_name": name,
+            "rep_ceiling": rep_ceiling,
+            "exercise_order": order,
+            "is_superset": is_superset,
+            "superset_group": superset_group,
+            "sets": [],
+        }
+        by_session[session_id]["exercises"].append(se)
+        by_se[se_id] = se
+
+    set_rows = db.query(
+        Set.id, Set.session_exercise_id, Set.set_number, Set.weight_kg, Set.reps, Set.e1rm
+    ).join(
+        SessionExercise, SessionExercise.id == Set.session_exercise_id
+    ).filter(
+        SessionExercise.session_id.in_(session_ids)
+    ).order_by(Set.session_exercise_id, Set.set_number, Set.id).all()
+
+    for set_id, se_id, set_number, weight_kg, reps, e1rm in set_rows:
+        by_se[se_id]["sets"].append({
+            "id": set_id,
+            "set_number": set_number,
+            "weight_kg": weight_kg,
+            "reps": reps,
+            "e1rm": e1rm,
+        })
+
+    return trees
+
+def load_session_tree(db: DbSession, session_id: int):
+    trees = load_session_trees(db, Session.id == session_id)
+    return trees[0] if trees else None
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Rendered /plan, /workout and /stats bodies, keyed by
+# (athlete, "plan", week), (athlete, "workout", week, day) and
+# (athlete, "stats", week); athlete is None for the default gym.db.
+CACHE_SIZE = 256
+
+class ResponseCache:
+    """
+    LRU of serialised JSON bodies plus their ETags. Write routes invalidate
+    the keys they affect; the generation counter stops a read that started
+    before an invalidation from re-inserting the body it built from
+    pre-write rows.
+    """
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, body: bytes, generation: int) -> tuple[str, bytes]:
+        entry = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *keys: tuple):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_prefix(self, athlete_id, endpoint: str):
+        """Drops every key of one athlete's endpoint, e.g. all their ("stats", week) rows."""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if k[:2] == (athlete_id, endpoint)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+response_cache = ResponseCache()
+
+def invalidate_day(athlete_id, week_number: int, day_number: int, new_week: bool = False):
+    """
+    A session or set changed on (week, day): that day's workout view, the
+    week's plan and the week's day-completion stats. A brand-new week also
+    changes the week list every /plan response carries.
+    """
+    if new_week:
+        response_cache.invalidate_prefix(athlete_id, "plan")
+    response_cache.invalidate(
+        (athlete_id, "plan", week_number),
+        (athlete_id, "workout", week_number, day_number),
+        (athlete_id, "stats", week_number),
+    )
+
+def invalidate_bench(athlete_id):
+    """The bench cycle is rendered into /stats for every week."""
+    response_cache.invalidate_prefix(athlete_id, "stats")
@@ -0,0 +1,178 @@
+"""
+Background metric ingestion, started from the app lifespan.
+
+Each IngestionJob wraps a source: a blocking callable that pulls from an
+external service and returns a small summary dict (fetch_renpho.sync is
+one). The scheduler runs every job on its own interval in a worker
+thread, off the request path, retrying failures with jittered
+exponential backoff. A job never overlaps itself: a run that is still
+going (scheduled or triggered by hand) makes the next one skip.
+"""
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+# First run shortly after boot, jittered so restarts don't stampede a source
+STARTUP_DELAY_SECONDS = 5
+RETRY_BASE_SECONDS = 10
+MAX_RETRIES = 3
+
+def _now():
+    return datetime.now(timezone.utc)
+
+class IngestionJob:
+    """A source callable plus its schedule and last-run status."""
+
+    def __init__(self, name: str, source, interval_seconds: float, max_retries: int = MAX_RETRIES,
+                 retry_base_seconds: float = RETRY_BASE_SECONDS):
+        self.name = name
+        self.source = source
+        self.interval_seconds = interval_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self._lock = asyncio.Lock()
+
+        self.runs = 0
+        self.failures = 0
+        self.last_started = None
+        self.last_success = None
+        self.last_error = None
+        self.last_duration_ms = None
+        self.last_result = None
+        self.next_run = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with ±50% jitter: ~base, ~2*base, ~4*base, ..."""
+        return self.retry_base_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def run_once(self) -> bool:
+        """
+        One run including retries. Returns False without running if a run
+        is already in flight (single-flight).
+        """
+        if self._lock.locked():
+            return False
+        async with self._lock:
+            for attempt in range(self.max_retries + 1):
+                self.runs += 1
+                self.last_started = _now()
+                t0 = time.perf_counter()
+                try:
+                    result = await asyncio.to_thread(self.source)
+                except Exception as e:
+                    self.failures += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self.last_duration_ms = round((time.perf_counter() - t0) * 1000, 1)
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(self.retry_delay(attempt))
+                    continue
+                self.last_duration_ms = round((time.perf_counter() - t0) * 1000, 1)
+                self.last_success = _now()
+                self.last_error = None
+                self.last_result = result
+                return True
+        return True
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started": self.last_started,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "next_run": self.next_run,
+        }
+
+class IngestionScheduler:
+    def __init__(self):
+        self.jobs: dict[str, IngestionJob] = {}
+        self._tasks: list[asyncio.Task] = []
+        # Runs started by trigger(); referenced so they aren't garbage collected
+        self._manual: set[asyncio.Task] = set()
+
+    def register(self, job: IngestionJob):
+        self.jobs[job.name] = job
+
+    async def _loop(self, job: IngestionJob, delay: float):
+        while True:
+            job.next_run = datetime.fromtimestamp(time.time() + delay, timezone.utc)
+            await asyncio.sleep(delay)
+            job.next_run = None
+            await job.run_once()
+            delay = job.interval_seconds
+
+    def start(self, startup_delay: float = STARTUP_DELAY_SECONDS):
+        for job in self.jobs.values():
+            delay = startup_delay * random.uniform(0.5, 1.5)
+            self._tasks.append(asyncio.create_task(self._loop(job, delay), name=f"ingest:{job.name}"))
+
+    async def stop(self):
+        tasks = self._tasks + list(self._manual)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._manual.clear()
+
+    async def trigger(self, name: str) -> bool:
+        """
+        Starts a run of a job in the background and returns at once; the
+        run (with its retries and backoff) is followed through status().
+        False if the job is already running.
+        """
+        job = self.jobs[name]
+        if job.running:
+            return False
+        task = asyncio.create_task(job.run_once(), name=f"ingest:{name}:manual")
+        self._manual.add(task)
+        task.add_done_callback(self._manual.discard)
+        # Let the run take the job's lock, so status() already reports it running
+        await asyncio.sleep(0)
+        return True
+
+    def status(self) -> list[dict]:
+        return [job.status() for job in self.jobs.values()]
+
+def default_jobs() -> list[IngestionJob]:
+    """
+    Jobs configured from the environment:
+      RENPHO_JSON=<dump.json>   sync Renpho from a local measurement dump (no cloud)
+      RENPHO_EMAIL/PASSWORD     sync Renpho from the cloud (also read from backend/.env)
+      RENPHO_ATHLETE_ID         athlete shard the readings go to, default gym.db
+      RENPHO_SYNC_MINUTES       interval, default 60
+    INGESTION_ENABLED=0 turns the scheduler off.
+    """
+    if os.getenv("INGESTION_ENABLED", "1") == "0":
+        return []
+    import fetch_renpho
+
+    jobs = []
+    interval = float(os.getenv("RENPHO_SYNC_MINUTES", "60")) * 60
+    athlete_id = os.getenv("RENPHO_ATHLETE_ID") or None
+    local_dump = os.getenv("RENPHO_JSON")
+    if local_dump:
+        jobs.append(renpho_job(lambda: fetch_renpho.LocalRenphoClient(local_dump), athlete_id, interval))
+    elif fetch_renpho.has_credentials():
+        jobs.append(renpho_job(fetch_renpho.cloud_client, athlete_id, interval))
+    return jobs
+
+def renpho_job(make_client, athlete_id: str = None, interval_seconds: float = 3600, **kwargs) -> IngestionJob:
+    """fetch_renpho.sync into one athlete's shard, with a fresh client per run."""
+    import fetch_renpho
+
+    return IngestionJob(
+        "renpho", lambda: fetch_renpho.sync(make_client(), athlete_id=athlete_id), interval_seconds, **kwargs
+    )
+
+ingestion_scheduler = IngestionScheduler()
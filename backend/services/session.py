@@ -1,10 +1,73 @@
 from datetime import date
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.schema import Session, SessionExercise, Set
+from services.aggregates import refresh_for_session_exercise
+from services.progression import validate_session_data
+from services.weeks import parse_day_label, record_session_week, find_day_session_id
+
+def epley_e1rm(weight_kg: float, reps: int) -> float:
+    return weight_kg * (1 + reps / 30.0)
+
+def _add_session(db: DbSession, date_val: date, day_label: str, week_number: int):
+    """
+    Get-or-create of the (week, day) session: INSERT ... ON CONFLICT DO
+    NOTHING against uq_sessions_week_day, so two racing requests for the
+    same day land on one row. Labels without a day number always insert.
+    """
+    day_number = parse_day_label(day_label)[0]
+    res = db.execute(insert(Session).values(
+        date=date_val, day_label=day_label, week_number=week_number, day_number=day_number
+    ).on_conflict_do_nothing())
+    if res.rowcount:
+        record_session_week(db, week_number)
+        return db.get(Session, res.inserted_primary_key[0])
+    return db.get(Session, find_day_session_id(db, week_number, day_number))
+
+def _add_session_exercise(db: DbSession, session_id: int, exercise_id: int, order: int, is_superset: bool = False, superset_group: int = None):
+    """Get-or-create on uq_session_exercises_session_exercise; an existing row keeps its order."""
+    res = db.execute(insert(SessionExercise).values(
+        session_id=session_id,
+        exercise_id=exercise_id,
+        exercise_order=order,
+        is_superset=is_superset,
+        superset_group=superset_group
+    ).on_conflict_do_nothing())
+    if res.rowcount:
+        return db.get(SessionExercise, res.inserted_primary_key[0])
+    return db.query(SessionExercise).filter(
+        SessionExercise.session_id == session_id, SessionExercise.exercise_id == exercise_id
+    ).first()
+
+def _upsert_sets(db: DbSession, session_exercise_id: int, sets: list[dict]) -> dict[int, int]:
+    """
+    Writes sets keyed on (session_exercise_id, set_number) in one
+    INSERT ... ON CONFLICT DO UPDATE: a repeated set number overwrites the
+    weight/reps instead of adding a duplicate row. Returns set_number -> id.
+    """
+    by_number = {st["set_number"]: st for st in sets}
+    if not by_number:
+        return {}
+    stmt = insert(Set).values([
+        {
+            "session_exercise_id": session_exercise_id,
+            "set_number": n,
+            "weight_kg": st["weight_kg"],
+            "reps": st["reps"],
+            "e1rm": epley_e1rm(st["weight_kg"], st["reps"]),
+        }
+        for n, st in by_number.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Set.session_exercise_id, Set.set_number],
+        set_={"weight_kg": stmt.excluded.weight_kg, "reps": stmt.excluded.reps, "e1rm": stmt.excluded.e1rm},
+    ).returning(Set.set_number, Set.id)
+    # RETURNING order is unspecified in SQLite, hence the mapping
+    return dict(db.execute(stmt).all())
 
 def create_session(db: DbSession, date_val: date, day_label: str, week_number: int):
-    s = Session(date=date_val, day_label=day_label, week_number=week_number)
-    db.add(s)
+    s = _add_session(db, date_val, day_label, week_number)
     db.commit()
     db.refresh(s)
     return s
@@ -16,31 +79,16 @@ def get_all_sessions(db: DbSession):
     return db.query(Session).order_by(Session.date.desc()).all()
 
 def add_exercise_to_session(db: DbSession, session_id: int, exercise_id: int, order: int, is_superset: bool = False, superset_group: int = None):
-    se = SessionExercise(
-        session_id=session_id,
-        exercise_id=exercise_id,
-        exercise_order=order,
-        is_superset=is_superset,
-        superset_group=superset_group
-    )
-    db.add(se)
+    se = _add_session_exercise(db, session_id, exercise_id, order, is_superset, superset_group)
     db.commit()
     db.refresh(se)
     return se
 
 def log_set(db: DbSession, session_exercise_id: int, set_number: int, weight_kg: float, reps: int):
-    e1rm = weight_kg * (1 + reps / 30.0)
-    s = Set(
-        session_exercise_id=session_exercise_id,
-        set_number=set_number,
-        weight_kg=weight_kg,
-        reps=reps,
-        e1rm=e1rm
-    )
-    db.add(s)
+    ids = _upsert_sets(db, session_exercise_id, [{"set_number": set_number, "weight_kg": weight_kg, "reps": reps}])
+    refresh_for_session_exercise(db, session_exercise_id)
     db.commit()
-    db.refresh(s)
-    return s
+    return db.get(Set, ids[set_number])
 
 def edit_set(db: DbSession, set_id: int, weight_kg: float = None, reps: int = None):
     s = db.query(Set).filter(Set.id == set_id).first()
@@ -52,7 +100,77 @@ def edit_set(db: DbSession, set_id: int, weight_kg: float = None, reps: int = No
     if reps is not None:
         s.reps = reps
         
-    s.e1rm = s.weight_kg * (1 + s.reps / 30.0)
+    s.e1rm = epley_e1rm(s.weight_kg, s.reps)
+    refresh_for_session_exercise(db, s.session_exercise_id)
     db.commit()
     db.refresh(s)
     return s
+
+def delete_set(db: DbSession, set_id: int):
+    s = db.query(Set).filter(Set.id == set_id).first()
+    if not s:
+        return False
+
+    session_exercise_id = s.session_exercise_id
+    db.delete(s)
+    refresh_for_session_exercise(db, session_exercise_id)
+    db.commit()
+    return True
+
+def log_exercise_sets(db: DbSession, week_number: int, day_number: int, exercises: list[dict], date_val: date = None) -> dict:
+    """
+    Logs every set of one or more exercises for a (week, day) in a single
+    transaction: get-or-create of the session and each session_exercise,
+    one upsert of each exercise's sets, one commit. Re-sending a set number
+    overwrites that set rather than duplicating it.
+
+    exercises: [{"exercise_id": int, "sets": [{"set_number", "weight_kg", "reps"}]}]
+    Returns the session id, the set ids and any validate_session_data
+    warnings per exercise (warnings are reported, not rejected).
+    """
+    session_id = find_day_session_id(db, week_number, day_number)
+    if not session_id:
+        session_id = _add_session(db, date_val or date.today(), f"Day{day_number}_Workout", week_number).id
+
+    existing = dict(db.query(SessionExercise.exercise_id, SessionExercise.id).filter(
+        SessionExercise.session_id == session_id
+    ).order_by(SessionExercise.id.desc()).all())
+    next_order = len(existing) + 1
+
+    set_ids = {}
+    warnings = {}
+    for ex in exercises:
+        exercise_id = ex["exercise_id"]
+        se_id = existing.get(exercise_id)
+        if not se_id:
+            se_id = _add_session_exercise(db, session_id, exercise_id, next_order).id
+            existing[exercise_id] = se_id
+            next_order += 1
+
+        sets = sorted(ex["sets"], key=lambda st: st["set_number"])
+        issues = validate_session_data(sets)
+        if issues:
+            warnings[exercise_id] = issues
+
+        ids = _upsert_sets(db, se_id, sets)
+        refresh_for_session_exercise(db, se_id)
+        set_ids[exercise_id] = [ids[n] for n in sorted(ids)]
+
+    db.commit()
+    return {"session_id": session_id, "set_ids": set_ids, "warnings": warnings}
+
+# Async variants for the FastAPI routes. Each runs the sync write above in
+# the AsyncSession's greenlet via run_sync: the SQL is awaited on aiosqlite,
+# so no threadpool worker is held, and the flush/aggregate/commit sequence
+# stays in one place.
+async def log_set_async(db: AsyncSession, session_exercise_id: int, set_number: int, weight_kg: float, reps: int):
+    return await db.run_sync(log_set, session_exercise_id, set_number, weight_kg, reps)
+
+async def edit_set_async(db: AsyncSession, set_id: int, weight_kg: float = None, reps: int = None):
+    return await db.run_sync(edit_set, set_id, weight_kg, reps)
+
+async def delete_set_async(db: AsyncSession, set_id: int):
+    return await db.run_sync(delete_set, set_id)
+
+async def log_exercise_sets_async(db: AsyncSession, week_number: int, day_number: int, exercises: list[dict], date_val: date = None) -> dict:
+    return await db.run_sync(log_exercise_sets, week_number, day_number, exercises, date_val)
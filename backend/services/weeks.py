@@ -0,0 +1,89 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.schema import Session, SessionExercise, Set, TrainingWeek
+
+def parse_day_label(day_label: str):
+    """
+    "Day3_Legs" -> (3, "Legs"). Labels that don't follow the DayN_Name
+    convention yield (None, "Workout").
+    """
+    try:
+        day_num = int(day_label.split('_')[0].replace('Day', ''))
+    except (ValueError, AttributeError):
+        return None, "Workout"
+    day_name = day_label.split('_')[1] if '_' in day_label else "Workout"
+    return day_num, day_name
+
+def record_session_week(db: DbSession, week_number: int):
+    """Bumps the week summary for a newly inserted session. Does not commit."""
+    week = db.query(TrainingWeek).filter(TrainingWeek.week_number == week_number).first()
+    if not week:
+        week = TrainingWeek(week_number=week_number, session_count=0)
+        db.add(week)
+    week.session_count += 1
+
+def get_weeks(db: DbSession) -> list[int]:
+    return [w for (w,) in db.query(TrainingWeek.week_number).order_by(TrainingWeek.week_number).all()]
+
+def get_latest_week(db: DbSession):
+    return db.query(func.max(TrainingWeek.week_number)).scalar()
+
+def resolve_week(db: DbSession, week_id: int = None) -> int:
+    """The requested week, else the latest week with sessions, else week 1."""
+    return week_id or get_latest_week(db) or 1
+
+def get_week_days(db: DbSession, week_number: int) -> dict[int, int]:
+    """day_number -> session id for one week (first session wins per day)."""
+    days = {}
+    rows = db.query(Session.day_number, Session.id).filter(
+        Session.week_number == week_number
+    ).order_by(Session.day_number, Session.id).all()
+    for day_number, session_id in rows:
+        days.setdefault(day_number, session_id)
+    return days
+
+def get_week_summary(db: DbSession, week_id: int = None) -> dict:
+    weeks = get_weeks(db)
+    target_week = week_id or (weeks[-1] if weeks else 1)
+    return {
+        "weeks": weeks,
+        "latest_week": weeks[-1] if weeks else None,
+        "current_week": target_week,
+        "days": get_week_days(db, target_week),
+    }
+
+def find_day_session_id(db: DbSession, week_number: int, day_number: int):
+    row = db.query(Session.id).filter(
+        Session.week_number == week_number, Session.day_number == day_number
+    ).order_by(Session.id).first()
+    return row[0] if row else None
+
+def _set_day_stmt(set_id: int):
+    return select(Session.week_number, Session.day_number, Session.id.label("session_id")).join(
+        SessionExercise, SessionExercise.session_id == Session.id
+    ).join(
+        Set, Set.session_exercise_id == SessionExercise.id
+    ).where(Set.id == set_id)
+
+def get_set_day(db: DbSession, set_id: int):
+    """(week_number, day_number, session_id) of the session a set belongs to, or None."""
+    return db.execute(_set_day_stmt(set_id)).first()
+
+async def get_set_day_async(db: AsyncSession, set_id: int):
+    return (await db.execute(_set_day_stmt(set_id))).first()
+
+def backfill_day_numbers(db: DbSession) -> int:
+    rows = db.query(Session).filter(Session.day_number == None).all()
+    for s in rows:
+        s.day_number = parse_day_label(s.day_label)[0]
+    db.commit()
+    return len(rows)
+
+def rebuild_training_weeks(db: DbSession) -> int:
+    db.query(TrainingWeek).delete()
+    counts = db.query(Session.week_number, func.count(Session.id)).group_by(Session.week_number).all()
+    for week_number, count in counts:
+        db.add(TrainingWeek(week_number=week_number, session_count=count))
+    db.commit()
+    return len(counts)
@@ -0,0 +1,26 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+@pytest.fixture
+def gym_db(tmp_path):
+    """A migrated session on a copy of the committed gym.db (the original is never touched)."""
+    from sqlalchemy import create_engine
+    from db.init import init_db, SessionLocal
+
+    path = tmp_path / "gym.db"
+    shutil.copy(os.path.join(BACKEND, "gym.db"), path)
+    engine = create_engine(f"sqlite:///{path}")
+    init_db(engine)
+    db = SessionLocal(bind=engine)
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,49 @@
+"""delta_7d_kg is measured against a weigh-in 7-10 days back, never across a long gap."""
+from datetime import date
+
+import pytest
+
+from db.schema import BodyweightTrend
+from services.bodyweight import record_bodyweight, get_bodyweight_delta, EWMA_ALPHA
+
+
+def _latest(db):
+    return db.query(BodyweightTrend).order_by(BodyweightTrend.date.desc()).first()
+
+
+def test_gap_is_not_measured_as_a_week(gym_db):
+    # The seeded weigh-ins stop in March; these two come seven months later
+    assert _latest(gym_db).date < date(2026, 4, 1)
+    record_bodyweight(gym_db, date(2026, 10, 10), 70.0)
+    record_bodyweight(gym_db, date(2026, 10, 16), 69.0)
+    gym_db.commit()
+
+    first, last = gym_db.query(BodyweightTrend).filter(
+        BodyweightTrend.date >= date(2026, 10, 10)
+    ).order_by(BodyweightTrend.date).all()
+    # No weigh-in 7-10 days back: the first reading after the gap is flat,
+    # the second moves by the EWMA change since it
+    assert first.delta_7d_kg == 0.0
+    assert last.delta_7d_kg == pytest.approx(last.ewma_kg - first.ewma_kg)
+    assert last.delta_7d_kg == pytest.approx(-(1 - (1 - EWMA_ALPHA) ** 6))
+    assert get_bodyweight_delta(gym_db) == pytest.approx(last.delta_7d_kg)
+
+
+def test_anchor_within_window(gym_db):
+    record_bodyweight(gym_db, date(2026, 10, 1), 71.0)
+    record_bodyweight(gym_db, date(2026, 10, 3), 70.5)
+    record_bodyweight(gym_db, date(2026, 10, 11), 70.0)
+    gym_db.commit()
+    # 10-03 is the closest weigh-in 7-10 days before 10-11
+    assert get_bodyweight_delta(gym_db) == pytest.approx(-0.5)
+
+
+def test_backfill_rolls_forward(gym_db):
+    record_bodyweight(gym_db, date(2026, 10, 11), 70.0)
+    gym_db.commit()
+    assert get_bodyweight_delta(gym_db) == 0.0
+
+    # A late-synced reading 8 days earlier becomes the anchor
+    record_bodyweight(gym_db, date(2026, 10, 3), 71.0)
+    gym_db.commit()
+    assert get_bodyweight_delta(gym_db) == pytest.approx(-1.0)
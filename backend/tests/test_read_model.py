@@ -0,0 +1,58 @@
+"""load_session_trees must stay at three queries however large the day is."""
+from sqlalchemy import event
+
+from db.schema import Exercise, Session
+from services.read_model import load_session_trees
+from services.session import log_exercise_sets
+
+
+class _StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def _log_day(db, week, day, exercise_ids, sets_per_exercise=4):
+    log_exercise_sets(db, week, day, [
+        {"exercise_id": ex_id, "sets": [
+            {"set_number": n, "weight_kg": 20.0 + n, "reps": 10} for n in range(1, sets_per_exercise + 1)
+        ]}
+        for ex_id in exercise_ids
+    ])
+
+
+def _queries_for_day(db, week, day):
+    with _StatementCounter(db.get_bind()) as counter:
+        trees = load_session_trees(db, Session.week_number == week, Session.day_number == day)
+    return counter.count, trees
+
+
+def test_three_queries_for_one_and_many_exercises(gym_db):
+    exercise_ids = [ex_id for (ex_id,) in gym_db.query(Exercise.id).order_by(Exercise.id).limit(10)]
+    assert len(exercise_ids) == 10
+    _log_day(gym_db, 90, 1, exercise_ids[:1])
+    _log_day(gym_db, 90, 2, exercise_ids, sets_per_exercise=6)
+
+    single, trees = _queries_for_day(gym_db, 90, 1)
+    assert single == 3
+    assert [len(se["sets"]) for se in trees[0]["exercises"]] == [4]
+
+    many, trees = _queries_for_day(gym_db, 90, 2)
+    assert many == 3
+    assert [len(se["sets"]) for se in trees[0]["exercises"]] == [6] * 10
+
+
+def test_empty_day_is_one_query(gym_db):
+    count, trees = _queries_for_day(gym_db, 999, 1)
+    assert trees == []
+    assert count == 1
@@ -0,0 +1,64 @@
+"""The scheduled Renpho sync lands in the tables the dashboard and trend read."""
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db.shards as shards
+import fetch_renpho
+from db.shards import shard_router
+from main import app
+from services.scheduler import renpho_job
+
+ATHLETE = "renpho_sync"
+WEIGHTS = [72.0, 71.6, 71.4, 71.1]
+
+
+@pytest.fixture
+def dump(tmp_path, monkeypatch):
+    monkeypatch.setattr(shards, "SHARD_DIR", str(tmp_path / "athletes"))
+    monkeypatch.setattr(fetch_renpho, "METRICS_DIR", tmp_path / "metrics")
+    monkeypatch.setattr(fetch_renpho, "CSV_PATH", tmp_path / "metrics" / "body_composition.csv")
+
+    today = date.today()
+    measurements = [{
+        "timeStamp": int(datetime.combine(today - timedelta(days=len(WEIGHTS) - 1 - i), time(8)).timestamp()),
+        "weight": w, "bodyfat": 15.0 - 0.1 * i, "muscle": 56.0 + 0.1 * i, "water": 58.0,
+    } for i, w in enumerate(WEIGHTS)]
+    path = tmp_path / "renpho.json"
+    path.write_text(json.dumps(measurements))
+    yield path
+    shard = shard_router._open.pop(ATHLETE, None)
+    if shard is not None:
+        shard.engine.dispose()
+
+
+def _run(job):
+    assert asyncio.run(job.run_once())
+    assert job.last_error is None
+    return job.last_result
+
+
+def test_job_feeds_dashboard_and_trend(dump):
+    job = renpho_job(lambda: fetch_renpho.LocalRenphoClient(dump), ATHLETE, retry_base_seconds=0.01)
+    assert _run(job)["new_days"] == len(WEIGHTS)
+
+    client = TestClient(app)
+    headers = {"X-Athlete-Id": ATHLETE}
+    metrics = client.get("/dashboard/metrics?range=week", headers=headers).json()
+    assert [r["Weight_kg"] for r in metrics["body_comp"]] == WEIGHTS
+    assert metrics["body_comp"][-1]["MuscleMass_kg"] == pytest.approx(56.3)
+    weights = next(d for d in metrics["datasets"] if d["yAxisID"] == "bodyweight")
+    assert [w for w in weights["data"] if w is not None] == WEIGHTS
+
+    trend = client.get("/metrics/bodyweight_trend", headers=headers).json()
+    assert trend["date"] == date.today().isoformat()
+    assert trend["bodyweight_kg"] == WEIGHTS[-1]
+    assert trend["ewma_kg"] < WEIGHTS[0]
+
+    # Nothing new past the high-water mark: the next run writes nothing
+    assert _run(job)["new_days"] == 0
+    again = client.get("/dashboard/metrics?range=week", headers=headers).json()
+    assert again["body_comp"] == metrics["body_comp"]
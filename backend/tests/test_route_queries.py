@@ -0,0 +1,53 @@
+"""Read routes issue the same number of statements for a 1- and a 10-exercise day."""
+import pytest
+from fastapi.testclient import TestClient
+
+from db.schema import Exercise, Session
+from main import app, get_db
+from services.response_cache import response_cache
+from test_read_model import _StatementCounter, _log_day
+
+
+@pytest.fixture
+def client(gym_db):
+    def override():
+        yield gym_db
+    app.dependency_overrides[get_db] = override
+    response_cache.clear()
+    # No context manager: the lifespan would migrate the real gym.db and start the scheduler
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        response_cache.clear()
+
+
+def _route_counts(client, db, week):
+    session_id = db.query(Session.id).filter(Session.week_number == week, Session.day_number == 1).scalar()
+    counts = {}
+    for name, url in [
+        ("plan", f"/plan?week_id={week}"),
+        ("workout", f"/workout/1?week_id={week}"),
+        ("stats", "/stats"),
+        ("session", f"/sessions/{session_id}"),
+    ]:
+        # Count the build, not a cache hit
+        response_cache.clear()
+        with _StatementCounter(db.get_bind()) as counter:
+            assert client.get(url).status_code == 200
+        counts[name] = counter.count
+    return counts
+
+
+def test_route_queries_do_not_grow_with_the_day(gym_db, client):
+    exercise_ids = [ex_id for (ex_id,) in gym_db.query(Exercise.id).order_by(Exercise.id).limit(10)]
+    assert len(exercise_ids) == 10
+
+    # /stats reads the latest week, so each day gets a week of its own
+    _log_day(gym_db, 90, 1, exercise_ids[:1])
+    single = _route_counts(client, gym_db, 90)
+    _log_day(gym_db, 91, 1, exercise_ids, sets_per_exercise=6)
+    many = _route_counts(client, gym_db, 91)
+
+    assert single == {"plan": 4, "workout": 4, "stats": 5, "session": 3}
+    assert many == single
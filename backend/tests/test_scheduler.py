@@ -0,0 +1,34 @@
+"""A manual trigger returns at once; the run and its retries continue in the background."""
+import asyncio
+import time
+
+from services.scheduler import IngestionScheduler, IngestionJob
+
+
+def _failing_source():
+    raise RuntimeError("bad credentials")
+
+
+def test_trigger_does_not_wait_for_retries():
+    async def scenario():
+        scheduler = IngestionScheduler()
+        scheduler.register(IngestionJob("renpho", _failing_source, 3600, retry_base_seconds=30))
+
+        t0 = time.perf_counter()
+        assert await scheduler.trigger("renpho")
+        elapsed = time.perf_counter() - t0
+        status = scheduler.jobs["renpho"].status()
+
+        # Still backing off after the first failure; a second trigger is refused
+        await asyncio.sleep(0.1)
+        second = await scheduler.trigger("renpho")
+        failures = scheduler.jobs["renpho"].failures
+        await scheduler.stop()
+        return elapsed, status, second, failures, scheduler.jobs["renpho"].running
+
+    elapsed, status, second, failures, running_after_stop = asyncio.run(scenario())
+    assert elapsed < 0.5
+    assert status["running"] is True
+    assert second is False
+    assert failures == 1
+    assert running_after_stop is False
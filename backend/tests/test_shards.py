@@ -0,0 +1,80 @@
+"""Provisioning one athlete's shard must not hold up lookups of other shards."""
+import threading
+import time
+
+import pytest
+
+import db.shards as shards
+from db.shards import ShardRouter
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    monkeypatch.setattr(shards, "SHARD_DIR", str(tmp_path))
+    r = ShardRouter(max_open=4)
+    yield r
+    for shard in list(r._open.values()):
+        shard.engine.dispose()
+
+
+def _slow_init(started: threading.Event, release: threading.Event, calls: list):
+    real_init = shards.init_db
+
+    def init_db(bind):
+        calls.append(bind.url.database)
+        started.set()
+        release.wait(10)
+        real_init(bind)
+    return init_db
+
+
+def test_provisioning_does_not_block_other_shards(router, monkeypatch):
+    ready = router.get("ready")
+
+    started, release, calls = threading.Event(), threading.Event(), []
+    monkeypatch.setattr(shards, "init_db", _slow_init(started, release, calls))
+    slow = threading.Thread(target=router.get, args=("slow",))
+    slow.start()
+    assert started.wait(10)
+    try:
+        t0 = time.perf_counter()
+        assert router.get_open("ready") is ready
+        assert router.get("ready") is ready
+        assert router.get_open("slow") is None
+        assert time.perf_counter() - t0 < 0.5
+    finally:
+        release.set()
+        slow.join(10)
+    assert router.get_open("slow") is not None
+
+
+def test_concurrent_first_requests_provision_once(router, monkeypatch):
+    started, release, calls = threading.Event(), threading.Event(), []
+    monkeypatch.setattr(shards, "init_db", _slow_init(started, release, calls))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(router.get("alice"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    assert started.wait(10)
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(10)
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+
+
+def test_failed_provisioning_is_retried(router, monkeypatch):
+    real_init = shards.init_db
+
+    def broken(bind):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(shards, "init_db", broken)
+    with pytest.raises(RuntimeError):
+        router.get("bob")
+    assert router.get_open("bob") is None
+
+    monkeypatch.setattr(shards, "init_db", real_init)
+    assert router.get("bob") is not None
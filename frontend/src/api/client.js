@@ -17,6 +17,33 @@ export async function fetchWorkout(dayId, weekId = null) {
   return data;
 }
 
+/**
+ * Fetch rows (sessions, session_exercises, sets) changed after revision `since`.
+ * Returns { revision, has_more, changes: [{ rev, table, op, id, row }] };
+ * pass `revision` back as `since` on the next call.
+ */
+export async function fetchChanges(since = 0) {
+  const { data } = await api.get('/changes', { params: { since } });
+  return data;
+}
+
+/**
+ * Subscribe to live updates for a week and/or session (server-sent events).
+ * Calls onEvent(type, data) for set_logged, set_edited, set_deleted,
+ * session_created, bench_advanced and dropped (missed events: resync).
+ * Returns the EventSource; call .close() to unsubscribe.
+ */
+export function subscribeEvents({ weekId = null, sessionId = null } = {}, onEvent) {
+  const params = new URLSearchParams();
+  if (weekId) params.set('week_id', weekId);
+  if (sessionId) params.set('session_id', sessionId);
+  const source = new EventSource(`/events?${params}`);
+  for (const type of ['set_logged', 'set_edited', 'set_deleted', 'session_created', 'bench_advanced', 'dropped']) {
+    source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)));
+  }
+  return source;
+}
+
 /**
  * Log a single set of an exercise.
  */
@@ -87,18 +114,20 @@ export async function hasCompletedDays() {
 }
 
 /**
- * Fetch volume chart data from the data lake.
+ * Fetch weekly volume chart data. Optional params: { from_week, to_week,
+ * group_by: 'muscle_group' | 'tier', metric: 'tonnage' | 'sets' }.
  */
-export async function fetchVolume() {
-  const { data } = await api.get('/dashboard/volume');
+export async function fetchVolume(params = {}) {
+  const { data } = await api.get('/dashboard/volume', { params });
   return data;
 }
 
 /**
- * Fetch body-composition metrics.
+ * Fetch body-composition metrics. range: 'lifetime' | 'month' | 'week' | 'day'
+ * (the backend defaults to 7 days when it is left out).
  */
 export async function fetchMetrics(range) {
-  const params = range && range !== 'lifetime' ? { range } : {};
+  const params = range ? { range } : {};
   const { data } = await api.get('/dashboard/metrics', { params });
   return data;
 }